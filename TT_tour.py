@@ -1,470 +1,61 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
 import json
 import os
-import uuid
 from datetime import datetime
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
-from tkinter import StringVar, Toplevel, Listbox, ttk
-
-if not firebase_admin._apps:
-    cred = credentials.Certificate("tt-tournament-app-firebase-adminsdk-fbsvc-3d00fec401.json")
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+from tkinter import StringVar, Toplevel, Listbox, Canvas, ttk
+import csv
+import gc
+import instrumentation
+import game_scores
+import model
+import background
+from tournament_manager import TournamentManager
 
 # Set default appearance mode and color theme for customtkinter
 ctk.set_appearance_mode("Dark")  # Options: "Light", "Dark", "System"
 ctk.set_default_color_theme("blue")  # Options: "blue", "green", "dark-blue"
 
-DATA_FILE = 'tournament_data.json'
 
-class TournamentManager:
+class DeferredNotifier:
+    """Keeps the messages of work on a background thread, where Tk can't be used, to show them afterwards."""
+
     def __init__(self):
-        self.db = db
-        self.data = self._load_data()
+        self.kept = []
 
+    def showerror(self, title, message, **kwargs):
+        self.kept.append((messagebox.showerror, title, message))
 
+    def showwarning(self, title, message, **kwargs):
+        self.kept.append((messagebox.showwarning, title, message))
 
-    def find_match_id(self, date, team1_name, team2_name):
-        for match_id, match in self.data['matches'].items():
-            if 'timestamp' not in match:
-                continue
-            match_time = datetime.fromisoformat(match['timestamp']).strftime('%Y-%m-%d %H:%M')
-            if match_time == date and (
-                (match['team1_name'] == team1_name and match['team2_name'] == team2_name) or
-                (match['team1_name'] == team2_name and match['team2_name'] == team1_name)
-            ):
-                return match_id
-        return None
+    def showinfo(self, title, message, **kwargs):
+        self.kept.append((messagebox.showinfo, title, message))
 
+    def askyesno(self, title, message, **kwargs):
+        return False  # nothing is confirmed from a background thread
 
-    def _load_data(self):
-        """Loads tournament data from a JSON file."""
-        if os.path.exists(DATA_FILE):
-            try:
-                with open(DATA_FILE, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                messagebox.showerror("Error",
-                                     "Could not load data from file. File might be corrupted. Starting with new data.")
-                os.remove(DATA_FILE)  # Optionally remove corrupted file
-                return self._default_data()
-        return self._default_data()
-
-    def _default_data(self):
-        """Returns the default structure for new tournament data."""
-        return {
-            'teams': {},
-            'matches': {},
-            'skill_levels': ['Beginner', 'Intermediate', 'Advanced', 'Expert']
-        }
-
-    def _save_data(self):
-        """Saves current tournament data to a JSON file."""
-        try:
-            with open(DATA_FILE, 'w') as f:
-                json.dump(self.data, f, indent=4)
-        except IOError as e:
-            messagebox.showerror("Save Error", f"Could not save data: {e}")
-
-    # --- Team Management ---
-    def create_team(self, team_name):
-        """Creates a new team with a unique ID."""
-        if not team_name:
-            messagebox.showerror("Input Error", "Team name cannot be empty.")
-            return None, "error"
-
-        # Check for duplicate team name
-        for team_id, team in self.data['teams'].items():
-            if team['name'].lower() == team_name.lower():
-                messagebox.showerror("Duplicate Team", f"Team '{team_name}' already exists.")
-                return None, "error"
-
-        team_id = str(uuid.uuid4())
-        self.data['teams'][team_id] = {'name': team_name, 'players': {}}
-        self._save_data()
-        return team_id, f"Team '{team_name}' created successfully!"
-
-    def get_team(self, team_id):
-        """Retrieves a team by its ID."""
-        return self.data['teams'].get(team_id)
-
-    def get_all_teams(self):
-        """Returns a list of all teams with their IDs and names."""
-        return [(team_id, team['name']) for team_id, team in self.data['teams'].items()]
-
-    def update_team_name(self, team_id, new_name):
-        """Updates the name of an existing team."""
-        if not new_name:
-            messagebox.showerror("Input Error", "New team name cannot be empty.")
-            return False, "error"
-        if team_id not in self.data['teams']:
-            messagebox.showerror("Error", "Team not found.")
-            return False, "error"
-
-        # Check for duplicate name among other teams
-        for existing_id, team in self.data['teams'].items():
-            if existing_id != team_id and team['name'].lower() == new_name.lower():
-                messagebox.showerror("Duplicate Name", f"Another team with name '{new_name}' already exists.")
-                return False, "error"
-
-        old_name = self.data['teams'][team_id]['name']
-        self.data['teams'][team_id]['name'] = new_name
-        self._save_data()
-        return True, f"Team '{old_name}' renamed to '{new_name}' successfully!"
-
-    def delete_team(self, team_id):
-        """Deletes a team and associated match records."""
-        if team_id not in self.data['teams']:
-            messagebox.showerror("Error", "Team not found.")
-            return False, "error"
-
-        team_name = self.data['teams'][team_id]['name']
-
-        if not messagebox.askyesno("Confirm Deletion",
-                                   f"Are you sure you want to delete '{team_name}' and ALL its players and associated match records? This action cannot be undone."):
-            return False, "cancelled"
-
-        del self.data['teams'][team_id]
-
-        # Remove matches involving this team
-        matches_to_remove = [match_id for match_id, match in self.data['matches'].items()
-                             if match['team1_id'] == team_id or match['team2_id'] == team_id]
-        for match_id in matches_to_remove:
-            del self.data['matches'][match_id]
-
-        self._save_data()
-        return True, f"Team '{team_name}' and its associated data deleted successfully!"
-
-    # --- Player Management ---
-    def add_player(self, team_id, player_name, skill_level):
-        """Adds a player to a team."""
-        if not player_name:
-            messagebox.showerror("Input Error", "Player name cannot be empty.")
-            return False, "error"
-        if not skill_level:
-            messagebox.showerror("Input Error", "Skill level cannot be empty.")
-            return False, "error"
-        if team_id not in self.data['teams']:
-            messagebox.showerror("Error", "Team not found.")
-            return False, "error"
-        if skill_level not in self.data['skill_levels']:
-            messagebox.showerror("Invalid Skill",
-                                 f"Skill level '{skill_level}' is not recognized. Please add it first in Team Management.")
-            return False, "error"
-
-        team = self.data['teams'][team_id]
-        # Check for duplicate player name within the same team
-        for player_id, player in team['players'].items():
-            if player['name'].lower() == player_name.lower():
-                messagebox.showerror("Duplicate Player", f"Player '{player_name}' already exists in '{team['name']}'.")
-                return False, "error"
-
-        player_id = str(uuid.uuid4())
-        team['players'][player_id] = {'name': player_name, 'skill': skill_level}
-        self._save_data()
-        return True, f"Player '{player_name}' added to '{team['name']}' successfully!"
-
-    def update_player(self, team_id, player_id, new_name, new_skill):
-        """Edits an existing player's name and/or skill level."""
-        if not new_name:
-            messagebox.showerror("Input Error", "New player name cannot be empty.")
-            return False, "error"
-        if not new_skill:
-            messagebox.showerror("Input Error", "New skill level cannot be empty.")
-            return False, "error"
-        if team_id not in self.data['teams']:
-            messagebox.showerror("Error", "Team not found.")
-            return False, "error"
-        if player_id not in self.data['teams'][team_id]['players']:
-            messagebox.showerror("Error", "Player not found in this team.")
-            return False, "error"
-        if new_skill not in self.data['skill_levels']:
-            messagebox.showerror("Invalid Skill",
-                                 f"Skill level '{new_skill}' is not recognized. Please add it first in Team Management.")
-            return False, "error"
-
-        team = self.data['teams'][team_id]
-        old_player_name = team['players'][player_id]['name']
-
-        # Check for duplicate player name in the same team, excluding the player being updated
-        for existing_player_id, player in team['players'].items():
-            if existing_player_id != player_id and player['name'].lower() == new_name.lower():
-                messagebox.showerror("Duplicate Player",
-                                     f"Another player with name '{new_name}' already exists in '{team['name']}'.")
-                return False, "error"
-
-        team['players'][player_id]['name'] = new_name
-        team['players'][player_id]['skill'] = new_skill
-        self._save_data()
-        return True, f"Player '{old_player_name}' updated to '{new_name}' with skill '{new_skill}' successfully!"
-
-    def remove_player(self, team_id, player_id):
-        """Removes a player from a team."""
-        if team_id not in self.data['teams']:
-            messagebox.showerror("Error", "Team not found.")
-            return False, "error"
-        if player_id not in self.data['teams'][team_id]['players']:
-            messagebox.showerror("Error", "Player not found in this team.")
-            return False, "error"
-
-        player_name = self.data['teams'][team_id]['players'][player_id]['name']
-        if not messagebox.askyesno("Confirm Removal",
-                                   f"Are you sure you want to remove '{player_name}' from '{self.data['teams'][team_id]['name']}'?"):
-            return False, "cancelled"
-
-        del self.data['teams'][team_id]['players'][player_id]
-        self._save_data()
-        return True, f"Player '{player_name}' removed successfully!"
-
-    def get_players_for_team(self, team_id):
-        """Returns a list of players for a given team."""
-        if team_id not in self.data['teams']:
-            return []
-        return [(player_id, player['name'], player['skill']) for player_id, player in
-                self.data['teams'][team_id]['players'].items()]
-    
-    def get_player_name(self, player_id):
-        """Returns the name of a player given their ID."""
-        for team_id, team_data in self.data['teams'].items():
-            if player_id in team_data['players']:
-                return team_data['players'][player_id]['name']
-        return "Unknown Player"
-
-    # --- Skill Level Management ---
-    def get_skill_levels(self):
-        """Returns the list of predefined skill levels."""
-        return self.data['skill_levels']
-
-    def add_skill_level(self, skill):
-        """Adds a new skill level to the predefined list."""
-        if not skill:
-            messagebox.showerror("Input Error", "Skill level name cannot be empty.")
-            return False, "error"
-        if skill.lower() in [s.lower() for s in self.data['skill_levels']]:
-            messagebox.showerror("Duplicate Skill", f"Skill level '{skill}' already exists.")
-            return False, "error"
-        self.data['skill_levels'].append(skill)
-        self._save_data()
-        return True, f"Skill level '{skill}' added successfully!"
-
-    def remove_skill_level(self, skill):
-        """Removes a skill level from the predefined list."""
-        if skill not in self.data['skill_levels']:
-            messagebox.showerror("Error", f"Skill level '{skill}' not found.")
-            return False, "error"
-
-        # Check if any player uses this skill level before removing
-        for team_id, team in self.data['teams'].items():
-            for player_id, player in team['players'].items():
-                if player['skill'] == skill:
-                    messagebox.showerror("Cannot Remove",
-                                         f"Cannot remove skill level '{skill}' because player '{player['name']}' in team '{team['name']}' uses it. Please update or remove affected players first.")
-                    return False, "error"
-
-        if not messagebox.askyesno("Confirm Removal", f"Are you sure you want to remove skill level '{skill}'?"):
-            return False, "cancelled"
-
-        self.data['skill_levels'].remove(skill)
-        self._save_data()
-        return True, f"Skill level '{skill}' removed successfully!"
-
-    # --- Tournament Mode ---
-    def record_match(self, team1_id, team2_id, sub_matches_data):
-        """Records a match between two teams, including detailed sub-matches."""
-        if team1_id == team2_id:
-            messagebox.showerror("Invalid Match", "Cannot record a match between the same team.")
-            return False, "error"
-        if team1_id not in self.data['teams'] or team2_id not in self.data['teams']:
-            messagebox.showerror("Error", "One or both selected teams not found.")
-            return False, "error"
-        if not sub_matches_data:
-            messagebox.showerror("Input Error", "Cannot record a match with no sub-matches.")
-            return False, "error"
-
-        team1_sub_match_wins = 0
-        team2_sub_match_wins = 0
-        
-        # Determine overall team winner based on sub-match wins
-        for sub_match in sub_matches_data:
-            if not sub_match.get('winner_player_ids'): # Handle cases where a sub-match might be a draw or no winner specified
-                continue 
-            
-            # Check if any winning player belongs to team 1 or team 2
-            team1_player_in_winners = any(pid in self.data['teams'][team1_id]['players'] for pid in sub_match['winner_player_ids'])
-            team2_player_in_winners = any(pid in self.data['teams'][team2_id]['players'] for pid in sub_match['winner_player_ids'])
-
-            if team1_player_in_winners and not team2_player_in_winners:
-                team1_sub_match_wins += 1
-            elif team2_player_in_winners and not team1_player_in_winners:
-                team2_sub_match_wins += 1
-            # If both have winners (e.g., in doubles where players from each side win points, or a bug), it's a draw for the sub-match.
-            # For simplicity here, we count unique team wins.
-
-        winner_id = None
-        if team1_sub_match_wins > team2_sub_match_wins:
-            winner_id = team1_id
-        elif team2_sub_match_wins > team1_sub_match_wins:
-            winner_id = team2_id
-
-        match_id = str(uuid.uuid4())
-        self.data['matches'][match_id] = {
-            'team1_id': team1_id,
-            'team2_id': team2_id,
-            'team1_name': self.data['teams'][team1_id]['name'],
-            'team2_name': self.data['teams'][team2_id]['name'],
-            'sub_matches': sub_matches_data,
-            'timestamp': datetime.now().isoformat(),
-            'winner_name': self.data['teams'][winner_id]['name'] if winner_id else 'Draw',
-            'winner_id': winner_id,
-            'team1_sub_match_wins': team1_sub_match_wins,
-            'team2_sub_match_wins': team2_sub_match_wins
-        }
-        self._save_data()
-        team1_name = self.data['teams'][team1_id]['name']
-        team2_name = self.data['teams'][team2_id]['name']
-        winner_display = self.data['teams'][winner_id]['name'] if winner_id else 'Draw'
-        return True, f"Match between {team1_name} and {team2_name} recorded. Team Winner: {winner_display} ({team1_sub_match_wins}-{team2_sub_match_wins} sub-matches)."
-
-    def delete_match(self, match_id):
-        """Deletes a match by its ID."""
-        if match_id not in self.data['matches']:
-            return False, "Match not found."
-    
-        del self.data['matches'][match_id]
-        self._save_data()
-        return True, "Match deleted successfully."
-
-    def update_match(self, match_id, new_sub_matches):
-        """Updates the sub-matches of an existing match."""
-        if match_id not in self.data['matches']:
-            return False, "Match not found."
-
-        match = self.data['matches'][match_id]
-        team1_id = match['team1_id']
-        team2_id = match['team2_id']
-
-        # Recalculate wins
-        team1_sub_match_wins = 0
-        team2_sub_match_wins = 0
-
-        for sub_match in new_sub_matches:
-            if not sub_match.get('winner_player_ids'):
-                continue
-            team1_player_in_winners = any(pid in self.data['teams'][team1_id]['players'] for pid in sub_match['winner_player_ids'])
-            team2_player_in_winners = any(pid in self.data['teams'][team2_id]['players'] for pid in sub_match['winner_player_ids'])
-
-            if team1_player_in_winners and not team2_player_in_winners:
-                team1_sub_match_wins += 1
-            elif team2_player_in_winners and not team1_player_in_winners:
-                team2_sub_match_wins += 1
-
-        winner_id = None
-        if team1_sub_match_wins > team2_sub_match_wins:
-            winner_id = team1_id
-        elif team2_sub_match_wins > team1_sub_match_wins:
-            winner_id = team2_id
-
-        match['sub_matches'] = new_sub_matches
-        match['team1_sub_match_wins'] = team1_sub_match_wins
-        match['team2_sub_match_wins'] = team2_sub_match_wins
-        match['winner_id'] = winner_id
-
-        self._save_data()
-        return True, "Match updated successfully."
-    
-    def calculate_standings(self):
-        """Calculates and returns current tournament standings."""
-        standings = {}
-        for team_id, team in self.data['teams'].items():
-            standings[team_id] = {
-                'name': team['name'],
-                'wins': 0,
-                'losses': 0,
-                'draws': 0,
-                'matches_played': 0
-            }
-
-        for match_id, match in self.data['matches'].items():
-            t1_id = match['team1_id']
-            t2_id = match['team2_id']
-
-            if t1_id in standings:
-                standings[t1_id]['matches_played'] += 1
-            if t2_id in standings:
-                standings[t2_id]['matches_played'] += 1
-
-            winner_id = match['winner_id']
-            if winner_id == t1_id and t1_id in standings:
-                standings[t1_id]['wins'] += 1
-                if t2_id in standings: standings[t2_id]['losses'] += 1
-            elif winner_id == t2_id and t2_id in standings:
-                standings[t2_id]['wins'] += 1
-                if t1_id in standings: standings[t1_id]['losses'] += 1
-            elif winner_id is None and t1_id in standings and t2_id in standings:  # Draw
-                standings[t1_id]['draws'] += 1
-                standings[t2_id]['draws'] += 1
-
-        sorted_standings = sorted(standings.values(), key=lambda x: x['wins'], reverse=True)
-        self.db.collection('leaderboard').document('teams').set({'standings': sorted_standings})
-        return sorted_standings
-
-    def calculate_player_points(self):
-        """Calculates and returns individual player points based on sub-match wins."""
-        player_points = {}
-        for team_id, team_data in self.data['teams'].items():
-            for player_id, player_data in team_data['players'].items():
-                player_points[player_id] = {
-                    'name': player_data['name'],
-                    'team_name': team_data['name'],
-                    'points': 0
-                }
-        
-        for match_id, match_data in self.data['matches'].items():
-            for sub_match in match_data.get('sub_matches', []):
-                for winner_player_id in sub_match.get('winner_player_ids', []):
-                    if winner_player_id in player_points:
-                        player_points[winner_player_id]['points'] += 1
-        
-        sorted_player_points = sorted(player_points.values(), key=lambda x: x['points'], reverse=True)
-        self.db.collection('leaderboard').document('players').set({'players': sorted_player_points})
-        return sorted_player_points
-
-    def get_match_history(self):
-        """Returns a list of all recorded matches."""
-        all_matches_with_ids = [(match_id, match_data) for match_id, match_data in self.data['matches'].items()]
-
-        sorted_matches = sorted(all_matches_with_ids, key=lambda x: x[1]['timestamp'], reverse=True)
-    
-        display_matches = []
-        for match_id, match in sorted_matches:
-            team1_name = self.data['teams'].get(match['team1_id'], {}).get('name', 'Unknown Team 1')
-            team2_name = self.data['teams'].get(match['team2_id'], {}).get('name', 'Unknown Team 2')
-            
-            winner_name = 'Draw'
-            if match.get('winner_id'): # Use .get for robustness
-                winner_name = self.data['teams'].get(match['winner_id'], {}).get('name', 'Unknown Winner') 
-            
-            # Display overall sub-match score for the team match
-            sub_match_score = f"{match.get('team1_sub_match_wins', 0)}-{match.get('team2_sub_match_wins', 0)}"
-            
-            match_date = datetime.fromisoformat(match['timestamp']).strftime('%Y-%m-%d %H:%M')
-            display_matches.append({
-                'date': match_date,
-                'team1_name': team1_name,
-                'score': sub_match_score, # Now shows sub-match score
-                'team2_name': team2_name,
-                'winner_name': winner_name,
-                'id': match_id
-            })
-        return display_matches
+    def show_kept(self):
+        """Shows the kept messages; call it on the Tk thread."""
+        for show, title, message in self.kept:
+            show(title, message)
 
 
 class TournamentApp:
-    def __init__(self, master):
-        self.manager = TournamentManager()
+    SHARED_POLL_MS = 3000
+    PLAYER_RECENT_MATCHES = 20
+    HISTORY_CHUNK = 500  # history rows inserted per event-loop turn, so a long history doesn't stall the window
+    STARTUP_DELAY_MS = 50  # lets the window appear before the data loads
+    TAB_SETUP = {"Teams": "_setup_teams_tab", "Tournament": "_setup_tournament_tab", "Fixtures": "_setup_fixtures_tab",
+                 "Bracket": "_setup_bracket_tab", "Leaderboards": "_setup_leaderboards_tab",
+                 "History": "_setup_history_tab", "Settings": "_setup_settings_tab"}
+    RANK_CHART_LINES = 10  # the teams or players drawn in the rank progression chart, best final rank first
+    RANK_CHART_COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+                         "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf")
+
+    def __init__(self, master, shared=False):
+        self.manager = None  # loaded by _start, once the window is up
+        self.shared = shared
         self.master = master
         master.title("Tournament Management App")
         master.geometry("1100x800")  # Adjusted window size for more content
@@ -497,39 +88,124 @@ class TournamentApp:
             foreground=[("selected", "#ffffff")]
         )
 
-        # Status Bar
-        self.status_label = ctk.CTkLabel(master, text="", anchor="w", text_color="gray", font=ctk.CTkFont(size=12, weight="bold"))
-        self.status_label.pack(side="bottom", fill="x", padx=10, pady=5)
+        # Status Bar, with undo/redo (also Ctrl+Z / Ctrl+Y)
+        status_bar = ctk.CTkFrame(master, fg_color="transparent")
+        status_bar.pack(side="bottom", fill="x")
+        self.redo_button = ctk.CTkButton(status_bar, text="Redo", width=70, command=self._redo, state="disabled")
+        self.redo_button.pack(side="right", padx=(0, 10), pady=5)
+        self.undo_button = ctk.CTkButton(status_bar, text="Undo", width=70, command=self._undo, state="disabled")
+        self.undo_button.pack(side="right", padx=5, pady=5)
+        self.status_label = ctk.CTkLabel(status_bar, text="Loading tournament data...", anchor="w", text_color="gray", font=ctk.CTkFont(size=12, weight="bold"))
+        self.status_label.pack(side="left", fill="x", expand=True, padx=10, pady=5)
         self.status_timeout_id = None
+        # Busy indicator for work on the background threads, shown by _show_busy
+        self.busy_cancel_button = ctk.CTkButton(status_bar, text="Cancel", width=70, command=self._cancel_background)
+        self.busy_progress = ctk.CTkProgressBar(status_bar, mode="indeterminate", width=120)
+        self.busy_label = ctk.CTkLabel(status_bar, text="", text_color="gray", font=ctk.CTkFont(size=12))
+        self._history_fill_id = None
 
         # Main Notebook (Tabs)
         self.notebook = ctk.CTkTabview(master)
         self.notebook.pack(expand=True, fill='both', padx=10, pady=10)
 
-        # Teams Tab
-        self.teams_frame = self.notebook.add("Teams")
-        self._setup_teams_tab()
-
-        # Tournament Tab
-        self.tournament_frame = self.notebook.add("Tournament")
-        self._setup_tournament_tab()
-
-        self._setup_leaderboards_tab()
-        
-        # Initial data load and UI update
-        self.update_teams_treeview()
-        self.update_players_treeview()
-        self.update_skill_levels_listbox()
-        self.update_tournament_tab()
-        self.update_leaderboards_tab()
-        self._setup_history_tab()
-        self._setup_settings_tab()
-
+        # Only the empty tabs for now: a tab's widgets are built, and first filled, when it is first shown
+        for name in self.TAB_SETUP:
+            self.notebook.add(name)
+        self._built_tabs = set()
+        self.selected_team_id = None
+        self.selected_player_id = None
         self.notebook.configure(command=self._on_tab_change)
-        self._update_latest_match_display()
+        self.master.after(self.STARTUP_DELAY_MS, self._start)
+
+    def _start(self):
+        """Loads the data on the background thread; _loaded then builds and fills the tab being shown."""
+        self.background = background.BackgroundExecutor(self.master)
+        # Reports take minutes, so they have a worker of their own rather than holding up saves and refreshes
+        self.report_background = background.BackgroundExecutor(self.master)
+        self.background.on_change = self.report_background.on_change = self._on_background_change
+        # Bound before the load, so closing the window during it waits for the load instead of cutting it off
+        self.master.protocol("WM_DELETE_WINDOW", self._on_close)
+        notifier = DeferredNotifier()
+        self.background.submit("Loading tournament data", self._load_manager, notifier, cancellable=False,
+                               on_done=lambda manager: self._loaded(manager, notifier))
+
+    def _load_manager(self, notifier):
+        return TournamentManager(shared=self.shared, notifier=notifier)
+
+    def _loaded(self, manager, notifier):
+        self.manager = manager
+        self.manager.notifier = messagebox
+        notifier.show_kept()
+        self._freeze_loaded_data()
+        self.manager.background = self.background
+        self.manager.on_reload = self._show_shared_changes
+        self.undo_button.configure(state="normal")
+        self.redo_button.configure(state="normal")
+        self.master.bind("<Control-z>", lambda event: self._undo())
+        self.master.bind("<Control-y>", lambda event: self._redo())
+        self.master.bind("<Control-Shift-Z>", lambda event: self._redo())
+        self._clear_status_message()
+        self._on_tab_change()
+        if self.shared:
+            self.master.after(self.SHARED_POLL_MS, self._poll_shared_data)
+
+    def _freeze_loaded_data(self):
+        # The loaded records live as long as the app. Left to the cyclic GC, every
+        # full collection walks all of them while holding the GIL, which stalls the
+        # Tk thread for a few hundred ms when a background save triggers one.
+        gc.collect()
+        gc.freeze()
+
+    def _on_background_change(self, label):
+        self._show_busy(self.background.busy_label or self.report_background.busy_label)
+
+    def _show_busy(self, label):
+        """Shows what the background thread is doing, or hides the indicator when it is idle."""
+        if label is None:
+            if self.busy_progress.winfo_ismapped():
+                self.busy_progress.stop()
+                for widget in (self.busy_cancel_button, self.busy_progress, self.busy_label):
+                    widget.pack_forget()
+            return
+        self.busy_label.configure(text=f"{label}...")
+        if not self.busy_progress.winfo_ismapped():
+            self.busy_cancel_button.pack(side="right", padx=5, pady=5)
+            self.busy_progress.pack(side="right", padx=5, pady=5)
+            self.busy_label.pack(side="right", padx=5, pady=5)
+            self.busy_progress.start()
+
+    def _cancel_background(self):
+        self.background.cancel_all()
+        self.show_status_message("Cancelled.", color="orange")
+
+    def _on_close(self):
+        """Lets pending saves finish before the window goes."""
+        self.background.cancel_all()
+        self.background.shutdown()
+        self.report_background.shutdown()
+        self.master.destroy()
+
+    def _is_built(self, tab):
+        """Whether a tab has been shown yet. Updates to a tab that hasn't are skipped; it is filled when shown."""
+        return tab in self._built_tabs
+
+    def _poll_shared_data(self):
+        """Looks for results committed by other desks; they are read on the background thread."""
+        self.manager.reload_if_changed()
+        self.master.after(self.SHARED_POLL_MS, self._poll_shared_data)
+
+    def _show_shared_changes(self):
+        """Shows other desks' changes once taken in, keeping the selected team if it still exists."""
+        selected_team_id = self.selected_team_id
+        self._refresh_all_tabs()
+        if selected_team_id in self.manager.data['teams']:
+            self.selected_team_id = selected_team_id
+            self.update_players_treeview()
 
     def _update_latest_match_display(self):
-        history = self.manager.get_match_history()
+        if not self._is_built("Tournament"):
+            return
+        history, _ = self.manager.query_matches(per_page=1)
         if not history:
             self.latest_match_label.configure(text="No matches yet.")
             return
@@ -549,8 +225,7 @@ class TournamentApp:
 
         # Confirm actual reset
         if messagebox.askyesno("Confirm Reset", "This will delete all tournament data — teams, players, matches. Are you sure?"):
-            self.manager.data = self.manager._default_data()
-            self.manager._save_data()
+            self.manager.replace_data(self.manager._default_data())
             self.update_teams_treeview()
             self.update_players_treeview()
             self.update_tournament_tab()
@@ -560,7 +235,7 @@ class TournamentApp:
         
 
     def _setup_settings_tab(self):
-        self.settings_frame = self.notebook.add("Settings")
+        self.settings_frame = self.notebook.tab("Settings")
 
         ctk.CTkLabel(self.settings_frame, text="App Settings", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=10)
 
@@ -573,42 +248,345 @@ class TournamentApp:
         # reset Tournament
         ctk.CTkButton(self.settings_frame, text="Reset Tournament", command=self._reset_tournament_data).pack(pady=10)
 
+        # Seasons
+        ctk.CTkLabel(self.settings_frame, text="Seasons", font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(20, 5))
+
+        self.active_season_label = ctk.CTkLabel(self.settings_frame, text="")
+        self.active_season_label.pack(pady=2)
+
+        seasons_frame = ctk.CTkFrame(self.settings_frame, fg_color="transparent")
+        seasons_frame.pack(pady=5)
+
+        self.season_combobox = ctk.CTkComboBox(seasons_frame, values=[], state="readonly", width=200)
+        self.season_combobox.pack(side="left", padx=5)
+        ctk.CTkButton(seasons_frame, text="Switch", width=80, command=self._switch_season).pack(side="left", padx=5)
+        ctk.CTkButton(seasons_frame, text="Standings", width=80, command=self._show_season_standings).pack(side="left", padx=5)
+        ctk.CTkButton(seasons_frame, text="New Season", width=100, command=self._open_new_season_dialog).pack(side="left", padx=5)
+
+        ctk.CTkButton(self.settings_frame, text="Cross-Season Player Stats", command=self._show_cross_season_stats).pack(pady=5)
+        self._update_seasons_section()
+
+        # Archive
+        ctk.CTkLabel(self.settings_frame, text="Archive", font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(20, 5))
+
+        archive_frame = ctk.CTkFrame(self.settings_frame, fg_color="transparent")
+        archive_frame.pack(pady=5)
+
+        ctk.CTkLabel(archive_frame, text="Played Before (YYYY-MM-DD):").pack(side="left", padx=5)
+        self.archive_cutoff_entry = ctk.CTkEntry(archive_frame, width=110)
+        self.archive_cutoff_entry.pack(side="left", padx=5)
+        ctk.CTkButton(archive_frame, text="Archive Old Matches", command=self._archive_old_matches).pack(side="left", padx=5)
+
+        # Reports
+        ctk.CTkLabel(self.settings_frame, text="Reports", font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(20, 5))
+
+        reports_frame = ctk.CTkFrame(self.settings_frame, fg_color="transparent")
+        reports_frame.pack(pady=5)
+
+        self.report_pdf_checkbox = ctk.CTkCheckBox(reports_frame, text="Also PDF")
+        self.report_pdf_checkbox.pack(side="left", padx=5)
+        self.report_button = ctk.CTkButton(reports_frame, text="Generate Season Reports", command=self._generate_reports)
+        self.report_button.pack(side="left", padx=5)
+
+        # Diagnostics
+        ctk.CTkLabel(self.settings_frame, text="Diagnostics", font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(20, 5))
+
+        diagnostics_frame = ctk.CTkFrame(self.settings_frame, fg_color="transparent")
+        diagnostics_frame.pack(pady=5)
+
+        self.instrumentation_checkbox = ctk.CTkCheckBox(diagnostics_frame, text="Record Timings",
+                                                        command=self._toggle_instrumentation)
+        self.instrumentation_checkbox.pack(side="left", padx=5)
+        if instrumentation.monitor.enabled:
+            self.instrumentation_checkbox.select()
+
+        ctk.CTkLabel(diagnostics_frame, text="Slow Threshold (ms):").pack(side="left", padx=(15, 5))
+        self.slow_threshold_entry = ctk.CTkEntry(diagnostics_frame, width=70)
+        self.slow_threshold_entry.insert(0, str(instrumentation.monitor.slow_threshold_ms))
+        self.slow_threshold_entry.pack(side="left", padx=5)
+        ctk.CTkButton(diagnostics_frame, text="Apply", width=60, command=self._apply_slow_threshold).pack(side="left", padx=5)
+
+        ctk.CTkButton(self.settings_frame, text="Show Timings", command=self._show_timings).pack(pady=5)
+        ctk.CTkButton(self.settings_frame, text="Reset Timings", command=self._reset_timings).pack(pady=5)
+        ctk.CTkButton(self.settings_frame, text="Check Player References", command=self._show_orphaned_references).pack(pady=5)
+
+    def _update_seasons_section(self):
+        if not self._is_built("Settings"):
+            return
+        season_list = self.manager.get_seasons()
+        self.season_ids_map = {name: season_id for season_id, name, _ in season_list}
+        self.season_combobox.configure(values=[name for _, name, _ in season_list])
+        active_name = self.manager.get_active_season_name()
+        self.season_combobox.set(active_name)
+        self.active_season_label.configure(text=f"Active Season: {active_name}")
+
+    def _switch_season(self):
+        season_id = self.season_ids_map.get(self.season_combobox.get())
+        if not season_id:
+            return
+        success, message = self.manager.switch_season(season_id)
+        if success:
+            self._refresh_all_tabs()
+            self.show_status_message(message)
+        else:
+            self.show_status_message(message, color="red")
+
+    def _open_new_season_dialog(self):
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title("New Season")
+        dialog.transient(self.master)
+        dialog.grab_set()
+        dialog.focus_set()
+        dialog.resizable(False, False)
+
+        frame = ctk.CTkFrame(dialog, corner_radius=10)
+        frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        ctk.CTkLabel(frame, text="Season Name:", font=ctk.CTkFont(size=13, weight="bold")).grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        name_entry = ctk.CTkEntry(frame, width=250)
+        name_entry.grid(row=0, column=1, padx=5, pady=5)
+        name_entry.focus_set()
+
+        carry_over_checkbox = ctk.CTkCheckBox(frame, text="Keep current teams and players")
+        carry_over_checkbox.select()
+        carry_over_checkbox.grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+
+        def create_season_action():
+            success, message = self.manager.create_season(name_entry.get().strip(), bool(carry_over_checkbox.get()))
+            if success:
+                self._refresh_all_tabs()
+                self.show_status_message(message)
+                dialog.destroy()
+            else:
+                self.show_status_message(message, color="red")
+
+        ctk.CTkButton(frame, text="Create Season", command=create_season_action).grid(row=2, column=0, columnspan=2, pady=15)
+        dialog.bind("<Return>", lambda event: create_season_action())
+
+    def _show_season_standings(self):
+        season_name = self.season_combobox.get()
+        season_id = self.season_ids_map.get(season_name)
+        if not season_id:
+            return
+        standings = self.manager.get_season_standings(season_id)
+
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title(f"Standings: {season_name}")
+        dialog.geometry("800x500")
+
+        tree = ttk.Treeview(dialog, columns=("Team", "Wins", "Losses", "Draws", "Played"), show="headings")
+        for col in ("Team", "Wins", "Losses", "Draws", "Played"):
+            tree.heading(col, text=col)
+            tree.column(col, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        if not standings:
+            tree.insert("", "end", values=("No teams in this season", "", "", "", ""))
+        for team_stats in standings:
+            tree.insert("", "end", values=(team_stats['name'], team_stats['wins'], team_stats['losses'],
+                                           team_stats['draws'], team_stats['matches_played']))
+
+        ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
+
+    def _show_cross_season_stats(self):
+        stats = self.manager.get_cross_season_player_stats()
+
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title("Cross-Season Player Stats")
+        dialog.geometry("900x500")
+
+        tree = ttk.Treeview(dialog, columns=("Player", "Team", "Seasons", "Sub-Matches", "Points"), show="headings")
+        for col in ("Player", "Team", "Seasons", "Sub-Matches", "Points"):
+            tree.heading(col, text=col)
+            tree.column(col, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        if not stats:
+            tree.insert("", "end", values=("No players yet", "", "", "", ""))
+        for player in stats:
+            tree.insert("", "end", values=(player['name'], player['team_name'], player['seasons'],
+                                           player['sub_matches'], player['points']))
+
+        ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
+
+    def _undo(self):
+        self._show_undo_result(*self.manager.undo())
+
+    def _redo(self):
+        self._show_undo_result(*self.manager.redo())
+
+    def _show_undo_result(self, success, message):
+        if not success:
+            self.show_status_message(message, color="gray")
+            return
+        selected_team_id = self.selected_team_id
+        self._refresh_all_tabs()
+        if selected_team_id in self.manager.data['teams']:
+            self.selected_team_id = selected_team_id
+            self.update_players_treeview()
+        self.show_status_message(message, duration_ms=3000)
+
+    def _refresh_all_tabs(self):
+        """Reloads every tab after the underlying data has been swapped out."""
+        self.selected_team_id = None
+        self.update_teams_treeview()
+        self.update_players_treeview()
+        self.update_skill_levels_listbox()
+        self.update_tournament_tab()
+        self.update_fixtures_tab()
+        self.update_bracket_tab()
+        self.update_leaderboards_tab()
+        self.update_history_tab()
+        self._update_latest_match_display()
+        self._update_seasons_section()
+
+    def _toggle_instrumentation(self):
+        if self.instrumentation_checkbox.get():
+            instrumentation.monitor.enable(instrumentation_targets())
+            self.show_status_message("Timing instrumentation enabled.")
+        else:
+            instrumentation.monitor.disable()
+            self.show_status_message("Timing instrumentation disabled.", color="orange")
+
+    def _archive_old_matches(self):
+        try:
+            cutoff = datetime.strptime(self.archive_cutoff_entry.get().strip(), '%Y-%m-%d')
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Enter the cutoff date as YYYY-MM-DD.")
+            return
+        if not messagebox.askyesno("Confirm Archive",
+                                   f"Move all matches played before {cutoff:%Y-%m-%d} into the archive?\n"
+                                   "They will no longer be editable."):
+            return
+        success, message = self.manager.archive_matches(cutoff)
+        if success:
+            self.update_history_tab()
+            self._update_latest_match_display()
+            self.show_status_message(message)
+        elif message != "error":
+            self.show_status_message(message, color="orange")
+
+    def _generate_reports(self):
+        """Renders every team and player report in worker processes, showing progress in the status bar."""
+        out_dir = filedialog.askdirectory(title="Save Reports To")
+        if not out_dir:
+            return
+        # The snapshot is taken here, so changes made while the reports render don't reach them
+        view = self.manager.snapshot()
+        view.notifier = DeferredNotifier()
+        pdf = bool(self.report_pdf_checkbox.get())
+
+        def run(task):
+            def progress(done, total):
+                task.label = f"Generating reports: {done}/{total} teams"
+            return view.generate_reports(out_dir, pdf=pdf, progress=progress)
+
+        def done(result):
+            self.report_button.configure(state="normal")
+            view.notifier.show_kept()
+            success, message = result
+            if success:
+                self.show_status_message(message, duration_ms=4000)
+
+        def failed(error):
+            self.report_button.configure(state="normal")
+            messagebox.showerror("Report Error", str(error))
+
+        self.report_button.configure(state="disabled")
+        self.report_background.submit("Generating reports", run, on_done=done, on_error=failed, cancellable=False,
+                                      pass_task=True)
+
+    def _show_orphaned_references(self):
+        """Lists sub-matches that name players who are no longer on any team."""
+        rows = self.manager.get_orphaned_references()
+        if not rows:
+            messagebox.showinfo("Player References", "Every sub-match player is on a team roster.")
+            return
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title("Player References")
+        dialog.geometry("900x400")
+
+        textbox = ctk.CTkTextbox(dialog, font=("Courier", 12), wrap="none")
+        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        textbox.insert("end", f"{len(rows)} sub-match reference(s) to players on no team:\n\n")
+        for row in rows:
+            textbox.insert("end", f"{row['timestamp'][:16].replace('T', ' ')}  {row['team1_name']} vs {row['team2_name']}"
+                                  f"  sub-match {row['position'] + 1}  player {row['player_id']}\n")
+        textbox.configure(state="disabled")
+
+    def _apply_slow_threshold(self):
+        try:
+            instrumentation.monitor.slow_threshold_ms = float(self.slow_threshold_entry.get())
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Slow threshold must be a number of milliseconds.")
+            return
+        self.show_status_message("Slow operation threshold updated.")
+
+    def _show_timings(self):
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title("Timings")
+        dialog.geometry("1000x500")
+
+        textbox = ctk.CTkTextbox(dialog, font=("Courier", 12), wrap="none")
+        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        if instrumentation.monitor.histograms:
+            textbox.insert("end", instrumentation.monitor.dump())
+        else:
+            textbox.insert("end", "No timings recorded. Enable 'Record Timings' and use the app first.")
+        textbox.configure(state="disabled")
+
+        ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
+
+    def _reset_timings(self):
+        instrumentation.monitor.reset()
+        self.show_status_message("Timings cleared.")
+
 
     def _export_tournament_data(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
         if file_path:
-            with open(file_path, 'w') as f:
-                json.dump(self.manager.data, f, indent=4)
-            self.show_status_message("Tournament data exported.")
+            def write(data):
+                with open(file_path, 'w') as f:
+                    json.dump(model.plain(data), f, indent=4)
+
+            self.background.submit("Exporting", write, self.manager.snapshot().data,
+                                   on_done=lambda _: self.show_status_message("Tournament data exported."),
+                                   on_error=lambda e: messagebox.showerror("Export Error", f"Could not export data: {e}"))
 
     def _import_tournament_data(self):
         file_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
         if file_path:
-            try:
+            # The file is read and parsed on the background thread; the data is swapped in here
+            def read():
                 with open(file_path, 'r') as f:
-                    imported_data = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                messagebox.showerror("Invalid File", "Could not read or parse the selected file.")
-                return
+                    return json.load(f)
 
-            required_keys = ['teams', 'matches', 'skill_levels']
-            if not all(k in imported_data for k in required_keys):
-                messagebox.showerror("Invalid File", f"Selected file is missing required tournament data keys: {required_keys}")
-                return
-            self.manager.data = imported_data
-            self.manager._save_data()
-            self.update_teams_treeview()
-            self.update_players_treeview()
-            self.update_tournament_tab()
-            self.update_leaderboards_tab()
-            self.show_status_message("Tournament data imported.")
-            self.show_status_message("Tournament Imported Successfully", duration_ms=1500, color="green")
+            self.background.submit("Reading import file", read, on_done=self._finish_import,
+                                   on_error=lambda e: messagebox.showerror("Invalid File", "Could not read or parse the selected file."))
+
+    def _finish_import(self, imported_data):
+        required_keys = ['teams', 'matches', 'skill_levels']
+        if not all(k in imported_data for k in required_keys):
+            messagebox.showerror("Invalid File", f"Selected file is missing required tournament data keys: {required_keys}")
+            return
+        self.manager.replace_data(imported_data)
+        self._freeze_loaded_data()
+        self.update_teams_treeview()
+        self.update_players_treeview()
+        self.update_tournament_tab()
+        self.update_leaderboards_tab()
+        self.show_status_message("Tournament data imported.")
+        self.show_status_message("Tournament Imported Successfully", duration_ms=1500, color="green")
 
     def _on_history_double_click(self, event):
         item = self.history_treeview.identify_row(event.y)
         if not item:
             return
 
+        if item.startswith("archive:"):
+            self._show_archived_matches(item[len("archive:"):])
+            return
+
         match_date = self.history_treeview.item(item, "values")[0]
         team1 = self.history_treeview.item(item, "values")[1]
         team2 = self.history_treeview.item(item, "values")[3]
@@ -622,20 +600,10 @@ class TournamentApp:
 
     def _on_standings_double_click(self, event):
         item = self.big_standings_treeview.identify_row(event.y)
-        if not item:
+        if not item or item not in self.manager.data['teams']:
             return
 
-        team_name = self.big_standings_treeview.item(item, "values")[0]
-        self._show_team_match_history_details(team_name)
-
-
-    def _on_standings_double_click(self, event):
-        item = self.big_standings_treeview.identify_row(event.y)
-        if not item:
-            return
-
-        team_name = self.big_standings_treeview.item(item, "values")[0]
-        self._show_team_match_history_details(team_name)
+        self._show_team_match_history_details(item)
 
 
     def _show_match_details(self, match_id):
@@ -643,7 +611,36 @@ class TournamentApp:
         if not match:
             messagebox.showerror("Not Found", "Match record not found.")
             return
+        self._show_match_record(match)
+
+    def _show_archived_matches(self, segment_id):
+        rows, matches = self.manager.get_archived_matches(segment_id)
+        if not rows:
+            return
 
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title("Archived Matches")
+        dialog.geometry("1000x500")
+
+        tree = ttk.Treeview(dialog, columns=("Date", "Team1", "Score", "Team2", "Winner"), show="headings")
+        for col in ("Date", "Team1", "Score", "Team2", "Winner"):
+            tree.heading(col, text=col)
+            tree.column(col, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        for match in rows:
+            tree.insert("", "end", iid=match['id'], values=(
+                match['date'], match['team1_name'], match['score'], match['team2_name'], match['winner_name']))
+
+        def on_double_click(event):
+            item = tree.identify_row(event.y)
+            if item in matches:
+                self._show_match_record(matches[item])
+
+        tree.bind("<Double-1>", on_double_click)
+        ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
+
+    def _show_match_record(self, match):
         dialog = ctk.CTkToplevel(self.master)
         dialog.title(f"Match Details: {match['team1_name']} vs {match['team2_name']}")
         dialog.geometry("1000x550")
@@ -659,8 +656,8 @@ class TournamentApp:
         ctk.CTkLabel(dialog, text=f"{match_date}",
              font=("Helvetica", 16)).pack(pady=(0, 5))
 
-        tree = ttk.Treeview(dialog, columns=("Type", "Player1", "Player2", "Winner"), show="headings")
-        for col in ("Type", "Player1", "Player2", "Winner"):
+        tree = ttk.Treeview(dialog, columns=("Type", "Player1", "Player2", "Winner", "Games"), show="headings")
+        for col in ("Type", "Player1", "Player2", "Winner", "Games"):
             tree.heading(col, text=col)
             tree.column(col, anchor="center")
         tree.pack(pady=5)
@@ -670,16 +667,76 @@ class TournamentApp:
             team2_names = ", ".join([self.manager.get_player_name(pid) for pid in sm.get('team2_player_ids', [])])
             winner_names = ", ".join([self.manager.get_player_name(pid) for pid in sm.get('winner_player_ids', [])])
 
-            tree.insert("", "end", values=(sm['type'], team1_names, team2_names, winner_names))
+            tree.insert("", "end", values=(sm['type'], team1_names, team2_names, winner_names,
+                                           game_scores.format_scores(sm.get('games'))))
 
         ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
 
 
-    def _show_team_match_history_details(self, team_name):
-        history = self.manager.get_match_history()
-        matches_for_team = [m for m in history if m['team1_name'] == team_name or m['team2_name'] == team_name]
+    def _on_player_leaderboard_double_click(self, event):
+        item = self.big_player_treeview.identify_row(event.y)
+        if item and self.manager.get_player_name(item) != "Unknown Player":
+            self._show_player_details(item)
+
+    def _on_player_double_click(self, event):
+        item = self.players_treeview.identify_row(event.y)
+        if item:
+            self._show_player_details(item)
+
+    def _show_player_details(self, player_id):
+        player_name = self.manager.get_player_name(player_id)
+
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title(f"Player Details: {player_name}")
+        dialog.geometry("800x800")
+
+        ctk.CTkLabel(dialog, text=player_name, font=("Helvetica", 20, "bold")).pack(pady=(10, 5))
+
+        for title, first_col, records in (
+                ("Best Partners", "Partner", self.manager.get_best_partners(player_id)),
+                ("Nemesis Opponents", "Opponent", self.manager.get_nemesis_opponents(player_id))):
+            ctk.CTkLabel(dialog, text=title, font=ctk.CTkFont(size=15, weight="bold")).pack(pady=5)
+            tree = ttk.Treeview(dialog, columns=(first_col, "Wins", "Losses", "Draws"), show="headings", height=6)
+            for col in (first_col, "Wins", "Losses", "Draws"):
+                tree.heading(col, text=col)
+                tree.column(col, anchor="center")
+            tree.pack(fill="both", expand=True, padx=10, pady=5)
+            if not records:
+                tree.insert("", "end", values=("No matches yet", "", "", ""))
+            for _, name, wins, losses, draws in records:
+                tree.insert("", "end", values=(name, wins, losses, draws))
+
+        ctk.CTkLabel(dialog, text="Recent Matches", font=ctk.CTkFont(size=15, weight="bold")).pack(pady=5)
+        columns = ("Date", "Type", "Opponents", "Result")
+        tree = ttk.Treeview(dialog, columns=columns, show="headings", height=6)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=5)
+        history, total = self.manager.query_matches(player_id=player_id, per_page=self.PLAYER_RECENT_MATCHES)
+        if not history:
+            tree.insert("", "end", values=("No matches yet", "", "", ""))
+        for match in history:
+            for sub_match in self.manager.get_player_sub_matches(player_id, match['id']):
+                own_side = 'team1_player_ids' if player_id in sub_match['team1_player_ids'] else 'team2_player_ids'
+                other_side = 'team2_player_ids' if own_side == 'team1_player_ids' else 'team1_player_ids'
+                opponents = ", ".join(self.manager.get_player_name(pid) for pid in sub_match[other_side])
+                if not sub_match['winner_player_ids']:
+                    result = "Draw"
+                else:
+                    result = "Won" if player_id in sub_match['winner_player_ids'] else "Lost"
+                tree.insert("", "end", values=(match['date'], sub_match['type'].capitalize(), opponents, result))
+        if total > len(history):
+            ctk.CTkLabel(dialog, text=f"Showing the latest {len(history)} of {total} matches").pack()
+
+        ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
+
+    def _show_team_match_history_details(self, team_id):
+        team_name = self.manager.data['teams'][team_id]['name']
+        history, _ = self.manager.query_matches(team_id=team_id)
+        archived = [segment['teams'][team_id] for segment in self.manager.data['archive'] if team_id in segment['teams']]
 
-        if not matches_for_team:
+        if not history and not archived:
             messagebox.showinfo("No Matches", f"No matches found for team '{team_name}'.")
             return
 
@@ -693,15 +750,19 @@ class TournamentApp:
             tree.column(col, anchor="center")
         tree.pack(fill="both", expand=True, padx=10, pady=10)
 
-        for match in matches_for_team:
-            opponent = match['team2_name'] if match['team1_name'] == team_name else match['team1_name']
+        for match in history:
+            is_team1 = self.manager.data['matches'][match['id']]['team1_id'] == team_id
+            opponent = match['team2_name'] if is_team1 else match['team1_name']
             tree.insert("", "end", values=(match['date'], opponent, match['score'], match['winner_name']))
+        if archived:
+            wins, losses, draws, played = (sum(record[i] for record in archived) for i in range(4))
+            tree.insert("", "end", values=("Archived", f"{played} matches", f"{wins}-{losses}-{draws} (W-L-D)", ""))
 
         ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
 
 
     def _setup_history_tab(self):
-        self.history_frame = self.notebook.add("History")
+        self.history_frame = self.notebook.tab("History")
 
         ctk.CTkLabel(self.history_frame, text="Match History", font=ctk.CTkFont(size=18, weight="bold")).pack(pady=10)
 
@@ -721,49 +782,223 @@ class TournamentApp:
         self.history_treeview.configure(yscrollcommand=scroll.set)
         
     def update_history_tab(self):
-        for i in self.history_treeview.get_children():
-            self.history_treeview.delete(i)
-
-        history = self.manager.get_match_history()
+        if not self._is_built("History"):
+            return
+        # Rows are built from a snapshot on the background thread, then inserted a chunk at a time
+        self.background.submit("Loading history", self.manager.snapshot().get_match_history, True,
+                               on_done=self._fill_history, key='history')
+
+    def _fill_history(self, history):
+        if self._history_fill_id is not None:
+            self.master.after_cancel(self._history_fill_id)
+            self._history_fill_id = None
+        self.history_treeview.delete(*self.history_treeview.get_children())
         if not history:
             self.history_treeview.insert("", "end", values=("No matches yet", "", "", "", ""))
             return
 
-        for match in history:
-            self.history_treeview.insert("", "end", values=(
-                match['date'],
-                match['team1_name'],
-                match['score'],
-                match['team2_name'],
-                match['winner_name']
+        def insert(start):
+            for match in history[start:start + self.HISTORY_CHUNK]:
+                self.history_treeview.insert("", "end", iid=match['id'], values=(
+                    match['date'],
+                    match['team1_name'],
+                    match['score'],
+                    match['team2_name'],
+                    match['winner_name']
+                ))
+            if start + self.HISTORY_CHUNK < len(history):
+                self._history_fill_id = self.master.after(1, insert, start + self.HISTORY_CHUNK)
+            else:
+                self._history_fill_id = None
+
+        insert(0)
+
+    def _setup_fixtures_tab(self):
+        self.fixtures_frame = self.notebook.tab("Fixtures")
+
+        ctk.CTkLabel(self.fixtures_frame, text="Fixtures", font=ctk.CTkFont(size=18, weight="bold")).pack(pady=10)
+
+        controls_frame = ctk.CTkFrame(self.fixtures_frame, fg_color="transparent")
+        controls_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(controls_frame, text="Tables:").pack(side="left", padx=(0, 5))
+        self.fixture_tables_entry = ctk.CTkEntry(controls_frame, width=60)
+        self.fixture_tables_entry.insert(0, "4")
+        self.fixture_tables_entry.pack(side="left", padx=(0, 15))
+
+        ctk.CTkLabel(controls_frame, text="Slot Length (min):").pack(side="left", padx=(0, 5))
+        self.fixture_slot_entry = ctk.CTkEntry(controls_frame, width=60)
+        self.fixture_slot_entry.insert(0, "30")
+        self.fixture_slot_entry.pack(side="left", padx=(0, 15))
+
+        self.fixture_double_round_checkbox = ctk.CTkCheckBox(controls_frame, text="Double Round")
+        self.fixture_double_round_checkbox.pack(side="left", padx=(0, 15))
+
+        ctk.CTkButton(controls_frame, text="Generate Fixtures", command=self._generate_fixtures).pack(side="left", padx=5)
+        ctk.CTkButton(controls_frame, text="Pair Swiss Round", command=self._generate_swiss_round).pack(side="left", padx=5)
+
+        self.fixtures_treeview = ttk.Treeview(self.fixtures_frame,
+                                              columns=("Round", "Time", "Table", "Team1", "Team2", "Result"),
+                                              show="headings")
+        for col in ("Round", "Time", "Table", "Team1", "Team2", "Result"):
+            self.fixtures_treeview.heading(col, text=col)
+            self.fixtures_treeview.column(col, anchor="center")
+        self.fixtures_treeview.pack(side="left", fill="both", expand=True, padx=10, pady=10)
+
+        scroll = ttk.Scrollbar(self.fixtures_frame, orient="vertical", command=self.fixtures_treeview.yview)
+        scroll.pack(side="right", fill="y")
+        self.fixtures_treeview.configure(yscrollcommand=scroll.set)
+
+    def _generate_fixtures(self):
+        try:
+            num_tables = int(self.fixture_tables_entry.get())
+            slot_minutes = int(self.fixture_slot_entry.get())
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Tables and slot length must be integers.")
+            return
+        success, message = self.manager.generate_fixtures(num_tables,
+                                                          double_round=bool(self.fixture_double_round_checkbox.get()),
+                                                          slot_minutes=slot_minutes)
+        if success:
+            self.show_status_message(message)
+            self.update_fixtures_tab()
+        elif message != "cancelled":
+            self.show_status_message(message, color="red")
+
+    def _generate_swiss_round(self):
+        try:
+            num_tables = int(self.fixture_tables_entry.get())
+            slot_minutes = int(self.fixture_slot_entry.get())
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Tables and slot length must be integers.")
+            return
+        success, message = self.manager.generate_swiss_round(num_tables, slot_minutes=slot_minutes)
+        if success:
+            self.show_status_message(message)
+            self.update_fixtures_tab()
+        else:
+            self.show_status_message(message, color="red")
+
+    def update_fixtures_tab(self):
+        if not self._is_built("Fixtures"):
+            return
+        for i in self.fixtures_treeview.get_children():
+            self.fixtures_treeview.delete(i)
+
+        fixtures = self.manager.get_fixtures()
+        if not fixtures:
+            self.fixtures_treeview.insert("", "end", values=("", "No fixtures scheduled", "", "", "", ""))
+            return
+
+        for fixture in fixtures:
+            self.fixtures_treeview.insert("", "end", iid=fixture['id'], values=(
+                fixture['round'],
+                fixture['time'],
+                fixture['table'],
+                fixture['team1_name'],
+                fixture['team2_name'],
+                fixture['result']
             ))
 
+    def _setup_bracket_tab(self):
+        self.bracket_frame = self.notebook.tab("Bracket")
+
+        ctk.CTkLabel(self.bracket_frame, text="Knockout Bracket", font=ctk.CTkFont(size=18, weight="bold")).pack(pady=10)
+
+        controls_frame = ctk.CTkFrame(self.bracket_frame, fg_color="transparent")
+        controls_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(controls_frame, text="Format:").pack(side="left", padx=(0, 5))
+        self.bracket_format_combobox = ctk.CTkComboBox(controls_frame,
+                                                       values=["Single Elimination", "Double Elimination"],
+                                                       state="readonly", width=180)
+        self.bracket_format_combobox.set("Single Elimination")
+        self.bracket_format_combobox.pack(side="left", padx=(0, 15))
+
+        ctk.CTkButton(controls_frame, text="Create Bracket from Standings", command=self._create_bracket).pack(side="left", padx=5)
+
+        self.bracket_champion_label = ctk.CTkLabel(controls_frame, text="", font=ctk.CTkFont(size=15, weight="bold"))
+        self.bracket_champion_label.pack(side="right", padx=10)
+
+        self.bracket_treeview = ttk.Treeview(self.bracket_frame,
+                                             columns=("Round", "Team1", "Team2", "Winner"),
+                                             show="headings")
+        for col in ("Round", "Team1", "Team2", "Winner"):
+            self.bracket_treeview.heading(col, text=col)
+            self.bracket_treeview.column(col, anchor="center")
+        self.bracket_treeview.pack(side="left", fill="both", expand=True, padx=10, pady=10)
+
+        scroll = ttk.Scrollbar(self.bracket_frame, orient="vertical", command=self.bracket_treeview.yview)
+        scroll.pack(side="right", fill="y")
+        self.bracket_treeview.configure(yscrollcommand=scroll.set)
+
+    def _create_bracket(self):
+        double_elimination = self.bracket_format_combobox.get() == "Double Elimination"
+        success, message = self.manager.create_bracket(double_elimination)
+        if success:
+            self.show_status_message(message)
+            self.update_bracket_tab()
+        elif message != "cancelled":
+            self.show_status_message(message, color="red")
+
+    def update_bracket_tab(self):
+        if not self._is_built("Bracket"):
+            return
+        for i in self.bracket_treeview.get_children():
+            self.bracket_treeview.delete(i)
+
+        rounds = self.manager.get_bracket_view()
+        if not rounds:
+            self.bracket_treeview.insert("", "end", values=("", "No bracket created yet", "", ""))
+            self.bracket_champion_label.configure(text="")
+            return
+
+        for label, matches in rounds:
+            for team1, team2, winner in matches:
+                if team1 == "BYE" and team2 == "BYE":
+                    continue
+                self.bracket_treeview.insert("", "end", values=(label, team1, team2, "" if winner == "TBD" else winner))
+
+        champion = self.manager.get_bracket_champion()
+        self.bracket_champion_label.configure(text=f"Champion: {champion}" if champion else "")
+
     def update_leaderboards_tab(self):
         """Updates the Team Standings and Player Leaderboard in the Leaderboards tab."""
+        if not self._is_built("Leaderboards"):
+            return
+
+        # Calculated (and published to Firestore) from a snapshot on the background thread
+        def calculate(view):
+            return view.calculate_standings(), view.calculate_player_points()
+
+        self.background.submit("Updating leaderboards", calculate, self.manager.snapshot(),
+                               on_done=self._fill_leaderboards, key='leaderboards')
+
+    def _fill_leaderboards(self, results):
+        standings_data, player_data = results
 
         # Update Team Standings
         for i in self.big_standings_treeview.get_children():
             self.big_standings_treeview.delete(i)
 
-        standings_data = self.manager.calculate_standings()
         if not standings_data:
-            self.big_standings_treeview.insert("", "end", values=("No teams/matches yet", "", "", "", ""))
+            self.big_standings_treeview.insert("", "end", values=("No teams/matches yet", "", "", "", "", "", ""))
         else:
             for team_stats in standings_data:
-                self.big_standings_treeview.insert("", "end", iid=team_stats['name'], values=(
+                self.big_standings_treeview.insert("", "end", iid=team_stats['team_id'], values=(
                     team_stats['name'],
                     team_stats['wins'],
                     team_stats['losses'],
                     team_stats['draws'],
-                    team_stats['matches_played']
+                    team_stats['matches_played'],
+                    f"{team_stats['game_diff']:+d}",
+                    f"{team_stats['point_diff']:+d}"
                 ))
 
         # Update Player Leaderboard
         for i in self.big_player_treeview.get_children():
             self.big_player_treeview.delete(i)
 
-        player_data = self.manager.calculate_player_points()
-
         # Apply skill filter if combobox exists
         selected_skill = self.skill_filter_combobox.get() if hasattr(self, 'skill_filter_combobox') else "All"
         if selected_skill != "All":
@@ -771,7 +1006,7 @@ class TournamentApp:
             for team_id, team in self.manager.data['teams'].items():
                 for player_id, player_info in team['players'].items():
                     if player_info['skill'] == selected_skill:
-                        matching_player = next((p for p in player_data if p['name'] == player_info['name']), None)
+                        matching_player = next((p for p in player_data if p['player_id'] == player_id), None)
                         if matching_player:
                             filtered_player_data.append(matching_player)
             player_data = filtered_player_data
@@ -780,26 +1015,79 @@ class TournamentApp:
             self.big_player_treeview.insert("", "end", values=("No players yet", "", ""))
         else:
             for player in player_data:
-                self.big_player_treeview.insert("", "end", iid=player['name'], values=(
+                self.big_player_treeview.insert("", "end", iid=player['player_id'], values=(
                     player['name'],
                     player['team_name'],
                     player['points']
                 ))
-    
+
+        # Teams deleted since the snapshot are left out
+        self._update_cross_table([team_stats['team_id'] for team_stats in standings_data
+                                  if team_stats['team_id'] in self.manager.data['teams']])
+
+    def _update_cross_table(self, team_ids):
+        """Fills the head-to-head cross-table from one read of the results matrix."""
+        for i in self.cross_table_treeview.get_children():
+            self.cross_table_treeview.delete(i)
+
+        names = [self.manager.get_team(team_id)['name'] for team_id in team_ids]
+        columns = ["Team"] + [f"c{i}" for i in range(len(team_ids))]
+        self.cross_table_treeview.configure(columns=columns)
+        self.cross_table_treeview.heading("Team", text="Team")
+        self.cross_table_treeview.column("Team", width=140, anchor="w", stretch=False)
+        for column, name in zip(columns[1:], names):
+            self.cross_table_treeview.heading(column, text=name)
+            self.cross_table_treeview.column(column, width=90, anchor="center", stretch=False)
+
+        if not team_ids:
+            self.cross_table_treeview.insert("", "end", values=("No teams yet",))
+            return
+
+        _, wins, losses, draws, _ = self.manager.get_head_to_head_matrix(team_ids)
+        wins, losses, draws = wins.tolist(), losses.tolist(), draws.tolist()
+        for i, name in enumerate(names):
+            cells = []
+            for j in range(len(team_ids)):
+                if i == j:
+                    cells.append("—")
+                elif wins[i][j] or losses[i][j] or draws[i][j]:
+                    cells.append(f"{wins[i][j]}-{losses[i][j]}-{draws[i][j]}")
+                else:
+                    cells.append("")
+            self.cross_table_treeview.insert("", "end", values=[name] + cells)
+
+    def _export_cross_table(self):
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        if not file_path:
+            return
+        team_ids, wins, losses, draws, diff = self.manager.get_head_to_head_matrix()
+        names = [self.manager.get_team(team_id)['name'] for team_id in team_ids]
+        with open(file_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Team"] + names)
+            for i, name in enumerate(names):
+                writer.writerow([name] + [f"{wins[i, j]}-{losses[i, j]}-{draws[i, j]} ({diff[i, j]:+d})"
+                                          for j in range(len(names))])
+        self.show_status_message("Cross-table exported.")
+
     def _setup_leaderboards_tab(self):
-        self.leaderboards_frame = self.notebook.add("Leaderboards")
+        self.leaderboards_frame = self.notebook.tab("Leaderboards")
 
         # Team Standings Frame
         standings_frame = ctk.CTkFrame(self.leaderboards_frame)
         standings_frame.pack(side="top", fill="both", expand=True, padx=10, pady=10)
 
-        ctk.CTkLabel(standings_frame, text="Team Standings", font=ctk.CTkFont(size=15, weight="bold")).pack(pady=5)
+        standings_header = ctk.CTkFrame(standings_frame, fg_color="transparent")
+        standings_header.pack(fill="x", pady=5)
+        ctk.CTkLabel(standings_header, text="Team Standings", font=ctk.CTkFont(size=15, weight="bold")).pack(side="left", padx=5)
+        ctk.CTkButton(standings_header, text="As Of...", width=100, command=self._show_standings_as_of).pack(side="right", padx=5)
+        ctk.CTkButton(standings_header, text="Rank Progression...", width=140, command=self._show_rank_progression).pack(side="right", padx=5)
 
         self.big_standings_treeview = ttk.Treeview(standings_frame,
-                                                   columns=("Team", "Wins", "Losses", "Draws", "Played"),
+                                                   columns=("Team", "Wins", "Losses", "Draws", "Played", "Game Diff", "Point Diff"),
                                                    show="headings",
                                                    height = 10)
-        for col in ("Team", "Wins", "Losses", "Draws", "Played"):
+        for col in ("Team", "Wins", "Losses", "Draws", "Played", "Game Diff", "Point Diff"):
             self.big_standings_treeview.heading(col, text=col)
             self.big_standings_treeview.column(col, anchor="center")
         self.big_standings_treeview.pack(fill="both", expand=True)
@@ -833,6 +1121,158 @@ class TournamentApp:
             self.big_player_treeview.heading(col, text=col)
             self.big_player_treeview.column(col, anchor = "center")
         self.big_player_treeview.pack(fill="both", expand=True)
+        self.big_player_treeview.bind("<Double-1>", self._on_player_leaderboard_double_click)
+
+        # Head-to-Head Cross-Table Frame
+        cross_table_frame = ctk.CTkFrame(self.leaderboards_frame)
+        cross_table_frame.pack(side="top", fill="both", expand=True, padx=10, pady=10)
+
+        cross_table_header = ctk.CTkFrame(cross_table_frame, fg_color="transparent")
+        cross_table_header.pack(fill="x", pady=5)
+        ctk.CTkLabel(cross_table_header, text="Head-to-Head Cross-Table (W-L-D)", font=ctk.CTkFont(size=15, weight="bold")).pack(side="left", padx=5)
+        ctk.CTkButton(cross_table_header, text="Export CSV", width=100, command=self._export_cross_table).pack(side="right", padx=5)
+
+        self.cross_table_treeview = ttk.Treeview(cross_table_frame, columns=("Team",), show="headings", height=6)
+        cross_table_scroll = ttk.Scrollbar(cross_table_frame, orient="horizontal", command=self.cross_table_treeview.xview)
+        self.cross_table_treeview.configure(xscrollcommand=cross_table_scroll.set)
+        cross_table_scroll.pack(side="bottom", fill="x")
+        self.cross_table_treeview.pack(fill="both", expand=True)
+
+    def _show_standings_as_of(self):
+        """Shows the standings and player points as they stood at a chosen time or after a chosen round."""
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title("Standings As Of")
+        dialog.geometry("900x700")
+
+        controls = ctk.CTkFrame(dialog, fg_color="transparent")
+        controls.pack(fill="x", padx=10, pady=10)
+        ctk.CTkLabel(controls, text="Date/time (YYYY-MM-DD HH:MM):").pack(side="left", padx=5)
+        time_entry = ctk.CTkEntry(controls, width=160)
+        time_entry.insert(0, datetime.now().strftime('%Y-%m-%d %H:%M'))
+        time_entry.pack(side="left", padx=5)
+        rounds = sorted({fixture['round'] for fixture in self.manager.data['fixtures'].values()})
+
+        def use_round(choice):
+            round_end = self.manager.get_round_end(int(choice.split()[-1]))
+            if round_end is None:
+                messagebox.showinfo("No Results", f"No matches have been recorded for {choice} yet.")
+                return
+            time_entry.delete(0, "end")
+            time_entry.insert(0, round_end.strftime('%Y-%m-%d %H:%M:%S'))
+            show()
+
+        if rounds:
+            ctk.CTkLabel(controls, text="or after:").pack(side="left", padx=5)
+            round_combobox = ctk.CTkComboBox(controls, values=[f"Round {round_no}" for round_no in rounds],
+                                             state="readonly", width=120, command=use_round)
+            round_combobox.pack(side="left", padx=5)
+            round_combobox.set("")
+
+        team_columns = ("Team", "Wins", "Losses", "Draws", "Played", "Game Diff", "Point Diff")
+        team_tree = ttk.Treeview(dialog, columns=team_columns, show="headings", height=10)
+        player_tree = ttk.Treeview(dialog, columns=("Player", "Team", "Points"), show="headings")
+        for tree in (team_tree, player_tree):
+            for col in tree["columns"]:
+                tree.heading(col, text=col)
+                tree.column(col, anchor="center")
+            tree.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def show():
+            try:
+                timestamp = datetime.fromisoformat(time_entry.get().strip())
+            except ValueError:
+                messagebox.showerror("Invalid Date", "Please enter the date as YYYY-MM-DD HH:MM.")
+                return
+            for tree in (team_tree, player_tree):
+                tree.delete(*tree.get_children())
+            for team in self.manager.standings_as_of(timestamp):
+                team_tree.insert("", "end", values=(team['name'], team['wins'], team['losses'], team['draws'],
+                                                    team['matches_played'], team['game_diff'], team['point_diff']))
+            for player in self.manager.player_points_as_of(timestamp):
+                player_tree.insert("", "end", values=(player['name'], player['team_name'], player['points']))
+
+        ctk.CTkButton(controls, text="Show", width=80, command=show).pack(side="left", padx=5)
+        show()
+        ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
+
+    def _show_rank_progression(self):
+        """Charts team or player rank (or points) after each match day, from one sweep of the results."""
+        progression = self.manager.get_rank_progression()
+        if not progression.days:
+            messagebox.showinfo("No Results", "No matches have been recorded yet.")
+            return
+
+        dialog = ctk.CTkToplevel(self.master)
+        dialog.title("Rank Progression")
+        dialog.geometry("1000x650")
+
+        controls = ctk.CTkFrame(dialog, fg_color="transparent")
+        controls.pack(fill="x", padx=10, pady=10)
+        kind_combobox = ctk.CTkComboBox(controls, values=["Teams", "Players"], state="readonly", width=120,
+                                        command=lambda _: draw())
+        kind_combobox.pack(side="left", padx=5)
+        kind_combobox.set("Teams")
+        measure_combobox = ctk.CTkComboBox(controls, values=["Rank", "Points"], state="readonly", width=120,
+                                           command=lambda _: draw())
+        measure_combobox.pack(side="left", padx=5)
+        measure_combobox.set("Rank")
+
+        def export():
+            file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+            if not file_path:
+                return
+            with open(file_path, 'w', newline='') as f:
+                csv.writer(f).writerows(progression.csv_rows())
+            self.show_status_message("Rank progression exported.")
+
+        ctk.CTkButton(controls, text="Export CSV", width=100, command=export).pack(side="right", padx=5)
+
+        canvas = Canvas(dialog, background="white", highlightthickness=0)
+        canvas.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def draw(event=None):
+            canvas.delete("all")
+            if kind_combobox.get() == "Teams":
+                names, ranks, points = progression.team_names, progression.team_ranks, progression.team_points
+            else:
+                names, ranks, points = progression.player_names, progression.player_ranks, progression.player_points
+            if not names:
+                return
+            by_rank = measure_combobox.get() == "Rank"
+            series = ranks if by_rank else points
+            shown = ranks[:, -1].argsort(kind="stable")[:self.RANK_CHART_LINES].tolist()
+            low, high = (1, int(ranks.max())) if by_rank else (0, max(int(points.max()), 1))
+
+            width, height = canvas.winfo_width(), canvas.winfo_height()
+            left, right, top, bottom = 50, width - 180, 20, height - 40
+            days = len(progression.days)
+
+            def x(d):
+                return left + (right - left) * d / max(days - 1, 1)
+
+            def y(value):
+                fraction = (value - low) / max(high - low, 1)
+                return top + (bottom - top) * (fraction if by_rank else 1 - fraction)  # rank 1 at the top
+
+            canvas.create_line(left, bottom, right, bottom)
+            canvas.create_line(left, top, left, bottom)
+            for value in {low, high, (low + high) // 2}:
+                canvas.create_text(left - 8, y(value), text=str(value), anchor="e")
+            for d in sorted({0, days // 2, days - 1}):
+                canvas.create_text(x(d), bottom + 15, text=progression.days[d])
+
+            for n, i in enumerate(shown):
+                color = self.RANK_CHART_COLORS[n % len(self.RANK_CHART_COLORS)]
+                values = series[i].tolist()
+                if days == 1:
+                    canvas.create_oval(x(0) - 3, y(values[0]) - 3, x(0) + 3, y(values[0]) + 3, fill=color, outline=color)
+                else:
+                    canvas.create_line(*[coord for d, value in enumerate(values) for coord in (x(d), y(value))],
+                                       fill=color, width=2)
+                canvas.create_text(right + 10, top + 18 * n, text=f"{int(ranks[i, -1])}. {names[i]}", fill=color, anchor="w")
+
+        canvas.bind("<Configure>", draw)
+        ctk.CTkButton(dialog, text="Close", command=dialog.destroy).pack(pady=5)
 
     def _edit_selected_team_stats(self):
         selected_item = self.big_standings_treeview.selection()
@@ -944,9 +1384,14 @@ class TournamentApp:
         self.status_timeout_id = None
 
     def _on_tab_change(self):
-        """Updates the content of the currently selected tab."""
-        
+        """Updates the content of the currently selected tab, building it on its first visit."""
+        if self.manager is None:
+            return  # _start shows the selected tab once the data is loaded
+
         selected_tab_text = self.notebook.get()
+        if not self._is_built(selected_tab_text):
+            self._built_tabs.add(selected_tab_text)  # first, so the setup's own updates go through
+            getattr(self, self.TAB_SETUP[selected_tab_text])()
 
         if selected_tab_text == "Teams":
             self.update_teams_treeview()
@@ -955,6 +1400,11 @@ class TournamentApp:
             self.selected_team_id = None
         elif selected_tab_text == "Tournament":
             self.update_tournament_tab()
+            self._update_latest_match_display()
+        elif selected_tab_text == "Fixtures":
+            self.update_fixtures_tab()
+        elif selected_tab_text == "Bracket":
+            self.update_bracket_tab()
         elif selected_tab_text == "Leaderboards":
             self.update_leaderboards_tab()
         elif selected_tab_text == "History":
@@ -962,6 +1412,8 @@ class TournamentApp:
             
     # --- Teams Tab Setup ---
     def _setup_teams_tab(self):
+        self.teams_frame = self.notebook.tab("Teams")
+
         # Frame for Team List
         team_list_frame = ctk.CTkFrame(self.teams_frame)
         team_list_frame.pack(side="left", fill="both", expand=True, padx=10, pady=5)
@@ -1002,6 +1454,7 @@ class TournamentApp:
         self.players_treeview.column("Skill", width=80, anchor="w")
         self.players_treeview.pack(side="top", fill="both", expand=True, padx=5, pady=5)
         self.players_treeview.bind("<<TreeviewSelect>>", self._on_player_select)
+        self.players_treeview.bind("<Double-1>", self._on_player_double_click)
 
         player_scroll = ttk.Scrollbar(player_list_frame, orient="vertical", command=self.players_treeview.yview)
         player_scroll.pack(side="right", fill="y")
@@ -1041,6 +1494,8 @@ class TournamentApp:
 
     def update_teams_treeview(self):
         """Updates the teams Treeview with current data."""
+        if not self._is_built("Teams"):
+            return
         for i in self.teams_treeview.get_children():
             self.teams_treeview.delete(i)
         for team_id, team_name in self.manager.get_all_teams():
@@ -1076,6 +1531,8 @@ class TournamentApp:
 
     def update_players_treeview(self):
         """Updates the players Treeview for the selected team."""
+        if not self._is_built("Teams"):
+            return
         for i in self.players_treeview.get_children():
             self.players_treeview.delete(i)
         if self.selected_team_id:
@@ -1108,6 +1565,8 @@ class TournamentApp:
 
     def update_skill_levels_listbox(self):
         """Updates the skill levels Listbox."""
+        if not self._is_built("Teams"):
+            return
         self.skill_levels_listbox.delete(0, "end")
         for skill in self.manager.get_skill_levels():
             self.skill_levels_listbox.insert("end", skill)
@@ -1325,6 +1784,8 @@ class TournamentApp:
 
     # --- Tournament Tab Setup ---
     def _setup_tournament_tab(self):
+        self.tournament_frame = self.notebook.tab("Tournament")
+
         # Section for Recording Sub-Matches
         record_match_section = ctk.CTkFrame(self.tournament_frame)
         record_match_section.pack(side="top", fill="x", padx=10, pady=10)
@@ -1354,13 +1815,15 @@ class TournamentApp:
 
         # Treeview for current sub-matches being added
         ctk.CTkLabel(record_match_section, text="Current Sub-Matches to Record", font=ctk.CTkFont(size=13, weight="bold")).pack(pady=5)
-        self.current_sub_matches_treeview = ttk.Treeview(record_match_section, columns=("Type", "Players", "Winner(s)"), show="headings")
+        self.current_sub_matches_treeview = ttk.Treeview(record_match_section, columns=("Type", "Players", "Winner(s)", "Games"), show="headings")
         self.current_sub_matches_treeview.heading("Type", text="Match Type")
         self.current_sub_matches_treeview.heading("Players", text="Participants")
         self.current_sub_matches_treeview.heading("Winner(s)", text="Winner(s)")
+        self.current_sub_matches_treeview.heading("Games", text="Games")
         self.current_sub_matches_treeview.column("Type", width=100, anchor="center")
         self.current_sub_matches_treeview.column("Players", width=250, anchor="w")
         self.current_sub_matches_treeview.column("Winner(s)", width=200, anchor="w")
+        self.current_sub_matches_treeview.column("Games", width=150, anchor="center")
         self.current_sub_matches_treeview.pack(fill="both", expand=True, padx=5, pady=5)
         
         sub_match_scroll = ttk.Scrollbar(record_match_section, orient="vertical", command=self.current_sub_matches_treeview.yview)
@@ -1422,6 +1885,8 @@ class TournamentApp:
 
     def update_tournament_tab(self):
         """Updates all components in the tournament tab."""
+        if not self._is_built("Tournament"):
+            return
         self._update_team_comboboxes_for_record_match()
         self._update_match_history_treeview()
         self._update_current_sub_matches_treeview() # Clear pending sub-matches
@@ -1537,6 +2002,11 @@ class TournamentApp:
         
         ctk.CTkRadioButton(frame, text="Draw", variable=winner_selection_var, value="Draw").grid(row=3, column=2, sticky="w", padx=5, columnspan=2)
 
+        # Optional per-game scores, team 1 first
+        ctk.CTkLabel(frame, text="Game Scores:", font=ctk.CTkFont(size=13, weight="bold")).grid(row=4, column=0, padx=5, pady=5, sticky="w")
+        games_entry = ctk.CTkEntry(frame, placeholder_text="e.g. 11-9, 8-11, 11-7 (optional)")
+        games_entry.grid(row=4, column=1, columnspan=3, padx=5, pady=5, sticky="ew")
+
         def add_sub_match_action():
             p1_t1_name = player1_t1_cb.get()
             p1_t2_name = player1_t2_cb.get()
@@ -1561,6 +2031,20 @@ class TournamentApp:
             
             # Determine winner player IDs
             selected_winner_option = winner_selection_var.get()
+
+            games = None
+            if games_entry.get().strip():
+                try:
+                    scores = game_scores.parse(games_entry.get())
+                except ValueError as e:
+                    messagebox.showwarning("Input Error", str(e))
+                    return
+                games = game_scores.encode(scores)
+                games1, games2, _, _ = game_scores.totals(games)
+                expected = "Team1" if games1 > games2 else "Team2" if games2 > games1 else "Draw"
+                if selected_winner_option.removesuffix('_s') != expected:
+                    messagebox.showwarning("Input Error", "The game scores don't match the selected winner.")
+                    return
             winner_player_ids = []
             if selected_winner_option == "Team1_s" and match_type == "singles":
                 winner_player_ids.append(player_ids_map_t1[p1_t1_name])
@@ -1578,15 +2062,18 @@ class TournamentApp:
                 'type': match_type,
                 'team1_player_ids': [player_ids_map_t1[p1_t1_name]] + ([player_ids_map_t1[p2_t1_name]] if match_type == "doubles" else []),
                 'team2_player_ids': [player_ids_map_t2[p1_t2_name]] + ([player_ids_map_t2[p2_t2_name]] if match_type == "doubles" else []),
-                'winner_player_ids': winner_player_ids
+                'winner_player_ids': winner_player_ids,
+                'winner_side': 1 if selected_winner_option.startswith("Team1") else 2 if selected_winner_option.startswith("Team2") else 0
             }
+            if games:
+                sub_match_data['games'] = games
             self.current_sub_matches.append(sub_match_data)
             self._update_current_sub_matches_treeview()
             self.show_status_message(f"{match_type.capitalize()} match added to current tournament match!", color="orange")
             dialog.destroy()
 
 
-        ctk.CTkButton(frame, text="Add Sub-Match", command=add_sub_match_action).grid(row=4, column=0, columnspan=4, pady=15)
+        ctk.CTkButton(frame, text="Add Sub-Match", command=add_sub_match_action).grid(row=5, column=0, columnspan=4, pady=15)
 
         # Update combobox options dynamically when other comboboxes change for doubles
         if match_type == "doubles":
@@ -1634,7 +2121,7 @@ class TournamentApp:
             self.current_sub_matches_treeview.delete(i)
         
         if not self.current_sub_matches:
-            self.current_sub_matches_treeview.insert("", "end", values=("", "No sub-matches added yet", ""))
+            self.current_sub_matches_treeview.insert("", "end", values=("", "No sub-matches added yet", "", ""))
             return
 
         for idx, sub_match in enumerate(self.current_sub_matches):
@@ -1647,7 +2134,8 @@ class TournamentApp:
             winner_str = ', '.join(winner_names) if winner_names else 'Draw'
 
             self.current_sub_matches_treeview.insert("", "end", iid=f"sub_match_{idx}", 
-                                                     values=(sub_match['type'].capitalize(), participants_str, winner_str))
+                                                     values=(sub_match['type'].capitalize(), participants_str, winner_str,
+                                                             game_scores.format_scores(sub_match.get('games'))))
 
     def _clear_current_sub_matches(self):
         """Clears the list of sub-matches being assembled."""
@@ -1675,7 +2163,7 @@ class TournamentApp:
         team2_id = self.team_ids_map[team2_name]
         confirm = messagebox.askyesno(
             "Confirm Finalize",
-            "Are you sure you want to finalize this tournament match?\nThis action cannot be undone."
+            "Are you sure you want to finalize this tournament match?\nYou can undo it with Ctrl+Z."
         )
         success, message = self.manager.record_match(team1_id, team2_id, self.current_sub_matches)
         print(success, message)
@@ -1698,7 +2186,7 @@ class TournamentApp:
         menu.post(event.x_root, event.y_root)
         
     def _delete_match(self, match_id):
-        if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this match? This cannot be undone."):
+        if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this match? You can undo it with Ctrl+Z."):
             success, message = self.manager.delete_match(match_id)
             if success:
                 self.show_status_message(message)
@@ -1727,8 +2215,23 @@ class TournamentApp:
             ))
 
 
+def instrumentation_targets():
+    """Returns the (class, method names) pairs that timing instrumentation wraps."""
+    return [
+        (TournamentManager, instrumentation.public_methods(TournamentManager, extra=('_load_data', '_save_data'))),
+        (TournamentApp, instrumentation.refresh_methods(TournamentApp))
+    ]
+
+
 # --- Main Application Execution ---
 if __name__ == "__main__":
+    # Opt-in timing: TT_INSTRUMENT=1 enables it from startup, TT_SLOW_MS sets the slow-log threshold
+    if os.environ.get('TT_SLOW_MS'):
+        instrumentation.monitor.slow_threshold_ms = float(os.environ['TT_SLOW_MS'])
+    if os.environ.get('TT_INSTRUMENT'):
+        instrumentation.monitor.enable(instrumentation_targets())
+
+    # TT_SHARED=1 lets several desks score into the same data file
     root = ctk.CTk()
-    app = TournamentApp(root)
+    app = TournamentApp(root, shared=bool(os.environ.get('TT_SHARED')))
     root.mainloop()
@@ -0,0 +1,414 @@
+"""Read-only HTTP API for spectator screens.
+
+Serves standings, the player leaderboard, match history pages and match details
+as JSON, straight from the tournament data file, so screens don't need
+Firestore. It can run next to the Tk app (it picks up every save) or on its own.
+
+    python api_server.py --data tournament_data.json --port 8080
+
+    GET /standings
+    GET /players
+    GET /matches?page=1&per_page=50
+                                optional filters: team=<team_id>, player=<player_id>,
+                                type=singles|doubles, from=<date>, to=<date> (ISO, to exclusive)
+    GET /matches/<match_id>
+    GET /events                 server-sent event stream of changes
+
+Responses are built once per data revision and kept as encoded bytes, and
+carry an ETag made from the revision and the body, so a screen polling with
+If-None-Match gets an empty 304 until something actually changes.
+
+Screens that want changes pushed instead fetch the views once and then listen
+on /events: match_recorded, match_updated, match_deleted and roster_changed
+carry the changed record (see events.py), and standings/players carry only
+the leaderboard rows that changed ({'revision', 'rows', 'removed'}). A
+resync event means the screen fell too far behind, or everything changed, and
+should fetch the views again.
+"""
+import argparse
+import asyncio
+import json
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+import events
+import game_scores
+import tournament_manager
+
+MAX_PER_PAGE = 200
+RELOAD_INTERVAL = 0.5  # seconds between checks of the data file
+KEEPALIVE_INTERVAL = 15
+MAX_QUEUED_EVENTS = 100
+
+
+class ReadViews:
+    """Encoded JSON responses for the current data revision, built on first request."""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.revision = None
+        self._cache = {}
+        self._player_names = None
+        self._next_reload_check = 0.0
+
+    def refresh(self):
+        """Reloads the data file if it changed (at most every RELOAD_INTERVAL) and drops stale views."""
+        now = time.monotonic()
+        if now >= self._next_reload_check:
+            self._next_reload_check = now + RELOAD_INTERVAL
+            self.manager.reload_if_changed()
+        revision = self.manager.data.get('revision', 0)
+        if revision != self.revision:
+            self.revision = revision
+            self._cache = {}
+            self._player_names = None
+
+    def get(self, key, build):
+        """Returns (body, etag) for a view, building and encoding it if needed."""
+        entry = self._cache.get(key)
+        if entry is None:
+            payload = build()
+            if payload is None:
+                return None
+            body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            entry = self._cache[key] = (body, f'"{self.revision}-{zlib.crc32(body):08x}"')
+        return entry
+
+    def standings(self):
+        return {'revision': self.revision, 'standings': self.manager.calculate_standings()}
+
+    def players(self):
+        return {'revision': self.revision, 'players': self.manager.calculate_player_points()}
+
+    def history_page(self, page, per_page, filters):
+        matches, total = self.manager.query_matches(page=page, per_page=per_page, **filters)
+        return {
+            'revision': self.revision,
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'matches': matches
+        }
+
+    def match(self, match_id):
+        match = self.manager.data['matches'].get(match_id)
+        if match is None:
+            return None
+        if self._player_names is None:
+            self._player_names = {player_id: player['name'] for team in self.manager.data['teams'].values()
+                                  for player_id, player in team['players'].items()}
+
+        def names(player_ids):
+            return [self._player_names.get(player_id, "Unknown Player") for player_id in player_ids]
+
+        return {
+            'id': match_id,
+            'date': datetime.fromisoformat(match['timestamp']).strftime('%Y-%m-%d %H:%M'),
+            'team1_name': match['team1_name'],
+            'team2_name': match['team2_name'],
+            'score': f"{match.get('team1_sub_match_wins', 0)}-{match.get('team2_sub_match_wins', 0)}",
+            'winner_name': match['winner_name'],
+            'sub_matches': [{
+                'type': sub_match['type'],
+                'team1_players': names(sub_match.get('team1_player_ids', [])),
+                'team2_players': names(sub_match.get('team2_player_ids', [])),
+                'winners': names(sub_match.get('winner_player_ids', [])),
+                'games': game_scores.format_scores(sub_match.get('games'))
+            } for sub_match in match.get('sub_matches', [])]
+        }
+
+
+class FeedClient:
+    """Pending events for one event-stream connection.
+
+    Record events queue up to MAX_QUEUED_EVENTS, after which the queue is
+    dropped for a single resync. Leaderboard rows are merged by id, so a slow
+    screen only gets the latest version of each row that changed meanwhile.
+    """
+
+    def __init__(self):
+        self.messages = deque()
+        self.rows = {'standings': {}, 'players': {}}
+        self.revision = None
+        self.resync = False
+        self.ready = asyncio.Event()
+
+    def push(self, message):
+        if len(self.messages) >= MAX_QUEUED_EVENTS:
+            self.request_resync()
+        elif not self.resync:
+            self.messages.append(message)
+            self.ready.set()
+
+    def request_resync(self):
+        self.messages.clear()
+        self.rows = {'standings': {}, 'players': {}}
+        self.resync = True
+        self.ready.set()
+
+    def merge_rows(self, board, changed, removed, revision):
+        if self.resync:
+            return
+        pending = self.rows[board]
+        pending.update(changed)
+        pending.update((row_id, None) for row_id in removed)
+        self.revision = revision
+        self.ready.set()
+
+    def take(self):
+        """Returns the pending events as encoded messages and clears them."""
+        if self.resync:
+            messages = [_sse('resync', {})]
+        else:
+            messages = list(self.messages)
+            for board, pending in self.rows.items():
+                if pending:
+                    messages.append(_sse(board, {
+                        'revision': self.revision,
+                        'rows': [row for row in pending.values() if row is not None],
+                        'removed': [row_id for row_id, row in pending.items() if row is None]
+                    }))
+        self.messages.clear()
+        self.rows = {'standings': {}, 'players': {}}
+        self.resync = False
+        self.ready.clear()
+        return messages
+
+
+class LiveFeed:
+    """Fans manager events and leaderboard row changes out to event-stream clients."""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.clients = set()
+        self.revision = None
+        self._boards = None
+        manager.events.subscribe(self._on_event)
+
+    def _on_event(self, kind, payload):
+        if not self.clients:
+            return
+        if kind == events.DATA_REPLACED:
+            for client in self.clients:
+                client.request_resync()
+            return
+        message = _sse(kind, payload)
+        for client in self.clients:
+            client.push(message)
+
+    def _leaderboards(self):
+        return {
+            'standings': {row['team_id']: dict(row, rank=rank)
+                          for rank, row in enumerate(self.manager.calculate_standings(), 1)},
+            'players': {row['player_id']: dict(row, rank=rank)
+                        for rank, row in enumerate(self.manager.calculate_player_points(), 1)}
+        }
+
+    def connect(self):
+        if self._boards is None:
+            self._boards = self._leaderboards()
+            self.revision = self.manager.data.get('revision', 0)
+        client = FeedClient()
+        self.clients.add(client)
+        return client
+
+    def disconnect(self, client):
+        self.clients.discard(client)
+
+    def check_leaderboards(self):
+        """Sends the leaderboard rows that changed to every client once the data revision moves."""
+        revision = self.manager.data.get('revision', 0)
+        if revision == self.revision:
+            return
+        self.revision = revision
+        if not self.clients:
+            self._boards = None
+            return
+        boards = self._leaderboards()
+        for board, rows in boards.items():
+            old_rows = self._boards[board]
+            changed = {row_id: row for row_id, row in rows.items() if old_rows.get(row_id) != row}
+            removed = [row_id for row_id in old_rows if row_id not in rows]
+            if changed or removed:
+                for client in self.clients:
+                    client.merge_rows(board, changed, removed, revision)
+        self._boards = boards
+
+
+class ReadAPIServer:
+    """A small HTTP/1.1 server (keep-alive, GET/HEAD only) over ReadViews and LiveFeed."""
+
+    def __init__(self, manager):
+        self.views = ReadViews(manager)
+        self.feed = LiveFeed(manager)
+
+    def refresh(self):
+        self.views.refresh()
+        self.feed.check_leaderboards()
+
+    def route(self, path, query):
+        """Returns (status, body, etag) for a request path."""
+        self.refresh()
+        parts = [part for part in path.split('/') if part]
+        if parts == ['standings']:
+            entry = self.views.get('standings', self.views.standings)
+        elif parts == ['players']:
+            entry = self.views.get('players', self.views.players)
+        elif parts == ['matches']:
+            try:
+                page = max(1, int(query.get('page', ['1'])[0]))
+                per_page = min(MAX_PER_PAGE, max(1, int(query.get('per_page', ['50'])[0])))
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, _error("page and per_page must be integers"), None
+            try:
+                filters = _match_filters(query)
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, _error("from and to must be ISO dates"), None
+            entry = self.views.get(('matches', page, per_page, tuple(sorted(filters.items()))),
+                                   lambda: self.views.history_page(page, per_page, filters))
+        elif len(parts) == 2 and parts[0] == 'matches':
+            entry = self.views.get(('match', parts[1]), lambda: self.views.match(parts[1]))
+        else:
+            entry = None
+        if entry is None:
+            return HTTPStatus.NOT_FOUND, _error("Not found"), None
+        return HTTPStatus.OK, entry[0], entry[1]
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get('connection', '').lower() != 'close' if version == 'HTTP/1.1'
+                              else headers.get('connection', '').lower() == 'keep-alive')
+
+                if method == 'GET' and urlsplit(target).path.rstrip('/') == '/events':
+                    await self.stream_events(writer)
+                    break
+                if method not in ('GET', 'HEAD'):
+                    status, body, etag = HTTPStatus.METHOD_NOT_ALLOWED, _error("Read-only API"), None
+                else:
+                    url = urlsplit(target)
+                    status, body, etag = self.route(url.path, parse_qs(url.query))
+                    if etag is not None and etag in _etags(headers.get('if-none-match', '')):
+                        status, body = HTTPStatus.NOT_MODIFIED, b''
+
+                writer.write(_response_head(status, len(body), etag, keep_alive))
+                if method != 'HEAD' and body:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def stream_events(self, writer):
+        """Streams server-sent events to one client until it disconnects."""
+        self.refresh()
+        client = self.feed.connect()
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Access-Control-Allow-Origin: *\r\nConnection: keep-alive\r\n\r\nretry: 2000\n\n")
+            await writer.drain()
+            while True:
+                try:
+                    await asyncio.wait_for(client.ready.wait(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    writer.writelines(client.take())
+                # A slow screen blocks here while its events keep merging in FeedClient
+                await writer.drain()
+        finally:
+            self.feed.disconnect(client)
+
+    async def watch(self):
+        """Picks up data file changes for event-stream clients even when nobody is polling."""
+        while True:
+            self.refresh()
+            await asyncio.sleep(RELOAD_INTERVAL)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        watcher = asyncio.create_task(self.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def _sse(kind, payload):
+    return f"event: {kind}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n".encode('utf-8')
+
+
+def _etags(header):
+    return [tag.strip().removeprefix('W/') for tag in header.split(',')]
+
+
+def _error(message):
+    return json.dumps({'error': message}).encode('utf-8')
+
+
+def _match_filters(query):
+    """Returns TournamentManager.query_matches keyword arguments for /matches query parameters."""
+    filters = {}
+    for param, key in (('team', 'team_id'), ('player', 'player_id'), ('type', 'match_type')):
+        if param in query:
+            filters[key] = query[param][0]
+    for param, key in (('from', 'start'), ('to', 'end')):
+        if param in query:
+            filters[key] = datetime.fromisoformat(query[param][0])
+    return filters
+
+
+def _response_head(status, length, etag, keep_alive):
+    lines = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json",
+        f"Content-Length: {length}",
+        "Cache-Control: no-cache",
+        "Access-Control-Allow-Origin: *",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}"
+    ]
+    if etag is not None:
+        lines.append(f"ETag: {etag}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only HTTP API for tournament spectator screens.")
+    parser.add_argument('--data', default=tournament_manager.DATA_FILE, help="tournament data file")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    # Shared mode makes the manager notice saves from the Tk app (or other desks)
+    manager = tournament_manager.TournamentManager(data_file=args.data, shared=True, publish=False)
+    print(f"Serving tournament data from {manager.data_file} on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(ReadAPIServer(manager).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
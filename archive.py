@@ -0,0 +1,147 @@
+"""Archival of old matches into immutable compressed segment files.
+
+A segment is a gzip-compressed JSON file holding the full records of the
+matches moved into it. The hot data file keeps only the segment's summary:
+
+    'id', 'file'              segment id and file path relative to the data file
+    'first', 'last'           timestamps of the oldest and newest archived match
+    'matches'                 number of matches in the segment
+    'teams'                   team_id -> [wins, losses, draws, matches_played, game_diff, point_diff]
+    'players'                 player_id -> [points, sub_matches_played]
+    'head_to_head'            [team1_id, team2_id, team1_wins, team2_wins, draws, team1_sub_match_diff]
+    'partners', 'opponents'   [player_id, other_id, wins, losses, draws]
+
+Queries add the summaries to the live matches, so a segment file is only
+opened when someone drills into the archived matches themselves.
+
+Segment files hold {'ids': [uuid, ...], 'matches': {...}}: team and player
+ids inside the matches are indexes into 'ids' rather than repeated UUIDs.
+Segments written before that are a plain {match_id: match} dict.
+"""
+import gzip
+import json
+import os
+import uuid
+
+import game_scores
+import model
+
+ARCHIVE_DIR = 'archive'
+
+
+def summarize_matches(matches):
+    """Returns the team, player and head-to-head aggregates for a dict of match records."""
+    teams = {}
+    players = {}
+    head_to_head = {}
+    first = last = None
+    for match in matches.values():
+        t1_id, t2_id, winner_id = match['team1_id'], match['team2_id'], match.get('winner_id')
+        game_diff, point_diff = game_scores.match_differentials(match)
+        for team_id, sign in ((t1_id, 1), (t2_id, -1)):
+            record = teams.setdefault(team_id, [0, 0, 0, 0, 0, 0])
+            record[3] += 1
+            record[4] += sign * game_diff
+            record[5] += sign * point_diff
+            if winner_id is None:
+                record[2] += 1
+            elif winner_id == team_id:
+                record[0] += 1
+            else:
+                record[1] += 1
+
+        # Pairs are stored once, lower team id first
+        flipped = t2_id < t1_id
+        key = (t2_id, t1_id) if flipped else (t1_id, t2_id)
+        pair = head_to_head.setdefault(key, [0, 0, 0, 0])
+        diff = match.get('team1_sub_match_wins', 0) - match.get('team2_sub_match_wins', 0)
+        if winner_id is None:
+            pair[2] += 1
+        elif (winner_id == t1_id) != flipped:
+            pair[0] += 1
+        else:
+            pair[1] += 1
+        pair[3] += -diff if flipped else diff
+
+        for sub_match in match.get('sub_matches', []):
+            for player_id in sub_match.get('team1_player_ids', []) + sub_match.get('team2_player_ids', []):
+                players.setdefault(player_id, [0, 0])[1] += 1
+            for player_id in sub_match.get('winner_player_ids', []):
+                players.setdefault(player_id, [0, 0])[0] += 1
+
+        timestamp = match['timestamp']
+        if first is None or timestamp < first:
+            first = timestamp
+        if last is None or timestamp > last:
+            last = timestamp
+
+    return {
+        'first': first,
+        'last': last,
+        'matches': len(matches),
+        'teams': teams,
+        'players': players,
+        'head_to_head': [[t1_id, t2_id] + record for (t1_id, t2_id), record in head_to_head.items()]
+    }
+
+
+def flatten_player_index(index):
+    """Turns a player -> other -> [wins, losses, draws] index into [player, other, w, l, d] rows."""
+    return [[player_id, other_id] + list(record)
+            for player_id, row in index.items() for other_id, record in row.items()]
+
+
+def new_segment_path(data_file):
+    """Returns (segment id, path relative to the data file, absolute path) for a new segment."""
+    segment_id = uuid.uuid4().hex[:12]
+    stem = os.path.splitext(os.path.basename(data_file))[0]
+    relative = os.path.join(ARCHIVE_DIR, f"{stem}_{segment_id}.json.gz")
+    absolute = os.path.join(os.path.dirname(data_file), relative)
+    return segment_id, relative, absolute
+
+
+def _pack_ids(matches):
+    """Returns the segment form of match records: team and player ids replaced by indexes into 'ids'."""
+    numbers = {}
+    packed = {}
+    for match_id, match in matches.items():
+        match = model.Match.from_json(match).to_json()
+        for key in model.Match.REFS:
+            if match.get(key) is not None:
+                match[key] = numbers.setdefault(match[key], len(numbers))
+        for sub_match in match['sub_matches']:
+            for key in model.SubMatch.REF_LISTS:
+                sub_match[key] = [numbers.setdefault(player_id, len(numbers)) for player_id in sub_match[key]]
+        packed[match_id] = match
+    return {'ids': list(numbers), 'matches': packed}
+
+
+def _unpack_ids(data):
+    """Returns the match dicts of a segment file with their ids turned back into UUIDs."""
+    if not isinstance(data.get('ids'), list):
+        return data  # written before segments had an id table
+    ids = data['ids']
+    matches = data['matches']
+    for match in matches.values():
+        for key in model.Match.REFS:
+            if match.get(key) is not None:
+                match[key] = ids[match[key]]
+        for sub_match in match.get('sub_matches', []):
+            for key in model.SubMatch.REF_LISTS:
+                sub_match[key] = [ids[number] for number in sub_match.get(key, [])]
+    return matches
+
+
+def write_segment(path, matches):
+    """Writes match records to a compressed segment file atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(_pack_ids(matches), f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_segment(path):
+    """Returns the match records stored in a segment file."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return _unpack_ids(json.load(f))
@@ -0,0 +1,133 @@
+"""A worker thread for heavy work, with results handed back to the Tk thread.
+
+Tk widgets may only be touched from the thread running mainloop, so a task
+runs its function on the worker and its on_done / on_error callback is
+called later on the Tk thread, from a master.after poll that only runs
+while tasks are outstanding.
+
+Tasks run one at a time, in the order submitted. A task submitted with a
+key replaces a queued, not yet started, task with the same key, so a burst
+of saves writes only the newest data. Cancelling a task skips it if it has
+not started, and otherwise drops its result when it finishes; a function
+that wants to stop early can take the task and check task.cancelled.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 15
+
+
+class Task:
+    def __init__(self, label, fn, args, on_done, on_error, cancellable, pass_task):
+        self.label = label
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancellable = cancellable
+        self.pass_task = pass_task
+        self._cancelled = threading.Event()
+        self.superseded = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        if self.cancellable:
+            self._cancelled.set()
+
+
+class BackgroundExecutor:
+    def __init__(self, master, poll_ms=POLL_MS):
+        self.master = master
+        self.poll_ms = poll_ms
+        self.on_change = None  # called on the Tk thread with the label of the running task, or None when idle
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tt-background')
+        self._results = queue.SimpleQueue()
+        self._queued = {}  # key -> task not yet started
+        self._latest = {}  # key -> future of the task last submitted with it
+        self._lock = threading.Lock()
+        self._outstanding = []
+        self._polling = False
+
+    def submit(self, label, fn, *args, on_done=None, on_error=None, key=None, cancellable=True, pass_task=False):
+        """Runs fn(*args) (fn(task, *args) with pass_task) on the worker. Returns the Task."""
+        task = Task(label, fn, args, on_done, on_error, cancellable, pass_task)
+        if key is not None:
+            with self._lock:
+                previous = self._queued.get(key)
+                if previous is not None:
+                    previous.superseded = True
+                self._queued[key] = task
+        self._outstanding.append(task)
+        future = self._executor.submit(self._run, task, key)
+        if key is not None:
+            self._latest[key] = future
+        self._notify()
+        if not self._polling:
+            self._polling = True
+            self.master.after(self.poll_ms, self._poll)
+        return task
+
+    def _run(self, task, key):
+        if key is not None:
+            with self._lock:
+                if self._queued.get(key) is task:
+                    del self._queued[key]
+        if task.superseded or task.cancelled:
+            self._results.put((task, None, None))
+            return
+        try:
+            result = task.fn(task, *task.args) if task.pass_task else task.fn(*task.args)
+        except Exception as e:
+            self._results.put((task, None, e))
+        else:
+            self._results.put((task, result, None))
+
+    def _poll(self):
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding.remove(task)
+            if task.superseded or task.cancelled:
+                continue
+            if error is not None:
+                if task.on_error:
+                    task.on_error(error)
+                else:
+                    self.master.report_callback_exception(type(error), error, error.__traceback__)
+            elif task.on_done:
+                task.on_done(result)
+        self._notify()
+        if self._outstanding:
+            self.master.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def _notify(self):
+        if self.on_change:
+            self.on_change(self.busy_label)
+
+    @property
+    def busy_label(self):
+        """Label of the oldest outstanding task, or None when idle."""
+        return self._outstanding[0].label if self._outstanding else None
+
+    def wait(self, key):
+        """Blocks until the task last submitted with key (and so everything before it) has run."""
+        future = self._latest.get(key)
+        if future is not None:
+            future.result()
+
+    def cancel_all(self):
+        """Cancels every outstanding task that allows it."""
+        for task in self._outstanding:
+            task.cancel()
+
+    def shutdown(self):
+        """Waits for the queued tasks (e.g. saves) to finish. Their callbacks are not called."""
+        self._executor.shutdown(wait=True)
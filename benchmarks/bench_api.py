@@ -0,0 +1,89 @@
+"""Throughput benchmark for the read-only HTTP API (api_server.py).
+
+Generates a tournament with benchmarks/datagen.py, starts the API on a free
+local port and runs keep-alive clients against it that cycle through the
+standings, players, a history page and a match, the way polling spectator
+screens do. By default half of the requests send If-None-Match with the last
+ETag they saw. Prints requests per second; the exit status is 1 if that is
+below --min-rps.
+
+    python benchmarks/bench_api.py --clients 50 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api_server
+import tournament_manager
+from datagen import generate_tournament
+
+
+async def _client(port, paths, deadline, conditional, counts):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    etags = {}
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        extra = f"If-None-Match: {etags[path]}\r\n" if conditional and path in etags and i % 2 else ""
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{extra}\r\n".encode('latin-1'))
+        await writer.drain()
+        head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+        headers = dict(line.split(': ', 1) for line in head.split('\r\n')[1:] if ': ' in line)
+        await reader.readexactly(int(headers['Content-Length']))
+        if 'ETag' in headers:
+            etags[path] = headers['ETag']
+        status = head.split(' ', 2)[1]
+        counts[status] = counts.get(status, 0) + 1
+    writer.close()
+
+
+async def run_benchmark(manager, clients, seconds, conditional):
+    server = await asyncio.start_server(api_server.ReadAPIServer(manager).handle_client, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    match_id = next(iter(manager.data['matches']))
+    paths = ['/standings', '/players', '/matches?page=1&per_page=50', f'/matches/{match_id}']
+    counts = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(port, paths, start + seconds, conditional, counts) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+    return counts, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, default=50)
+    parser.add_argument('--players', type=int, default=6, help="players per team")
+    parser.add_argument('--matches', type=int, default=10000)
+    parser.add_argument('--clients', type=int, default=50, help="concurrent keep-alive connections")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--no-etag', action='store_true', help="never send If-None-Match")
+    parser.add_argument('--min-rps', type=float, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'tournament_data.json')
+        with open(data_file, 'w') as f:
+            json.dump(generate_tournament(args.teams, args.players, args.matches), f)
+        manager = tournament_manager.TournamentManager(data_file=data_file, shared=True, publish=False)
+        counts, elapsed = asyncio.run(run_benchmark(manager, args.clients, args.seconds, not args.no_etag))
+
+    total = sum(counts.values())
+    rps = total / elapsed
+    print(f"{total} requests in {elapsed:.1f} s from {args.clients} clients: {rps:.0f} req/s")
+    print("status counts: " + ", ".join(f"{status}: {n}" for status, n in sorted(counts.items())))
+    if rps < args.min_rps:
+        print(f"Below the {args.min_rps:.0f} req/s target")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Benchmarks for the TournamentManager hot paths on synthetic data.
+
+Generates a tournament with benchmarks/datagen.py, then times loading, saving,
+standings, player points, match history, match lookup, recording a match and
+deleting a team. Firestore is replaced with an in-memory fake and confirmation
+dialogs are answered automatically. Results are written as JSON. Pass
+--compare with an earlier results file to flag regressions; the exit status
+is 1 if any operation got slower than the allowed ratio.
+
+    python benchmarks/bench_manager.py --matches 100000 -o results.json
+    python benchmarks/bench_manager.py --matches 100000 --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tournament_manager
+from datagen import generate_tournament
+from fake_firestore import FakeFirestore
+
+
+def _time(fn, repeat, setup=None):
+    """Runs fn repeat times, calling setup (untimed) before each run. Returns the timings."""
+    timings = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(data_file, repeat):
+    def new_manager():
+        # Dialogs would block a headless run: confirm everything, print errors instead
+        return tournament_manager.TournamentManager(db=FakeFirestore(), data_file=data_file,
+                                                    notifier=tournament_manager.ConsoleNotifier(assume_yes=True))
+
+    manager = new_manager()
+    # The most recently inserted match is the worst case for find_match_id's scan
+    match = next(reversed(manager.data['matches'].values()))
+    match_date = datetime.fromisoformat(match['timestamp']).strftime('%Y-%m-%d %H:%M')
+    team1_id, team2_id = match['team1_id'], match['team2_id']
+    sub_matches = [{
+        'type': 'singles',
+        'team1_player_ids': [next(iter(manager.data['teams'][team1_id]['players']))],
+        'team2_player_ids': [next(iter(manager.data['teams'][team2_id]['players']))],
+        'winner_player_ids': []
+    }]
+
+    results = {}
+    results['_load_data'] = _time(manager._load_data, repeat)
+    results['_save_data'] = _time(manager._save_data, repeat)
+    results['calculate_standings'] = _time(manager.calculate_standings, repeat)
+    results['calculate_player_points'] = _time(manager.calculate_player_points, repeat)
+    results['get_match_history'] = _time(manager.get_match_history, repeat)
+    results['query_matches'] = _time(lambda: manager.query_matches(team_id=team1_id, per_page=50), repeat)
+    results['find_match_id'] = _time(lambda: manager.find_match_id(match_date, match['team1_name'],
+                                                                   match['team2_name']), repeat)
+    results['record_match'] = _time(lambda: manager.record_match(team1_id, team2_id, list(sub_matches)), repeat)
+    results['delete_team'] = _time(lambda m: m.delete_team(team1_id), repeat,
+                                   setup=lambda: _scratch_manager(new_manager, data_file))
+    return results
+
+
+def _scratch_manager(new_manager, data_file):
+    """Returns a freshly loaded manager that saves to a scratch file, so each delete starts from the same data."""
+    manager = new_manager()
+    manager.data_file = data_file + '.scratch'
+    return manager
+
+
+def summarize(timings):
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+        'runs': len(timings)
+    }
+
+
+def compare(results, baseline, max_ratio):
+    """Prints a comparison against a baseline results file. Returns the names that regressed."""
+    regressions = []
+    for name, stats in results['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if not old or not old['median']:
+            print(f"{name:25s} {stats['median'] * 1000:10.2f} ms   (no baseline)")
+            continue
+        ratio = stats['median'] / old['median']
+        flag = "  REGRESSION" if ratio > max_ratio else ""
+        print(f"{name:25s} {stats['median'] * 1000:10.2f} ms   baseline {old['median'] * 1000:10.2f} ms   x{ratio:.2f}{flag}")
+        if ratio > max_ratio:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, default=50)
+    parser.add_argument('--players', type=int, default=6, help="players per team")
+    parser.add_argument('--matches', type=int, default=10000)
+    parser.add_argument('--doubles', type=float, default=0.4, help="fraction of sub-matches that are doubles")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('-o', '--output', help="write results JSON to this file")
+    parser.add_argument('--compare', help="baseline results JSON to compare against")
+    parser.add_argument('--max-ratio', type=float, default=1.25,
+                        help="median slowdown against the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    params = {'teams': args.teams, 'players': args.players, 'matches': args.matches,
+              'doubles': args.doubles, 'seed': args.seed, 'repeat': args.repeat}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'tournament_data.json')
+        data = generate_tournament(args.teams, args.players, args.matches, args.doubles, seed=args.seed)
+        with open(data_file, 'w') as f:
+            json.dump(data, f, indent=4)
+        del data
+        timings = run_benchmarks(data_file, args.repeat)
+
+    results = {
+        'params': params,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now().isoformat(),
+        'results': {name: summarize(t) for name, t in timings.items()}
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('params') != params:
+            print(f"warning: baseline was run with {baseline.get('params')}", file=sys.stderr)
+        return 1 if compare(results, baseline, args.max_ratio) else 0
+
+    for name, stats in results['results'].items():
+        print(f"{name:25s} median {stats['median'] * 1000:10.2f} ms   min {stats['min'] * 1000:10.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Memory and loop-speed comparison of the dict and record (model.py) data forms.
+
+Loads the same synthetic tournament as plain JSON dicts and as __slots__
+records, and reports the memory each form holds per match (tracemalloc) and
+the time of the standings and player-points loops over each form. The record
+loops count into lists indexed by the model.IDS numbers the records hold.
+
+    python benchmarks/bench_memory.py --matches 20000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model
+from datagen import generate_tournament
+
+
+def _load(text, records):
+    """Returns (data, bytes allocated and still held) for one load of the JSON text."""
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(text)
+    if records:
+        model.attach(data)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, held
+
+
+def standings_loop_dicts(data):
+    wins = dict.fromkeys(data['teams'], 0)
+    for match in data['matches'].values():
+        winner_id = match['winner_id']
+        if winner_id in wins:
+            wins[winner_id] += 1
+    return wins
+
+
+def standings_loop_records(data):
+    wins = [0] * len(model.IDS)
+    for match in data['matches'].values():
+        winner_id = match.winner_id
+        if winner_id is not None:
+            wins[winner_id] += 1
+    return {team_id: wins[model.IDS.number(team_id)] for team_id in data['teams']}
+
+
+def points_loop_dicts(data):
+    points = {}
+    for match in data['matches'].values():
+        for sub_match in match['sub_matches']:
+            for player_id in sub_match['winner_player_ids']:
+                points[player_id] = points.get(player_id, 0) + 1
+    return points
+
+
+def points_loop_records(data):
+    points = [0] * len(model.IDS)
+    for match in data['matches'].values():
+        for sub_match in match.sub_matches:
+            for player_id in sub_match.winner_player_ids:
+                points[player_id] += 1
+    return points
+
+
+def _best_time(fn, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, default=50)
+    parser.add_argument('--players', type=int, default=6, help="players per team")
+    parser.add_argument('--matches', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    text = json.dumps(generate_tournament(args.teams, args.players, args.matches))
+    results = {}
+    for form, records, loops in (('dicts', False, (standings_loop_dicts, points_loop_dicts)),
+                                 ('records', True, (standings_loop_records, points_loop_records))):
+        # Each form is timed on its own so the other's objects don't affect memory layout
+        data, held = _load(text, records)
+        results[form] = [held / args.matches] + [_best_time(loop, data, args.repeat) * 1000 for loop in loops]
+        del data
+
+    print(f"{args.matches} matches, {args.teams} teams x {args.players} players")
+    print(f"{'':22s} {'dicts':>12s} {'records':>12s} {'ratio':>7s}")
+    for i, name in enumerate(('bytes per match', 'standings loop (ms)', 'points loop (ms)')):
+        dict_value, record_value = results['dicts'][i], results['records'][i]
+        print(f"{name:22s} {dict_value:12.2f} {record_value:12.2f} {record_value / dict_value:7.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark for Swiss pairing on a large open event.
+
+Simulates several rounds of a 500-team event with random results, then times
+how long it takes to read scores and past pairings from the match records and
+pair the next round. Exits with status 1 if a round takes longer than the limit.
+
+    python benchmarks/bench_swiss.py [--teams 500] [--rounds 9] [--limit 1.0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import swiss
+
+
+def simulate_round(matches, byes, team_ids, rng):
+    scores, diffs, played_pairs = swiss.scores_from_matches(matches, byes)
+    ranked = sorted(team_ids, key=lambda t: (-scores.get(t, 0), -diffs.get(t, 0)))
+    pairs, bye_team_id = swiss.pair_round(ranked, played_pairs, byes)
+    for team1_id, team2_id in pairs:
+        team1_wins = rng.randint(0, 5)
+        team2_wins = 5 - team1_wins
+        matches[f"m{len(matches)}"] = {
+            'team1_id': team1_id,
+            'team2_id': team2_id,
+            'winner_id': team1_id if team1_wins > team2_wins else team2_id,
+            'team1_sub_match_wins': team1_wins,
+            'team2_sub_match_wins': team2_wins
+        }
+    if bye_team_id:
+        byes.append(bye_team_id)
+    return pairs, bye_team_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--limit', type=float, default=1.0, help="maximum seconds per round")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    team_ids = [f"team-{i}" for i in range(args.teams)]
+    matches = {}
+    byes = []
+    slowest = 0.0
+    for round_no in range(1, args.rounds + 1):
+        start = time.perf_counter()
+        pairs, _ = simulate_round(matches, byes, team_ids, rng)
+        elapsed = time.perf_counter() - start
+        slowest = max(slowest, elapsed)
+        print(f"round {round_no:2d}: {len(pairs)} pairs in {elapsed * 1000:.1f} ms")
+
+    played = set()
+    for match in matches.values():
+        pair = frozenset((match['team1_id'], match['team2_id']))
+        assert pair not in played, "rematch generated"
+        played.add(pair)
+
+    print(f"slowest round: {slowest * 1000:.1f} ms (limit {args.limit * 1000:.0f} ms)")
+    return 0 if slowest <= args.limit else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
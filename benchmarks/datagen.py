@@ -0,0 +1,115 @@
+"""Synthetic tournament data generator.
+
+Produces data in the same shape as tournament_data.json: teams with rosters,
+and matches made of singles and doubles sub-matches with winners, sub-match
+scores and timestamps spread over a season. The same seed always gives the
+same tournament.
+
+    python benchmarks/datagen.py --teams 50 --players 6 --matches 10000 -o big.json
+"""
+import argparse
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+
+SKILL_LEVELS = ['Beginner', 'Intermediate', 'Advanced', 'Expert']
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_tournament(num_teams=20, players_per_team=6, num_matches=1000, doubles_ratio=0.4,
+                        sub_matches_per_match=5, seed=0, start=datetime(2024, 1, 6, 10, 0)):
+    """Returns tournament data with the given number of teams, players and matches."""
+    rng = random.Random(seed)
+    teams = {}
+    rosters = {}
+    strength = {}
+    for t in range(num_teams):
+        team_id = _uuid(rng)
+        players = {}
+        for p in range(players_per_team):
+            player_id = _uuid(rng)
+            skill = rng.randrange(len(SKILL_LEVELS))
+            players[player_id] = {'name': f"Player {t + 1:03d}-{p + 1}", 'skill': SKILL_LEVELS[skill]}
+            strength[player_id] = skill + rng.random()
+        teams[team_id] = {'name': f"Team {t + 1:03d}", 'players': players}
+        rosters[team_id] = list(players)
+
+    team_ids = list(teams)
+    doubles_allowed = players_per_team >= 2
+    matches = {}
+    # Spread matches over a season of weekly club nights
+    season_minutes = max(num_matches, 1) * 7 * 24 * 60 // max(num_teams // 2, 1)
+    for m in range(num_matches):
+        team1_id, team2_id = rng.sample(team_ids, 2)
+        sub_matches = []
+        team1_wins = team2_wins = 0
+        for _ in range(sub_matches_per_match):
+            size = 2 if doubles_allowed and rng.random() < doubles_ratio else 1
+            side1 = rng.sample(rosters[team1_id], size)
+            side2 = rng.sample(rosters[team2_id], size)
+            s1 = sum(strength[p] for p in side1)
+            s2 = sum(strength[p] for p in side2)
+            roll = rng.random() * (s1 + s2 + 0.2)
+            if roll < s1:
+                winners = side1
+                team1_wins += 1
+            elif roll < s1 + s2:
+                winners = side2
+                team2_wins += 1
+            else:
+                winners = []
+            sub_matches.append({
+                'type': 'doubles' if size == 2 else 'singles',
+                'team1_player_ids': side1,
+                'team2_player_ids': side2,
+                'winner_player_ids': list(winners)
+            })
+
+        winner_id = None
+        if team1_wins > team2_wins:
+            winner_id = team1_id
+        elif team2_wins > team1_wins:
+            winner_id = team2_id
+        timestamp = start + timedelta(minutes=m * season_minutes // max(num_matches, 1) + rng.randrange(60))
+        matches[_uuid(rng)] = {
+            'team1_id': team1_id,
+            'team2_id': team2_id,
+            'team1_name': teams[team1_id]['name'],
+            'team2_name': teams[team2_id]['name'],
+            'sub_matches': sub_matches,
+            'timestamp': timestamp.isoformat(),
+            'winner_name': teams[winner_id]['name'] if winner_id else 'Draw',
+            'winner_id': winner_id,
+            'team1_sub_match_wins': team1_wins,
+            'team2_sub_match_wins': team2_wins
+        }
+
+    return {
+        'teams': teams,
+        'matches': matches,
+        'skill_levels': list(SKILL_LEVELS)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--players', type=int, default=6, help="players per team")
+    parser.add_argument('--matches', type=int, default=1000)
+    parser.add_argument('--doubles', type=float, default=0.4, help="fraction of sub-matches that are doubles")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='tournament_data.json')
+    args = parser.parse_args()
+
+    data = generate_tournament(args.teams, args.players, args.matches, args.doubles, seed=args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(data, f, indent=4)
+    print(f"Wrote {len(data['teams'])} teams and {len(data['matches'])} matches to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""In-memory stand-in for the Firestore client, for benchmarks.
+
+Supports the calls TournamentManager makes (collection().document().set())
+and keeps the last value written to each document.
+"""
+
+
+class FakeDocument:
+    def __init__(self):
+        self.value = None
+        self.writes = 0
+
+    def set(self, value):
+        self.value = value
+        self.writes += 1
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = {}
+
+    def document(self, name):
+        return self.documents.setdefault(name, FakeDocument())
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.collections = {}
+
+    def collection(self, name):
+        return self.collections.setdefault(name, FakeCollection())
@@ -0,0 +1,298 @@
+"""Single- and double-elimination knockout brackets.
+
+Bracket state is a plain dict so it can be stored in the tournament data file:
+
+    'format'    'single' or 'double'
+    'size'      number of first-round slots (a power of two)
+    'positions' team_id -> leaf index in 'winners'
+    'winners'   winners bracket as an array heap: node i is the match between the
+                occupants of nodes 2i+1 and 2i+2, leaves start at size - 1. Each node
+                holds the team that advanced from it.
+    'losers'    losers bracket, three entries (slot a, slot b, winner) per match,
+                rounds laid out one after another
+    'final'     grand final (slot a, slot b, winner) for double elimination, slot a
+                being the winners bracket champion, then the bracket reset: a second
+                final (same slots) played only if slot b wins the first, since the
+                winners bracket champion has not lost yet. Brackets saved before the
+                reset existed have only the first three entries and no reset.
+    'results'   [match_id, team1_id, team2_id, winner_id] for each result reported
+                with a match id, in order, so the bracket can be replayed without one
+
+Entries are a team id, TBD (not decided yet) or BYE. Every lookup is index
+arithmetic, so finding a team's next match or its path takes O(log n).
+"""
+
+TBD = None
+BYE = ''
+
+
+def seed_positions(size):
+    """Returns the seed index for each first-round slot so top seeds meet as late as possible."""
+    order = [0]
+    while len(order) < size:
+        order = [s for seed in order for s in (seed, 2 * len(order) - 1 - seed)]
+    return order
+
+
+def create_bracket(team_ids, double_elimination=False):
+    """Builds a bracket from team ids in seed order; missing seeds become byes."""
+    size = 2
+    while size < len(team_ids):
+        size *= 2
+
+    winners = [TBD] * (2 * size - 1)
+    positions = {}
+    for position, seed in enumerate(seed_positions(size)):
+        leaf = size - 1 + position
+        if seed < len(team_ids):
+            winners[leaf] = team_ids[seed]
+            positions[team_ids[seed]] = leaf
+        else:
+            winners[leaf] = BYE
+
+    state = {
+        'format': 'double' if double_elimination else 'single',
+        'size': size,
+        'positions': positions,
+        'winners': winners,
+        'losers': [TBD] * (3 * sum(_losers_round_size(size, r) for r in range(1, _losers_rounds(size) + 1))),
+        'final': [TBD] * 6 if double_elimination else [],
+        'results': []
+    }
+    _settle_byes(state)
+    return state
+
+
+def _settle_byes(state):
+    """Settles first-round byes bottom-up so they cascade through the draw."""
+    for node in range(state['size'] - 2, -1, -1):
+        _settle(state, ('W', node))
+
+
+def replay(state, results):
+    """Returns a new bracket with the same draw as state and only the given results, reported in order.
+
+    Returns None if one of the results no longer follows from those before it,
+    i.e. a later match was played on the strength of a result that was taken out.
+    """
+    size = state['size']
+    fresh = dict(state, winners=[TBD] * (size - 1) + state['winners'][size - 1:],
+                 losers=[TBD] * len(state['losers']), final=[TBD] * len(state['final']), results=[])
+    _settle_byes(fresh)
+    for match_id, team1_id, team2_id, winner_id in results:
+        if not report_result(fresh, team1_id, team2_id, winner_id, match_id):
+            return None
+    return fresh
+
+
+def _rounds(size):
+    return size.bit_length() - 1
+
+
+def _winners_location(size, node):
+    """Returns (round_no, index) of a winners bracket node; round 1 is the first round."""
+    depth = (node + 1).bit_length() - 1
+    return _rounds(size) - depth, node - ((1 << depth) - 1)
+
+
+def _losers_rounds(size):
+    return 2 * (_rounds(size) - 1) if size >= 4 else 0
+
+
+def _losers_round_size(size, round_no):
+    return size >> (2 + (round_no - 1) // 2)
+
+
+def _losers_base(size, round_no, index):
+    offset = sum(_losers_round_size(size, r) for r in range(1, round_no))
+    return 3 * (offset + index)
+
+
+def _entries(state, location):
+    """Returns (list, base) so that list[base:base + 3] reads as (slot a, slot b, winner)."""
+    section = location[0]
+    if section == 'L':
+        return state['losers'], _losers_base(state['size'], location[1], location[2])
+    return state['final'], 3 if section == 'R' else 0
+
+
+def _slots(state, location):
+    """Returns (slot a, slot b, winner) for a match location."""
+    if location[0] == 'W':
+        node = location[1]
+        winners = state['winners']
+        return winners[2 * node + 1], winners[2 * node + 2], winners[node]
+    entries, base = _entries(state, location)
+    return entries[base], entries[base + 1], entries[base + 2]
+
+
+def _place(state, location, slot, team):
+    entries, base = _entries(state, location)
+    entries[base + slot] = team
+    _settle(state, location)
+
+
+def _settle(state, location):
+    """Advances a match automatically when one or both sides are byes."""
+    team_a, team_b, winner = _slots(state, location)
+    if winner is not TBD or team_a is TBD or team_b is TBD:
+        return
+    if team_a == BYE:
+        _set_winner(state, location, team_b, BYE)
+    elif team_b == BYE:
+        _set_winner(state, location, team_a, BYE)
+
+
+def _set_winner(state, location, winner, loser):
+    size = state['size']
+    if location[0] == 'W':
+        node = location[1]
+        state['winners'][node] = winner
+        if node > 0:
+            _settle(state, ('W', (node - 1) // 2))
+        elif state['format'] == 'double':
+            _place(state, ('F',), 0, winner)
+        if state['format'] == 'double':
+            round_no, index = _winners_location(size, node)
+            if _losers_rounds(size) == 0:
+                _place(state, ('F',), 1, loser)
+            elif round_no == 1:
+                _place(state, ('L', 1, index // 2), index % 2, loser)
+            else:
+                _place(state, ('L', 2 * (round_no - 1), index), 1, loser)
+        return
+
+    entries, base = _entries(state, location)
+    entries[base + 2] = winner
+    if location[0] == 'L':
+        next_location, slot = _losers_next(size, location[1], location[2])
+        _place(state, next_location, slot, winner)
+    elif location[0] == 'F' and len(entries) > 3 and winner == entries[1]:
+        # The winners bracket champion's first loss forces the reset
+        _place(state, ('R',), 0, loser)
+        _place(state, ('R',), 1, winner)
+
+
+def _losers_next(size, round_no, index):
+    """Returns (location, slot) that the winner of a losers bracket match moves to."""
+    if round_no == _losers_rounds(size):
+        return ('F',), 1
+    if round_no % 2:
+        return ('L', round_no + 1, index), 0
+    return ('L', round_no + 1, index // 2), index % 2
+
+
+def _walk(state, team_id):
+    """Yields every match location the team has reached, in order."""
+    if team_id not in state['positions']:
+        return
+    size = state['size']
+    winners = state['winners']
+    node = state['positions'][team_id]
+    location = None
+    while node > 0:
+        node = (node - 1) // 2
+        yield ('W', node)
+        if winners[node] != team_id:
+            if winners[node] is TBD or state['format'] != 'double':
+                return
+            # Lost in the winners bracket: follow the drop into the losers bracket
+            round_no, index = _winners_location(size, node)
+            if _losers_rounds(size) == 0:
+                location = ('F',)
+            elif round_no == 1:
+                location = ('L', 1, index // 2)
+            else:
+                location = ('L', 2 * (round_no - 1), index)
+            break
+    else:
+        if state['format'] != 'double':
+            return
+        location = ('F',)
+
+    while True:
+        yield location
+        if location[0] == 'R':
+            return
+        if location[0] == 'F':
+            if len(state['final']) == 3 or _slots(state, ('R',))[0] is TBD:
+                return
+            location = ('R',)
+            continue
+        if _slots(state, location)[2] != team_id:
+            return
+        location = _losers_next(size, location[1], location[2])[0]
+
+
+def team_path(state, team_id):
+    """Returns the team's matches so far as (location, slot a, slot b, winner) tuples."""
+    return [(location,) + _slots(state, location) for location in _walk(state, team_id)]
+
+
+def next_match(state, team_id):
+    """Returns (location, opponent) for the team's next unplayed match, or None if it is out or champion.
+
+    The opponent is TBD while the other side of the draw is still being played.
+    """
+    location = None
+    for location in _walk(state, team_id):
+        pass
+    if location is None:
+        return None
+    team_a, team_b, winner = _slots(state, location)
+    if winner is not TBD:
+        return None
+    return location, team_b if team_a == team_id else team_a
+
+
+def report_result(state, team1_id, team2_id, winner_id, match_id=None):
+    """Advances the winner if the two teams are due to meet. Returns True if the bracket changed.
+
+    A match_id is kept with the result, so the match can later be taken out with replay.
+    """
+    if winner_id not in (team1_id, team2_id):
+        return False
+    pending = next_match(state, team1_id)
+    if pending is None or pending[1] != team2_id:
+        return False
+    loser_id = team2_id if winner_id == team1_id else team1_id
+    _set_winner(state, pending[0], winner_id, loser_id)
+    # Brackets saved before results were kept have no list; starting one there would make replay drop the rest
+    if match_id is not None and 'results' in state:
+        state['results'].append([match_id, team1_id, team2_id, winner_id])
+    return True
+
+
+def champion(state):
+    """Returns the winning team id once the bracket is complete, else None."""
+    if state['format'] != 'double':
+        return state['winners'][0] or None
+    final = state['final']
+    if len(final) == 3 or final[2] is TBD or final[2] == final[0]:
+        return final[2] or None
+    return final[5] or None
+
+
+def bracket_rounds(state):
+    """Returns [(round label, [(slot a, slot b, winner), ...]), ...] for display."""
+    size = state['size']
+    rounds = []
+    total = _rounds(size)
+    for round_no in range(1, total + 1):
+        first = (size >> round_no) - 1
+        if round_no == total:
+            label = "Final" if state['format'] == 'single' else "Winners Final"
+        else:
+            label = f"Winners Round {round_no}"
+        rounds.append((label, [_slots(state, ('W', node)) for node in range(first, 2 * first + 1)]))
+    if state['format'] == 'double':
+        for round_no in range(1, _losers_rounds(size) + 1):
+            rounds.append((f"Losers Round {round_no}",
+                           [_slots(state, ('L', round_no, index))
+                            for index in range(_losers_round_size(size, round_no))]))
+        rounds.append(("Grand Final", [_slots(state, ('F',))]))
+        final = state['final']
+        # The reset is only listed while it may still be needed
+        if len(final) > 3 and (final[2] is TBD or final[2] != final[0]):
+            rounds.append(("Grand Final Reset", [_slots(state, ('R',))]))
+    return rounds
@@ -0,0 +1,267 @@
+"""Command line for scripts, cron jobs and scoring kiosks.
+
+Works on the same data file as the Tk app, through TournamentManager, but
+loads neither tkinter, customtkinter nor firebase_admin, so it starts in a
+fraction of the app's time and runs without a display or a Tk install.
+
+    python cli.py standings [--json]
+    python cli.py players [--skill Expert] [--json]
+    python cli.py history [--team T] [--player P] [--type singles] [--from 2024-05-01] [--to 2024-06-01]
+                          [--page 1] [--per-page 20] [--json]
+    python cli.py record "Team A" "Team B" --sub singles Ann Cat 1 "11-9 8-11 11-7"
+                                           --sub doubles Ann,Ben Cat,Dan 2
+    python cli.py orphans [--json]
+    python cli.py import backup.json
+    python cli.py export [backup.json]
+
+Teams and players are given by name or id. A --sub is TYPE, team 1's
+players, team 2's players (comma separated), the winning side (1, 2 or 0
+for a draw) and optionally the game scores from team 1's side.
+
+--data picks the data file, TT_SHARED=1 (or --shared) saves the way
+several desks do (see shared_file), and --publish also pushes the
+leaderboards to Firestore. Manager errors are printed to stderr with exit
+status 1; a change that asks for confirmation needs --yes.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import game_scores
+import model
+import tournament_manager
+
+
+class CLIError(Exception):
+    pass
+
+
+def _print_table(headers, rows):
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max([len(header)] + [len(row[i]) for row in rows]) for i, header in enumerate(headers)]
+    for row in [headers, ['-' * width for width in widths]] + rows:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def _print_json(value):
+    json.dump(value, sys.stdout, indent=2, default=model.to_json)
+    print()
+
+
+def _find_team(manager, ref):
+    """Returns the id of the team with id or (case-insensitive) name ref."""
+    teams = manager.data['teams']
+    if ref in teams:
+        return ref
+    matches = [team_id for team_id, team in teams.items() if team['name'].lower() == ref.lower()]
+    if len(matches) != 1:
+        raise CLIError(f"No team named '{ref}'." if not matches else f"More than one team is named '{ref}'.")
+    return matches[0]
+
+
+def _find_player(manager, ref, team_id=None):
+    """Returns the id of the player with id or name ref, looking only in team_id if given."""
+    teams = manager.data['teams']
+    candidates = [(team_id, teams[team_id])] if team_id else teams.items()
+    matches = [player_id for _, team in candidates for player_id, player in team['players'].items()
+               if player_id == ref or player['name'].lower() == ref.lower()]
+    if len(matches) != 1:
+        where = f" in {teams[team_id]['name']}" if team_id else ""
+        raise CLIError(f"No player '{ref}'{where}." if not matches else f"More than one player is named '{ref}'{where}.")
+    return matches[0]
+
+
+def _parse_date(text):
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise CLIError(f"'{text}' is not an ISO date such as 2024-05-01 or 2024-05-01T18:30.")
+
+
+def _sub_match(manager, team1_id, team2_id, fields):
+    """Builds a sub-match dict, as the Tk sub-match dialog does, from TYPE PLAYERS1 PLAYERS2 WINNER [SCORES]."""
+    if len(fields) not in (4, 5):
+        raise CLIError("A --sub is TYPE PLAYERS1 PLAYERS2 WINNER [SCORES].")
+    match_type, players1, players2, winner = fields[:4]
+    if match_type not in ('singles', 'doubles'):
+        raise CLIError(f"Sub-match type must be singles or doubles, not '{match_type}'.")
+    if winner not in ('0', '1', '2'):
+        raise CLIError("The winning side must be 1, 2 or 0 for a draw.")
+    team1_player_ids = [_find_player(manager, name.strip(), team1_id) for name in players1.split(',')]
+    team2_player_ids = [_find_player(manager, name.strip(), team2_id) for name in players2.split(',')]
+    size = 1 if match_type == 'singles' else 2
+    if len(team1_player_ids) != size or len(team2_player_ids) != size:
+        raise CLIError(f"A {match_type} sub-match needs {size} player(s) per side.")
+
+    sub_match = {
+        'type': match_type,
+        'team1_player_ids': team1_player_ids,
+        'team2_player_ids': team2_player_ids,
+        'winner_player_ids': {'0': [], '1': team1_player_ids, '2': team2_player_ids}[winner],
+        'winner_side': int(winner)
+    }
+    if len(fields) == 5:
+        try:
+            scores = game_scores.parse(fields[4])
+        except ValueError as e:
+            raise CLIError(str(e))
+        games1, games2, _, _ = game_scores.totals(game_scores.encode(scores))
+        if winner != ('1' if games1 > games2 else '2' if games2 > games1 else '0'):
+            raise CLIError("The game scores don't match the winning side.")
+        sub_match['games'] = game_scores.encode(scores)
+    return sub_match
+
+
+def _publish_leaderboards(manager):
+    if manager.db is not None:
+        manager.calculate_standings()
+        manager.calculate_player_points()
+
+
+def cmd_standings(manager, args):
+    standings = manager.calculate_standings()
+    if args.json:
+        return _print_json(standings)
+    _print_table(["#", "Team", "W", "L", "D", "Played", "Game Diff", "Point Diff"], [
+        (rank, team['name'], team['wins'], team['losses'], team['draws'], team['matches_played'],
+         f"{team['game_diff']:+d}", f"{team['point_diff']:+d}")
+        for rank, team in enumerate(standings, 1)])
+
+
+def cmd_players(manager, args):
+    players = manager.calculate_player_points()
+    if args.skill:
+        skills = {player_id: player['skill'] for team in manager.data['teams'].values()
+                  for player_id, player in team['players'].items()}
+        players = [player for player in players if skills.get(player['player_id']) == args.skill]
+    if args.json:
+        return _print_json(players)
+    _print_table(["#", "Player", "Team", "Points"],
+                 [(rank, player['name'], player['team_name'], player['points']) for rank, player in enumerate(players, 1)])
+
+
+def cmd_history(manager, args):
+    team_id = _find_team(manager, args.team) if args.team else None
+    player_id = _find_player(manager, args.player) if args.player else None
+    rows, total = manager.query_matches(team_id, player_id, args.type,
+                                        _parse_date(args.start) if args.start else None,
+                                        _parse_date(args.end) if args.end else None,
+                                        page=args.page, per_page=args.per_page)
+    if args.json:
+        return _print_json({'page': args.page, 'per_page': args.per_page, 'total': total, 'matches': rows})
+    _print_table(["Date", "Team 1", "Score", "Team 2", "Winner", "ID"],
+                 [(row['date'], row['team1_name'], row['score'], row['team2_name'], row['winner_name'], row['id'])
+                  for row in rows])
+    print(f"\n{len(rows)} of {total} matches (page {args.page})")
+
+
+def cmd_record(manager, args):
+    team1_id = _find_team(manager, args.team1)
+    team2_id = _find_team(manager, args.team2)
+    sub_matches = [_sub_match(manager, team1_id, team2_id, fields) for fields in args.sub]
+    success, message = manager.record_match(team1_id, team2_id, sub_matches, fixture_id=args.fixture)
+    if not success:
+        return 1
+    _publish_leaderboards(manager)
+    print(message)
+
+
+def cmd_orphans(manager, args):
+    rows = manager.get_orphaned_references()
+    if args.json:
+        return _print_json(rows)
+    _print_table(["Date", "Team 1", "Team 2", "Sub-match", "Missing Player", "Match ID"],
+                 [(row['timestamp'][:16].replace('T', ' '), row['team1_name'], row['team2_name'], row['position'] + 1,
+                   row['player_id'], row['match_id']) for row in rows])
+    print(f"\n{len(rows)} sub-match references to players on no team")
+
+
+def cmd_import(manager, args):
+    try:
+        with open(args.file, 'r') as f:
+            imported_data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        raise CLIError(f"Could not read or parse {args.file}.")
+    required_keys = ['teams', 'matches', 'skill_levels']
+    if not all(k in imported_data for k in required_keys):
+        raise CLIError(f"{args.file} is missing required tournament data keys: {required_keys}")
+    manager.replace_data(imported_data)
+    _publish_leaderboards(manager)
+    print(f"Imported {len(imported_data['teams'])} teams and {len(imported_data['matches'])} matches.")
+
+
+def cmd_export(manager, args):
+    if args.file in (None, '-'):
+        return _print_json(model.plain(manager.data))
+    with open(args.file, 'w') as f:
+        json.dump(model.plain(manager.data), f, indent=4)
+    print(f"Exported to {args.file}.")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Table tennis tournament from the command line.")
+    parser.add_argument('--data', default=tournament_manager.DATA_FILE, help="tournament data file")
+    parser.add_argument('--shared', action='store_true', default=bool(os.environ.get('TT_SHARED')),
+                        help="save the way several desks sharing the data file do")
+    parser.add_argument('--publish', action='store_true', help="also push the leaderboards to Firestore")
+    parser.add_argument('--yes', action='store_true', help="answer yes to confirmations")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    standings = commands.add_parser('standings', help="team standings")
+    standings.add_argument('--json', action='store_true')
+    standings.set_defaults(run=cmd_standings)
+
+    players = commands.add_parser('players', help="player leaderboard")
+    players.add_argument('--skill')
+    players.add_argument('--json', action='store_true')
+    players.set_defaults(run=cmd_players)
+
+    history = commands.add_parser('history', help="match history, newest first")
+    history.add_argument('--team')
+    history.add_argument('--player')
+    history.add_argument('--type', choices=('singles', 'doubles'))
+    history.add_argument('--from', dest='start', help="ISO date or time, inclusive")
+    history.add_argument('--to', dest='end', help="ISO date or time, exclusive")
+    history.add_argument('--page', type=int, default=1)
+    history.add_argument('--per-page', type=int, default=20)
+    history.add_argument('--json', action='store_true')
+    history.set_defaults(run=cmd_history)
+
+    record = commands.add_parser('record', help="record a match")
+    record.add_argument('team1')
+    record.add_argument('team2')
+    record.add_argument('--sub', nargs='+', action='append', required=True,
+                        metavar='FIELD', help="TYPE PLAYERS1 PLAYERS2 WINNER [SCORES]; repeat per sub-match")
+    record.add_argument('--fixture', help="fixture id (default: the next open fixture between the teams)")
+    record.set_defaults(run=cmd_record)
+
+    orphans = commands.add_parser('orphans', help="sub-matches naming players who are on no team")
+    orphans.add_argument('--json', action='store_true')
+    orphans.set_defaults(run=cmd_orphans)
+
+    import_parser = commands.add_parser('import', help="replace all data with a JSON export")
+    import_parser.add_argument('file')
+    import_parser.set_defaults(run=cmd_import)
+
+    export = commands.add_parser('export', help="write all data as JSON (to stdout without a file)")
+    export.add_argument('file', nargs='?')
+    export.set_defaults(run=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    notifier = tournament_manager.ConsoleNotifier(args.yes, "Not confirmed; pass --yes to go ahead.")
+    manager = tournament_manager.TournamentManager(data_file=args.data, shared=args.shared, publish=args.publish,
+                                                   notifier=notifier)
+    try:
+        return args.run(manager, args) or 0
+    except CLIError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""In-process publish/subscribe for tournament changes.
+
+TournamentManager publishes an event after each change it saves, and after
+reloading a data file that another desk or the Tk app changed:
+
+    match_recorded, match_updated   payload is the match's history row
+    match_deleted                   {'id': match_id}
+    roster_changed                  {'team_id', 'name', 'players'}, or {'team_id', 'deleted': True}
+    data_replaced                   {} - too much changed at once (import, reset, season switch, archival)
+"""
+
+MATCH_RECORDED = 'match_recorded'
+MATCH_UPDATED = 'match_updated'
+MATCH_DELETED = 'match_deleted'
+ROSTER_CHANGED = 'roster_changed'
+DATA_REPLACED = 'data_replaced'
+
+
+class EventBus:
+    """Calls every subscriber synchronously with (kind, payload), in the publishing thread."""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Registers callback(kind, payload). Returns a function that unsubscribes it."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, kind, payload):
+        for callback in list(self._subscribers):
+            callback(kind, payload)
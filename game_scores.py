@@ -0,0 +1,111 @@
+"""Compact per-game scores for sub-matches.
+
+A sub-match's game scores are one byte per side per game, team 1's points
+first, so 11-9, 8-11, 11-7 is array('B', [11, 9, 8, 11, 11, 7]). In the data
+file (and in memory, so saving needs no conversion) it is the base64 text of
+those bytes under the sub-match's 'games' key: 8 characters for a three-game
+sub-match instead of a list of score dicts.
+
+An optional rally log under 'rallies' packs one bit per point in the order
+played, set when team 1 won the point; its length comes from the game scores.
+"""
+import base64
+import binascii
+from array import array
+
+
+def parse(text):
+    """Parses scores such as "11-9, 8-11, 11-7" into an array('B'). Raises ValueError."""
+    scores = array('B')
+    for game in text.replace(',', ' ').split():
+        points1, sep, points2 = game.partition('-')
+        if not sep:
+            raise ValueError(f"Game score '{game}' should look like 11-9.")
+        try:
+            scores.extend((int(points1), int(points2)))
+        except (ValueError, OverflowError):
+            raise ValueError(f"Game score '{game}' should be two numbers from 0 to 255.")
+        if scores[-1] == scores[-2]:
+            raise ValueError(f"Game score '{game}' has no winner.")
+    return scores
+
+
+def encode(scores):
+    """Returns the stored form of an array('B') (or any byte values) of game scores."""
+    return base64.b64encode(bytes(scores)).decode('ascii')
+
+
+def decode(encoded):
+    """Returns the game scores as an array('B'). Raises ValueError if the text is malformed."""
+    if not isinstance(encoded, str):
+        raise ValueError("Stored game scores should be base64 text, not a list or number.")
+    try:
+        scores = array('B', base64.b64decode(encoded, validate=True))
+    except binascii.Error:
+        raise ValueError(f"'{encoded}' is not a stored game score.")
+    if len(scores) % 2:
+        raise ValueError("Game scores need two values per game.")
+    return scores
+
+
+def format_scores(encoded):
+    """Returns the stored game scores as text, e.g. "11-9, 8-11, 11-7"."""
+    if not encoded:
+        return ''
+    scores = decode(encoded)
+    return ', '.join(f"{scores[i]}-{scores[i + 1]}" for i in range(0, len(scores), 2))
+
+
+def totals(encoded):
+    """Returns (team1 games, team2 games, team1 points, team2 points) for stored game scores."""
+    scores = decode(encoded)
+    points1, points2 = scores[0::2], scores[1::2]
+    games1 = sum(1 for a, b in zip(points1, points2) if a > b)
+    games2 = sum(1 for a, b in zip(points1, points2) if b > a)
+    return games1, games2, sum(points1), sum(points2)
+
+
+def match_differentials(match):
+    """Returns (game difference, point difference) for team 1 over a match's sub-matches."""
+    game_diff = point_diff = 0
+    for sub_match in match.get('sub_matches', []):
+        if sub_match.get('games'):
+            games1, games2, points1, points2 = totals(sub_match['games'])
+            game_diff += games1 - games2
+            point_diff += points1 - points2
+    return game_diff, point_diff
+
+
+def encode_rallies(team1_won):
+    """Packs a rally log (a sequence of booleans, True when team 1 won the point) into its stored form."""
+    packed = bytearray((len(team1_won) + 7) // 8)
+    for i, won in enumerate(team1_won):
+        if won:
+            packed[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(packed)).decode('ascii')
+
+
+def decode_rallies(encoded, games_encoded):
+    """Unpacks a stored rally log into a list of booleans, using the game scores for its length."""
+    scores = decode(games_encoded)
+    if not isinstance(encoded, str):
+        raise ValueError("A stored rally log should be base64 text.")
+    packed = base64.b64decode(encoded, validate=True)
+    count = sum(scores)
+    if len(packed) < (count + 7) // 8:
+        raise ValueError("Rally log is shorter than the game scores.")
+    return [bool(packed[i >> 3] >> (i & 7) & 1) for i in range(count)]
+
+
+def validate(sub_match):
+    """Raises ValueError if a sub-match's game scores or rally log are malformed or disagree."""
+    if sub_match.get('games'):
+        scores = decode(sub_match['games'])
+        if any(scores[i] == scores[i + 1] for i in range(0, len(scores), 2)):
+            raise ValueError("Every game needs a winner; a tied game score was given.")
+        if sub_match.get('rallies'):
+            rallies = decode_rallies(sub_match['rallies'], sub_match['games'])
+            if sum(rallies) != sum(scores[0::2]):
+                raise ValueError("Rally log does not add up to the game scores.")
+    elif sub_match.get('rallies'):
+        raise ValueError("A rally log needs game scores.")
@@ -0,0 +1,87 @@
+"""Team x team head-to-head results held in NumPy arrays."""
+import numpy as np
+
+
+class HeadToHeadMatrix:
+    """Wins, draws and sub-match differential between every pair of teams.
+
+    Each team gets an ordinal (row/column index) the first time it is seen.
+    wins[i, j] counts matches team i won against team j, so losses are the
+    transpose; draws and diff are kept symmetric and antisymmetric respectively.
+    """
+
+    def __init__(self, capacity=16):
+        self.ordinals = {}
+        self._free = []
+        self.wins = np.zeros((capacity, capacity), dtype=np.int32)
+        self.draws = np.zeros((capacity, capacity), dtype=np.int32)
+        self.diff = np.zeros((capacity, capacity), dtype=np.int32)
+
+    def ordinal(self, team_id):
+        """Returns the team's row index, assigning one if needed."""
+        row = self.ordinals.get(team_id)
+        if row is None:
+            row = self._free.pop() if self._free else len(self.ordinals)
+            if row >= self.wins.shape[0]:
+                self._grow(max(2 * self.wins.shape[0], row + 1))
+            self.ordinals[team_id] = row
+        return row
+
+    def _grow(self, capacity):
+        for name in ('wins', 'draws', 'diff'):
+            old = getattr(self, name)
+            new = np.zeros((capacity, capacity), dtype=old.dtype)
+            new[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, new)
+
+    def add_match(self, match, sign=1):
+        """Adds a match record to (sign=1) or removes it from (sign=-1) the matrix."""
+        i = self.ordinal(match['team1_id'])
+        j = self.ordinal(match['team2_id'])
+        winner_id = match.get('winner_id')
+        if winner_id is None:
+            self.draws[i, j] += sign
+            self.draws[j, i] += sign
+        elif winner_id == match['team1_id']:
+            self.wins[i, j] += sign
+        else:
+            self.wins[j, i] += sign
+        diff = match.get('team1_sub_match_wins', 0) - match.get('team2_sub_match_wins', 0)
+        self.diff[i, j] += sign * diff
+        self.diff[j, i] -= sign * diff
+
+    def add_record(self, team_id, opponent_id, wins, losses, draws, diff):
+        """Adds aggregated results (e.g. from an archive summary) for one pair of teams."""
+        i = self.ordinal(team_id)
+        j = self.ordinal(opponent_id)
+        self.wins[i, j] += wins
+        self.wins[j, i] += losses
+        self.draws[i, j] += draws
+        self.draws[j, i] += draws
+        self.diff[i, j] += diff
+        self.diff[j, i] -= diff
+
+    def remove_team(self, team_id):
+        """Clears a deleted team's row and column and frees its ordinal for reuse."""
+        row = self.ordinals.pop(team_id, None)
+        if row is None:
+            return
+        for array in (self.wins, self.draws, self.diff):
+            array[row, :] = 0
+            array[:, row] = 0
+        self._free.append(row)
+
+    def head_to_head(self, team_id, opponent_id):
+        """Returns (wins, losses, draws, sub_match_diff) for team_id against opponent_id."""
+        i = self.ordinals.get(team_id)
+        j = self.ordinals.get(opponent_id)
+        if i is None or j is None:
+            return 0, 0, 0, 0
+        return int(self.wins[i, j]), int(self.wins[j, i]), int(self.draws[i, j]), int(self.diff[i, j])
+
+    def export(self, team_ids):
+        """Returns (wins, losses, draws, diff) matrices for team_ids, in that order."""
+        rows = np.array([self.ordinal(team_id) for team_id in team_ids], dtype=np.intp)
+        index = np.ix_(rows, rows)
+        wins = self.wins[index]
+        return wins, wins.T.copy(), self.draws[index], self.diff[index]
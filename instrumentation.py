@@ -0,0 +1,141 @@
+"""Opt-in timing instrumentation for the app's hot paths.
+
+When enabled, the chosen methods are replaced on their classes with timing
+wrappers; disabling puts the original functions back, so a disabled monitor
+costs nothing at call time. Each operation keeps a call count, total time and
+a log-bucketed histogram for percentiles. Calls slower than the threshold are
+logged.
+"""
+import functools
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Latency histogram with logarithmic buckets (about 9% wide) plus exact count, total and max."""
+
+    BUCKETS_PER_DOUBLING = 8
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        bucket = math.ceil(math.log2(max(seconds, 1e-9)) * self.BUCKETS_PER_DOUBLING)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Returns the upper bound of the bucket holding the given fraction of calls."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** (bucket / self.BUCKETS_PER_DOUBLING), self.max)
+        return self.max
+
+
+class PerfMonitor:
+    """Collects per-operation timings for instrumented methods."""
+
+    def __init__(self, slow_threshold_ms=100):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.histograms = {}
+        self._originals = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self._originals)
+
+    def enable(self, targets):
+        """Wraps methods for timing. targets is a list of (class, [method names])."""
+        if self.enabled:
+            return
+        for cls, names in targets:
+            for name in names:
+                original = cls.__dict__[name]
+                self._originals.append((cls, name, original))
+                setattr(cls, name, self._wrap(f"{cls.__name__}.{name}", original))
+
+    def disable(self):
+        """Restores the original methods. Collected timings are kept."""
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+
+    def _wrap(self, label, func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(label, time.perf_counter() - start)
+        return timed
+
+    def record(self, label, seconds):
+        with self._lock:
+            histogram = self.histograms.get(label)
+            if histogram is None:
+                histogram = self.histograms[label] = Histogram()
+            histogram.add(seconds)
+        if seconds * 1000 >= self.slow_threshold_ms:
+            logger.warning("Slow operation: %s took %.1f ms", label, seconds * 1000)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def report(self):
+        """Returns one dict per operation (times in ms), slowest total first."""
+        with self._lock:
+            rows = [{
+                'operation': label,
+                'calls': h.count,
+                'total_ms': h.total * 1000,
+                'p50_ms': h.percentile(0.5) * 1000,
+                'p95_ms': h.percentile(0.95) * 1000,
+                'max_ms': h.max * 1000
+            } for label, h in self.histograms.items()]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def dump(self):
+        """Returns the report as a fixed-width text table."""
+        lines = [f"{'Operation':45s} {'Calls':>7s} {'Total ms':>10s} {'p50 ms':>9s} {'p95 ms':>9s} {'Max ms':>9s}"]
+        for row in self.report():
+            lines.append(f"{row['operation']:45s} {row['calls']:7d} {row['total_ms']:10.1f} "
+                         f"{row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['max_ms']:9.2f}")
+        return "\n".join(lines)
+
+
+def public_methods(cls, extra=()):
+    """Returns the names of the public methods defined on cls, plus any extra names."""
+    names = [name for name, value in vars(cls).items()
+             if _is_method(value) and not name.startswith('_')]
+    return names + [name for name in extra if name in vars(cls)]
+
+
+def refresh_methods(cls):
+    """Returns the names of the UI refresh methods (update_* and _update_*) defined on cls."""
+    return [name for name, value in vars(cls).items()
+            if _is_method(value) and (name.startswith('update_') or name.startswith('_update_'))]
+
+
+def _is_method(value):
+    return callable(value) and not isinstance(value, (staticmethod, classmethod, type))
+
+
+monitor = PerfMonitor()
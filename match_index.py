@@ -0,0 +1,81 @@
+"""Lookup indexes over the live matches for filtered history queries."""
+from bisect import bisect_left, insort
+
+
+class MatchIndex:
+    """Team -> match ids, player -> sub-match positions, and matches ordered by time.
+
+    by_player maps a player id to {match_id: (sub-match positions)}, so a
+    player's sub-matches are found without opening any other match. by_time is
+    a sorted list of (timestamp, match_id) used for date ranges and for the
+    newest-first order of query results.
+    """
+
+    def __init__(self):
+        self.by_team = {}
+        self.by_player = {}
+        self.by_time = []
+
+    def add(self, match_id, match):
+        for team_id in (match['team1_id'], match['team2_id']):
+            self.by_team.setdefault(team_id, set()).add(match_id)
+        positions = {}
+        for position, sub_match in enumerate(match.get('sub_matches', [])):
+            for player_id in sub_match.get('team1_player_ids', ()) + sub_match.get('team2_player_ids', ()):
+                positions.setdefault(player_id, []).append(position)
+        for player_id, player_positions in positions.items():
+            self.by_player.setdefault(player_id, {})[match_id] = tuple(player_positions)
+        insort(self.by_time, (match['timestamp'], match_id))
+
+    def remove(self, match_id, match):
+        for team_id in (match['team1_id'], match['team2_id']):
+            match_ids = self.by_team.get(team_id)
+            if match_ids is not None:
+                match_ids.discard(match_id)
+                if not match_ids:
+                    del self.by_team[team_id]
+        for sub_match in match.get('sub_matches', []):
+            for player_id in sub_match.get('team1_player_ids', ()) + sub_match.get('team2_player_ids', ()):
+                matches = self.by_player.get(player_id)
+                if matches is not None:
+                    matches.pop(match_id, None)
+                    if not matches:
+                        del self.by_player[player_id]
+        key = (match['timestamp'], match_id)
+        i = bisect_left(self.by_time, key)
+        if i < len(self.by_time) and self.by_time[i] == key:
+            del self.by_time[i]
+
+    def query(self, matches, team_id=None, player_id=None, match_type=None, start=None, end=None):
+        """Returns the ids of matching matches, newest first.
+
+        start and end are ISO timestamps (start inclusive, end exclusive). With
+        a match_type, a match qualifies if it has a sub-match of that type, or
+        with a player_id too, if the player played one.
+        """
+        if team_id is None and player_id is None:
+            low = 0 if start is None else bisect_left(self.by_time, (start,))
+            high = len(self.by_time) if end is None else bisect_left(self.by_time, (end,))
+            match_ids = [match_id for _, match_id in reversed(self.by_time[low:high])]
+        else:
+            candidates = None
+            if team_id is not None:
+                candidates = self.by_team.get(team_id, set())
+            if player_id is not None:
+                played = self.by_player.get(player_id, {}).keys()
+                candidates = played if candidates is None else candidates & played
+            match_ids = [match_id for match_id in candidates
+                         if (start is None or matches[match_id]['timestamp'] >= start)
+                         and (end is None or matches[match_id]['timestamp'] < end)]
+            match_ids.sort(key=lambda match_id: (matches[match_id]['timestamp'], match_id), reverse=True)
+
+        if match_type is not None:
+            match_ids = [match_id for match_id in match_ids if self._has_type(matches[match_id], match_id,
+                                                                              player_id, match_type)]
+        return match_ids
+
+    def _has_type(self, match, match_id, player_id, match_type):
+        sub_matches = match.sub_matches
+        if player_id is None:
+            return any(sub_match.type == match_type for sub_match in sub_matches)
+        return any(sub_matches[position].type == match_type for position in self.by_player[player_id][match_id])
@@ -0,0 +1,197 @@
+"""Append-only log of match results, for standings at any point in time.
+
+Every change to a match's result is logged as an event: recording a match
+adds its result, deleting one takes it back, and an edit does both. Each
+event is one JSON line in '<data file>.log':
+
+    [time, sign, team1_id, team2_id, winner (1, 2 or 0 for a draw),
+     game_diff, point_diff, [ids of the players who won a sub-match]]
+
+with sign 1 or -1 and the differentials from team 1's side. A data file
+without a log starts from one event per existing match at the time it was
+played, plus one per archive segment at its last match:
+
+    [time, 'segment', team_id -> team row, player_id -> points]
+
+Every CHECKPOINT_INTERVAL events the running team and player totals are
+kept in memory, so totals as of a time are the nearest earlier checkpoint
+plus at most CHECKPOINT_INTERVAL events, however long the season is.
+"""
+import json
+import os
+from bisect import bisect_right
+
+import game_scores
+
+CHECKPOINT_INTERVAL = 256
+
+
+def match_event(match, sign, time):
+    """Returns the log event that adds (sign=1) or takes back (sign=-1) a match's result."""
+    winner_id = match.get('winner_id')
+    winner = 0 if winner_id is None else 1 if winner_id == match['team1_id'] else 2
+    game_diff, point_diff = game_scores.match_differentials(match)
+    winners = [player_id for sub_match in match.get('sub_matches', [])
+               for player_id in sub_match.get('winner_player_ids', [])]
+    return [time, sign, match['team1_id'], match['team2_id'], winner, game_diff, point_diff, winners]
+
+
+def starting_events(data):
+    """Returns events that rebuild the current results of tournament data, in time order."""
+    log = [match_event(match, 1, match['timestamp']) for match in data['matches'].values()]
+    for segment in data['archive']:
+        teams = {team_id: (list(row) + [0, 0])[:6] for team_id, row in segment['teams'].items()}
+        players = {player_id: points for player_id, (points, _) in segment['players'].items()}
+        log.append([segment['last'], 'segment', teams, players])
+    log.sort(key=lambda event: event[0])
+    return log
+
+
+def apply_event(teams, players, event):
+    """Adds one event to team rows [wins, losses, draws, played, game_diff, point_diff] and player points."""
+    if event[1] == 'segment':
+        for team_id, segment_row in event[2].items():
+            row = teams.setdefault(team_id, [0, 0, 0, 0, 0, 0])
+            for i, value in enumerate(segment_row):
+                row[i] += value
+        for player_id, points in event[3].items():
+            players[player_id] = players.get(player_id, 0) + points
+        return
+
+    _, sign, team1_id, team2_id, winner, game_diff, point_diff, winners = event
+    row1 = teams.setdefault(team1_id, [0, 0, 0, 0, 0, 0])
+    row2 = teams.setdefault(team2_id, [0, 0, 0, 0, 0, 0])
+    row1[3] += sign
+    row2[3] += sign
+    row1[4] += sign * game_diff
+    row2[4] -= sign * game_diff
+    row1[5] += sign * point_diff
+    row2[5] -= sign * point_diff
+    if winner == 0:
+        row1[2] += sign
+        row2[2] += sign
+    elif winner == 1:
+        row1[0] += sign
+        row2[1] += sign
+    else:
+        row2[0] += sign
+        row1[1] += sign
+    for player_id in winners:
+        players[player_id] = players.get(player_id, 0) + sign
+
+
+class MatchLog:
+    """The result events of one data file, in time order, with checkpointed running totals."""
+
+    def __init__(self, path):
+        self.path = path
+        self.pending = []  # added but not yet written
+        self._started = False
+        self._from_file = False
+        self._offset = 0
+        self._clear()
+
+    def _clear(self):
+        self._events = []
+        self._times = []
+        self._checkpoints = [({}, {})]  # totals after 0, INTERVAL, 2 * INTERVAL, ... events
+
+    def _insert(self, event):
+        if self._times and event[0] < self._times[-1]:
+            position = bisect_right(self._times, event[0])
+            self._times.insert(position, event[0])
+            self._events.insert(position, event)
+            # Checkpoints past the insertion point no longer hold
+            del self._checkpoints[position // CHECKPOINT_INTERVAL + 1:]
+        else:
+            self._times.append(event[0])
+            self._events.append(event)
+
+    def start(self, data):
+        """Reads the log file, or if there is none yet, starts from the current data (in memory only)."""
+        if self._started:
+            return
+        self._started = True
+        if os.path.exists(self.path):
+            self.refresh()
+        else:
+            for event in starting_events(data):
+                self._insert(event)
+
+    def add(self, event):
+        """Adds an event; it is written to the file on the next flush."""
+        self._insert(event)
+        self.pending.append(event)
+
+    def refresh(self):
+        """Reads the events other writers appended since the last read, or all of them if the file is new
+        to us or was rewritten."""
+        if not self._started:
+            return
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if not self._from_file or size < self._offset:
+            self._clear()
+            self._offset = 0
+            self._from_file = True
+            for event in self.pending:
+                self._insert(event)
+        if size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        complete = chunk[:chunk.rfind(b'\n') + 1]  # another writer may be mid-line
+        for line in complete.splitlines():
+            if line.strip():
+                self._insert(json.loads(line))
+        self._offset += len(complete)
+
+    def flush(self):
+        """Appends pending events to the file. A new file gets the starting events too."""
+        if not self.pending:
+            return
+        if os.path.exists(self.path):
+            self.refresh()
+            lines = self.pending
+        else:
+            lines = self._events  # starting events plus pending, in time order
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in lines))
+        self._offset = os.path.getsize(self.path)
+        self._from_file = True
+        self.pending = []
+
+    def reset(self, data):
+        """Restarts the log from new data (import or reset), removing the old file."""
+        self._clear()
+        self.pending = []
+        self._started = True
+        self._from_file = False
+        self._offset = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        for event in starting_events(data):
+            self._insert(event)
+
+    def totals_as_of(self, time):
+        """Returns (team_id -> [wins, losses, draws, played, game_diff, point_diff], player_id -> points)
+        counting the events up to and including time (an ISO timestamp)."""
+        count = bisect_right(self._times, time)
+        index = count // CHECKPOINT_INTERVAL
+        while len(self._checkpoints) <= index:
+            teams, players = self._copy(*self._checkpoints[-1])
+            start = (len(self._checkpoints) - 1) * CHECKPOINT_INTERVAL
+            for event in self._events[start:start + CHECKPOINT_INTERVAL]:
+                apply_event(teams, players, event)
+            self._checkpoints.append((teams, players))
+        teams, players = self._copy(*self._checkpoints[index])
+        for event in self._events[index * CHECKPOINT_INTERVAL:count]:
+            apply_event(teams, players, event)
+        return teams, players
+
+    @staticmethod
+    def _copy(teams, players):
+        return {team_id: list(row) for team_id, row in teams.items()}, dict(players)
@@ -0,0 +1,252 @@
+"""In-memory records for teams, players, matches and sub-matches.
+
+Loaded data has its teams and matches converted from JSON dicts into these
+__slots__ classes, which take a fraction of a dict's memory. Hot loops use
+plain attribute access (match.winner_id). The records also answer dict-style access
+(match['winner_id'], sub_match.get('games')), so code shared with plain dict
+data, such as summaries of other seasons' files, works on both. Records turn
+back into dicts only when JSON is written: plain() for the whole data file,
+to_json as json.dump's default hook elsewhere.
+
+Team and player ids are UUID strings in the data file, the exports, the
+API, Firestore and the dict-style accessors, so they stay unique across
+scoring desks sharing one file. Inside match and sub-match records they are
+held as dense integers from the process-wide IDS table (attribute access
+gives the integer, dict-style access the UUID). The integers index plain
+lists, so standings and points count into arrays instead of dicts. They are
+never written to the shared data file; archive segments, which one process
+writes once, store them with their own id table.
+"""
+import sys
+
+
+class IdTable:
+    """Two-way mapping between UUID strings and dense integers, numbered in the order first seen."""
+
+    def __init__(self):
+        self._numbers = {}
+        self._uuids = []
+
+    def number(self, uuid):
+        """Returns the uuid's integer, assigning the next one if needed."""
+        number = self._numbers.get(uuid)
+        if number is None:
+            number = self._numbers[uuid] = len(self._uuids)
+            self._uuids.append(sys.intern(uuid))
+        return number
+
+    def uuid(self, number):
+        return self._uuids[number]
+
+    def __len__(self):
+        return len(self._uuids)
+
+    def __contains__(self, uuid):
+        return uuid in self._numbers
+
+
+IDS = IdTable()
+
+
+def _to_number(uuid):
+    return None if uuid is None else IDS.number(uuid)
+
+
+def _to_uuid(number):
+    return None if number is None else IDS._uuids[number]
+
+
+class Record:
+    """Base class: named slots for known fields, a dict for any unknown ones, dict-style access."""
+
+    __slots__ = ('_extra',)
+    FIELDS = ()
+    OPTIONAL = ()  # fields left out of the JSON (and treated as absent) while None
+    REFS = ()  # team/player id fields held as IDS numbers
+    REF_LISTS = ()  # tuples of player ids held as IDS numbers
+
+    def __init__(self, **fields):
+        self._extra = None
+        # Every slot is set, so reading an absent field is a plain attribute read rather than an exception
+        for key in self.FIELDS:
+            setattr(self, key, None)
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_json(cls, data):
+        """Returns a record for a JSON dict (a record is returned unchanged)."""
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            value = getattr(self, key)
+            if key in self._ref_set:
+                return self._export(key, value)
+            if value is not None or key not in self.OPTIONAL:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            if key in self.REFS:
+                value = _to_number(value)
+            elif key in self.REF_LISTS:
+                value = tuple(IDS.number(uuid) for uuid in value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        if key in self._field_set:
+            value = getattr(self, key)
+            if key in self._ref_set:
+                return self._export(key, value)
+            return default if value is None and key in self.OPTIONAL else value
+        return self._extra.get(key, default) if self._extra else default
+
+    def _export(self, key, value):
+        """Returns a REFS or REF_LISTS value with its numbers turned back into UUIDs."""
+        if key in self.REFS:
+            return _to_uuid(value)
+        return tuple(IDS._uuids[number] for number in value)
+
+    def to_json(self):
+        data = {key: getattr(self, key) for key in self.FIELDS}
+        for key in self.OPTIONAL:
+            if data[key] is None:
+                del data[key]
+        for key in self.REFS:
+            data[key] = _to_uuid(data[key])
+        uuids = IDS._uuids
+        for key in self.REF_LISTS:
+            data[key] = [uuids[number] for number in data[key]]
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def copy(self):
+        """Returns an independent copy of the record, including nested records."""
+        return type(self).from_json(self.to_json())
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_json()
+        return isinstance(other, dict) and self.to_json() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_json()!r})"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+        cls._ref_set = frozenset(cls.REFS + cls.REF_LISTS)
+
+
+class Player(Record):
+    FIELDS = ('name', 'skill')
+    __slots__ = FIELDS
+
+
+class Team(Record):
+    FIELDS = ('name', 'players')
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_json(cls, data):
+        if isinstance(data, cls):
+            return data
+        team = cls(**data)
+        team.players = {sys.intern(player_id): Player.from_json(player)
+                        for player_id, player in data.get('players', {}).items()}
+        return team
+
+    def to_json(self):
+        data = super().to_json()
+        data['players'] = {player_id: player.to_json() for player_id, player in self.players.items()}
+        return data
+
+
+class SubMatch(Record):
+    """winner_side is 1 or 2 for the side that won, 0 for a draw."""
+    FIELDS = ('type', 'team1_player_ids', 'team2_player_ids', 'winner_player_ids', 'winner_side', 'games', 'rallies')
+    OPTIONAL = ('winner_side', 'games', 'rallies')
+    REF_LISTS = ('team1_player_ids', 'team2_player_ids', 'winner_player_ids')
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_json(cls, data):
+        if isinstance(data, cls):
+            return data
+        sub_match = cls(**data)
+        for key in cls.REF_LISTS:
+            if getattr(sub_match, key) is None:
+                setattr(sub_match, key, ())
+        return sub_match
+
+
+class Match(Record):
+    FIELDS = ('team1_id', 'team2_id', 'team1_name', 'team2_name', 'sub_matches', 'timestamp',
+              'winner_name', 'winner_id', 'team1_sub_match_wins', 'team2_sub_match_wins', 'fixture_id')
+    REFS = ('team1_id', 'team2_id', 'winner_id')
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_json(cls, data):
+        if isinstance(data, cls):
+            return data
+        match = cls(**data)
+        match.sub_matches = [SubMatch.from_json(sub_match) for sub_match in data.get('sub_matches', [])]
+        return match
+
+    def to_json(self):
+        data = super().to_json()
+        data['sub_matches'] = [sub_match.to_json() for sub_match in self.sub_matches]
+        return data
+
+
+def attach(data):
+    """Converts tournament data's teams and matches to records, in place."""
+    # Teams are numbered before matches so IDS numbers follow the roster order
+    data['teams'] = {sys.intern(team_id): Team.from_json(team) for team_id, team in data['teams'].items()}
+    for team_id, team in data['teams'].items():
+        IDS.number(team_id)
+        for player_id in team.players:
+            IDS.number(player_id)
+    matches = data['matches']
+    for match_id, match in matches.items():
+        if not isinstance(match, Match):
+            matches[match_id] = Match.from_json(match)
+
+
+def plain(data):
+    """Returns a shallow copy of tournament data with its records turned back into dicts.
+
+    Dumping this is much faster than leaving every record to json.dump's default hook.
+    """
+    data = dict(data)
+    data['teams'] = {team_id: Team.from_json(team).to_json() for team_id, team in data['teams'].items()}
+    data['matches'] = {match_id: Match.from_json(match).to_json() for match_id, match in data['matches'].items()}
+    return data
+
+
+def to_json(obj):
+    """json.dump default hook: writes records as plain dicts."""
+    if isinstance(obj, Record):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,111 @@
+"""Rank and points of every team and player after each match day, from one pass over the results.
+
+The results are swept once in time order (match_log.starting_events, so
+archive segments count on the day of their last match). Each ranking keeps
+the keys of all its teams or players in a sorted list; after a day only the
+keys that changed are moved, and a rank is one binary search:
+
+    rank = 1 + number of keys greater than this one
+
+so tied teams or players share a rank, as in "1, 2, 2, 4". Teams rank on
+(wins, game_diff, point_diff) like the standings, players on points.
+"""
+from bisect import bisect_left, bisect_right, insort
+from itertools import groupby
+
+import numpy as np
+
+import match_log
+
+
+class _Ranking:
+    """Sorted keys of a fixed set of ids, updated in place as their totals change."""
+
+    def __init__(self, ids, zero):
+        self.keys = dict.fromkeys(ids, zero)
+        self.sorted = [zero] * len(self.keys)
+
+    def update(self, entity_id, key):
+        old = self.keys.get(entity_id)
+        if old is None or old == key:
+            return
+        del self.sorted[bisect_left(self.sorted, old)]
+        insort(self.sorted, key)
+        self.keys[entity_id] = key
+
+    def rank(self, entity_id):
+        return len(self.sorted) - bisect_right(self.sorted, self.keys[entity_id]) + 1
+
+
+class RankProgression:
+    """Per-day series: team_ranks[i, d] is the rank of team_ids[i] at the end of days[d].
+
+    team_points holds each team's wins, player_points each player's points.
+    """
+
+    def __init__(self, days, team_ids, team_names, team_ranks, team_points,
+                 player_ids, player_names, player_ranks, player_points):
+        self.days = days
+        self.team_ids = team_ids
+        self.team_names = team_names
+        self.team_ranks = team_ranks
+        self.team_points = team_points
+        self.player_ids = player_ids
+        self.player_names = player_names
+        self.player_ranks = player_ranks
+        self.player_points = player_points
+
+    def csv_rows(self):
+        """Yields a header and one [date, kind, id, name, rank, points] row per team or player and day."""
+        yield ["Date", "Kind", "ID", "Name", "Rank", "Points"]
+        for kind, ids, names, ranks, points in (
+                ('team', self.team_ids, self.team_names, self.team_ranks, self.team_points),
+                ('player', self.player_ids, self.player_names, self.player_ranks, self.player_points)):
+            ranks, points = ranks.tolist(), points.tolist()
+            for d, day in enumerate(self.days):
+                for i, entity_id in enumerate(ids):
+                    yield [day, kind, entity_id, names[i], ranks[i][d], points[i][d]]
+
+
+def compute(data):
+    """Returns the RankProgression of the current teams and players of tournament data."""
+    team_ids = list(data['teams'])
+    team_names = [team['name'] for team in data['teams'].values()]
+    player_ids = []
+    player_names = []
+    for team in data['teams'].values():
+        for player_id, player in team['players'].items():
+            player_ids.append(player_id)
+            player_names.append(player['name'])
+
+    team_ranking = _Ranking(team_ids, (0, 0, 0))
+    player_ranking = _Ranking(player_ids, 0)
+    teams, players = {}, {}
+    days = []
+    team_columns, player_columns = [], []
+
+    for day, day_events in groupby(match_log.starting_events(data), key=lambda event: event[0][:10]):
+        changed_teams, changed_players = set(), set()
+        for event in day_events:
+            match_log.apply_event(teams, players, event)
+            if event[1] == 'segment':
+                changed_teams.update(event[2])
+                changed_players.update(event[3])
+            else:
+                changed_teams.update(event[2:4])
+                changed_players.update(event[7])
+        for team_id in changed_teams:
+            row = teams[team_id]
+            team_ranking.update(team_id, (row[0], row[4], row[5]))
+        for player_id in changed_players:
+            player_ranking.update(player_id, players[player_id])
+
+        days.append(day)
+        team_columns.append([(team_ranking.rank(team_id), team_ranking.keys[team_id][0]) for team_id in team_ids])
+        player_columns.append([(player_ranking.rank(player_id), player_ranking.keys[player_id])
+                               for player_id in player_ids])
+
+    team_series = np.array(team_columns, dtype=np.int32).reshape(len(days), len(team_ids), 2)
+    player_series = np.array(player_columns, dtype=np.int32).reshape(len(days), len(player_ids), 2)
+    return RankProgression(days, team_ids, team_names, team_series[:, :, 0].T.copy(), team_series[:, :, 1].T.copy(),
+                           player_ids, player_names, player_series[:, :, 0].T.copy(), player_series[:, :, 1].T.copy())
@@ -0,0 +1,258 @@
+"""Season-end HTML reports for every team and player, rendered in worker processes.
+
+generate() takes a read-only snapshot of the tournament data (plain dicts,
+see TournamentManager.get_report_snapshot) and writes:
+
+    index.html                  links to every report, teams in standings order
+    team_<team_id>.html         record, roster, head-to-head and results
+    player_<player_id>.html     record and sub-match results
+
+Each worker process gets the snapshot once, when it starts, and summarizes
+it once (archive.summarize_matches plus the archive segment summaries);
+after that a task renders one team and its players from the summary, so
+the work per task is proportional to that team's own matches.
+
+PDF copies are written next to the HTML when WeasyPrint is installed.
+"""
+import html
+import os
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import archive
+import game_scores
+
+try:
+    import weasyprint
+except ImportError:  # PDF output is optional
+    weasyprint = None
+
+REPORT_DIR = 'reports'
+
+STYLE = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin-bottom: 1.5em; }
+th, td { border: 1px solid #ccc; padding: 4px 10px; text-align: center; }
+th { background: #eee; }
+td.name { text-align: left; }
+"""
+
+
+def summarize(snapshot):
+    """Returns the totals, head-to-head records and per-team/per-player match lists reports are built from."""
+    matches = snapshot['matches']
+    summary = archive.summarize_matches(matches)
+    teams = summary['teams']
+    players = summary['players']
+    head_to_head = {}
+    for segment in snapshot['archive']:
+        for team_id, row in segment['teams'].items():
+            total = teams.setdefault(team_id, [0, 0, 0, 0, 0, 0])
+            for i, value in enumerate(row):
+                total[i] += value
+        for player_id, row in segment['players'].items():
+            total = players.setdefault(player_id, [0, 0])
+            total[0] += row[0]
+            total[1] += row[1]
+    for t1_id, t2_id, wins, losses, draws, _ in summary['head_to_head'] + [
+            row for segment in snapshot['archive'] for row in segment.get('head_to_head', [])]:
+        for team_id, opponent_id, won, lost in ((t1_id, t2_id, wins, losses), (t2_id, t1_id, losses, wins)):
+            record = head_to_head.setdefault(team_id, {}).setdefault(opponent_id, [0, 0, 0])
+            record[0] += won
+            record[1] += lost
+            record[2] += draws
+
+    team_matches = {}
+    player_sub_matches = {}
+    for match_id, match in sorted(matches.items(), key=lambda item: item[1]['timestamp'], reverse=True):
+        team_matches.setdefault(match['team1_id'], []).append(match_id)
+        team_matches.setdefault(match['team2_id'], []).append(match_id)
+        for position, sub_match in enumerate(match.get('sub_matches', [])):
+            for player_id in sub_match.get('team1_player_ids', []) + sub_match.get('team2_player_ids', []):
+                player_sub_matches.setdefault(player_id, []).append((match_id, position))
+
+    # Ranks as in the standings: ties share a rank
+    team_keys = {team_id: (row[0], row[4], row[5]) for team_id, row in teams.items() if team_id in snapshot['teams']}
+    roster = [player_id for team in snapshot['teams'].values() for player_id in team['players']]
+    return {
+        'teams': teams,
+        'players': players,
+        'head_to_head': head_to_head,
+        'team_matches': team_matches,
+        'player_sub_matches': player_sub_matches,
+        'player_names': {player_id: player['name'] for team in snapshot['teams'].values()
+                         for player_id, player in team['players'].items()},
+        'team_ranks': _ranks(team_keys),
+        'player_ranks': _ranks({player_id: players.get(player_id, [0, 0])[0] for player_id in roster}),
+    }
+
+
+def _ranks(keys):
+    """Returns id -> rank for a dict of sort keys, highest key first and ties sharing a rank."""
+    ranks = {}
+    previous = None
+    for position, (entity_id, key) in enumerate(sorted(keys.items(), key=lambda item: item[1], reverse=True), 1):
+        if key != previous:
+            rank, previous = position, key
+        ranks[entity_id] = rank
+    return ranks
+
+
+# Names, dates and results repeat across thousands of rows; each distinct text is escaped once
+_escape = lru_cache(maxsize=65536)(html.escape)
+
+
+def _table(headers, rows, name_columns=(0,)):
+    head = ''.join(f"<th>{_escape(header)}</th>" for header in headers)
+    opening = ['<td class="name">' if i in name_columns else '<td>' for i in range(len(headers))]
+    body = ''.join(
+        '<tr>' + ''.join(f"{opening[i]}{_escape(cell) if isinstance(cell, str) else cell}</td>"
+                         for i, cell in enumerate(row)) + '</tr>'
+        for row in rows)
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+
+def _page(title, body):
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{_escape(title)}</title>"
+            f"<style>{STYLE}</style></head><body><h1>{_escape(title)}</h1>{body}</body></html>")
+
+
+def _date(timestamp):
+    return timestamp[:16].replace('T', ' ')  # ISO timestamp to YYYY-MM-DD HH:MM
+
+
+def _write(out_dir, file_name, text, pdf):
+    path = os.path.join(out_dir, file_name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    if pdf:
+        weasyprint.HTML(string=text, base_url=out_dir).write_pdf(os.path.splitext(path)[0] + '.pdf')
+    return path
+
+
+def render_team(snapshot, summary, team_id):
+    """Returns the HTML report of one team."""
+    team = snapshot['teams'][team_id]
+    teams = snapshot['teams']
+    wins, losses, draws, played, game_diff, point_diff = summary['teams'].get(team_id, [0, 0, 0, 0, 0, 0])
+    body = [f"<p>Rank {summary['team_ranks'].get(team_id, '-')} &middot; {played} played &middot; "
+            f"{wins} W / {losses} L / {draws} D &middot; game diff {game_diff:+d} &middot; "
+            f"point diff {point_diff:+d}</p>"]
+
+    roster = sorted(team['players'].items(), key=lambda item: summary['players'].get(item[0], [0, 0])[0],
+                    reverse=True)
+    body.append("<h2>Roster</h2>")
+    body.append(_table(("Player", "Skill", "Points", "Sub-matches", "Rank"), [
+        (player['name'], player['skill'], *summary['players'].get(player_id, [0, 0]),
+         summary['player_ranks'].get(player_id, '-'))
+        for player_id, player in roster]))
+
+    records = summary['head_to_head'].get(team_id, {})
+    body.append("<h2>Head-to-Head</h2>")
+    body.append(_table(("Opponent", "W", "L", "D"), [
+        (teams[opponent_id]['name'], *records[opponent_id])
+        for opponent_id in sorted(records, key=lambda opponent_id: teams.get(opponent_id, {}).get('name', ''))
+        if opponent_id in teams]))
+
+    rows = []
+    for match_id in summary['team_matches'].get(team_id, []):
+        match = snapshot['matches'][match_id]
+        first = match['team1_id'] == team_id
+        opponent = match['team2_name'] if first else match['team1_name']
+        own, other = match['team1_sub_match_wins'], match['team2_sub_match_wins']
+        if not first:
+            own, other = other, own
+        result = 'D' if match.get('winner_id') is None else 'W' if match['winner_id'] == team_id else 'L'
+        rows.append((_date(match['timestamp']), opponent, f"{own}-{other}", result))
+    body.append("<h2>Results</h2>")
+    body.append(_table(("Date", "Opponent", "Sub-matches", "Result"), rows, name_columns=(1,)))
+    return _page(team['name'], ''.join(body))
+
+
+def render_player(snapshot, summary, team_id, player_id):
+    """Returns the HTML report of one player."""
+    teams = snapshot['teams']
+    player = teams[team_id]['players'][player_id]
+    names = summary['player_names']
+    points, sub_match_count = summary['players'].get(player_id, [0, 0])
+    body = [f"<p>{_escape(teams[team_id]['name'])} &middot; {_escape(str(player['skill']))} &middot; "
+            f"{points} points from {sub_match_count} sub-matches &middot; "
+            f"rank {summary['player_ranks'].get(player_id, '-')}</p>"]
+
+    rows = []
+    for match_id, position in summary['player_sub_matches'].get(player_id, []):
+        match = snapshot['matches'][match_id]
+        sub_match = match['sub_matches'][position]
+        own_side = 'team1_player_ids' if player_id in sub_match['team1_player_ids'] else 'team2_player_ids'
+        other_side = 'team2_player_ids' if own_side == 'team1_player_ids' else 'team1_player_ids'
+        partners = ', '.join(names.get(other_id, '?') for other_id in sub_match[own_side] if other_id != player_id)
+        opponents = ', '.join(names.get(other_id, '?') for other_id in sub_match[other_side])
+        if player_id in sub_match['winner_player_ids']:
+            result = 'W'
+        elif sub_match['winner_player_ids']:
+            result = 'L'
+        else:
+            result = 'D'
+        scores = game_scores.format_scores(sub_match.get('games'))
+        if scores and own_side == 'team2_player_ids':
+            scores = ', '.join('-'.join(reversed(game.split('-'))) for game in scores.split(', '))
+        rows.append((_date(match['timestamp']), sub_match['type'].title(), partners, opponents, scores, result))
+    body.append("<h2>Sub-matches</h2>")
+    body.append(_table(("Date", "Type", "Partner", "Opponents", "Games", "Result"), rows, name_columns=(2, 3)))
+    return _page(player['name'], ''.join(body))
+
+
+def render_index(snapshot, summary):
+    """Returns the HTML index linking every team and player report, teams in standings order."""
+    teams = snapshot['teams']
+    rows = []
+    for team_id in sorted(teams, key=lambda team_id: summary['team_ranks'].get(team_id, len(teams))):
+        team = teams[team_id]
+        players = ', '.join(f"<a href=\"player_{player_id}.html\">{_escape(player['name'])}</a>"
+                            for player_id, player in team['players'].items())
+        rows.append(f"<tr><td>{summary['team_ranks'].get(team_id, '-')}</td><td class=\"name\">"
+                    f"<a href=\"team_{team_id}.html\">{_escape(team['name'])}</a></td>"
+                    f"<td class=\"name\">{players}</td></tr>")
+    return _page("Season Reports", f"<table><tr><th>Rank</th><th>Team</th><th>Players</th></tr>{''.join(rows)}</table>")
+
+
+# Worker state, set once per process by _start_worker
+_worker = {}
+
+
+def _start_worker(snapshot, out_dir, pdf):
+    _worker.update(snapshot=snapshot, summary=summarize(snapshot), out_dir=out_dir, pdf=pdf)
+
+
+def _render_team_reports(team_id):
+    """Worker task: writes the reports of one team and its players. Returns the paths written."""
+    snapshot, summary, out_dir, pdf = _worker['snapshot'], _worker['summary'], _worker['out_dir'], _worker['pdf']
+    paths = [_write(out_dir, f"team_{team_id}.html", render_team(snapshot, summary, team_id), pdf)]
+    for player_id in snapshot['teams'][team_id]['players']:
+        paths.append(_write(out_dir, f"player_{player_id}.html",
+                            render_player(snapshot, summary, team_id, player_id), pdf))
+    return paths
+
+
+def generate(snapshot, out_dir, pdf=False, workers=None, progress=None):
+    """Writes the index and every team and player report to out_dir. Returns the paths written.
+
+    Teams are rendered in parallel by up to workers processes (default: one
+    per CPU); progress(done, total) is called as each team's reports finish.
+    Raises RuntimeError if pdf is asked for without WeasyPrint installed.
+    """
+    if pdf and weasyprint is None:
+        raise RuntimeError("PDF reports need the weasyprint package.")
+    os.makedirs(out_dir, exist_ok=True)
+    team_ids = list(snapshot['teams'])
+    paths = [_write(out_dir, 'index.html', render_index(snapshot, summarize(snapshot)), pdf)]
+    if not team_ids:
+        return paths
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(team_ids)),
+                             initializer=_start_worker, initargs=(snapshot, out_dir, pdf)) as executor:
+        futures = [executor.submit(_render_team_reports, team_id) for team_id in team_ids]
+        for done, future in enumerate(as_completed(futures), 1):
+            paths.extend(future.result())
+            if progress:
+                progress(done, len(team_ids))
+    return paths
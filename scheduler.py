@@ -0,0 +1,52 @@
+"""Round-robin fixture generation and table/time-slot allocation."""
+
+
+def round_robin_rounds(team_ids, double_round=False):
+    """Returns a list of rounds, each a list of (team1_id, team2_id) pairs, using the circle method.
+
+    With an odd number of teams a dummy entry is added and whoever meets it sits the round out.
+    A double round repeats every round with the sides swapped.
+    """
+    teams = list(team_ids)
+    if len(teams) < 2:
+        return []
+    if len(teams) % 2:
+        teams.append(None)
+
+    n = len(teams)
+    half = n // 2
+    fixed = teams[0]
+    rotating = teams[1:]
+    rounds = []
+    for round_index in range(n - 1):
+        order = [fixed] + rotating
+        pairs = []
+        for i in range(half):
+            team1, team2 = order[i], order[n - 1 - i]
+            if team1 is None or team2 is None:
+                continue
+            # Alternate sides for the fixed team so it isn't always Team 1
+            if i == 0 and round_index % 2:
+                team1, team2 = team2, team1
+            pairs.append((team1, team2))
+        rounds.append(pairs)
+        rotating = rotating[-1:] + rotating[:-1]
+
+    if double_round:
+        rounds += [[(team2, team1) for team1, team2 in pairs] for pairs in rounds]
+    return rounds
+
+
+def allocate_slots(rounds, num_tables):
+    """Assigns each fixture a time slot and table.
+
+    Yields (round_no, slot, table, team1_id, team2_id). Every team plays at most once per
+    round, so filling the tables of a slot from a single round never double-books a team.
+    Slots and tables are numbered from 0 and 1 respectively.
+    """
+    slot = 0
+    for round_no, pairs in enumerate(rounds, start=1):
+        for offset in range(0, len(pairs), num_tables):
+            for table, (team1_id, team2_id) in enumerate(pairs[offset:offset + num_tables], start=1):
+                yield round_no, slot, table, team1_id, team2_id
+            slot += 1
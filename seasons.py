@@ -0,0 +1,134 @@
+"""Catalog of seasons (separate tournaments), each stored in its own data file.
+
+The catalog is a small JSON file listing every season with its data file and a
+summary of its results (team records and player points), so past seasons can
+be listed and compared without parsing their data files. A tournament that has
+never created a second season has no catalog at all.
+"""
+import json
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+CATALOG_FILE = 'seasons.json'
+SEASONS_DIR = 'seasons'
+
+
+class SeasonCatalog:
+    def __init__(self, path):
+        self.path = path
+        self.active = None
+        self.seasons = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                catalog = json.load(f)
+            self.active = catalog['active']
+            self.seasons = catalog['seasons']
+
+    def exists(self):
+        return bool(self.seasons)
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'active': self.active, 'seasons': self.seasons}, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def add_season(self, name, data_file, summary=None):
+        """Registers a season and returns its id."""
+        season_id = str(uuid.uuid4())
+        self.seasons[season_id] = {
+            'name': name,
+            'file': data_file,
+            'created': datetime.now().isoformat(),
+            'summary': summary or empty_summary()
+        }
+        return season_id
+
+    def data_file(self, season_id):
+        """Returns the season's data file path, resolved against the catalog's directory."""
+        return os.path.join(os.path.dirname(self.path), self.seasons[season_id]['file'])
+
+    def new_data_file(self):
+        """Returns (relative path, absolute path) for a new season's data file."""
+        relative = os.path.join(SEASONS_DIR, f"season_{uuid.uuid4().hex[:12]}.json")
+        absolute = os.path.join(os.path.dirname(self.path), relative)
+        os.makedirs(os.path.dirname(absolute), exist_ok=True)
+        return relative, absolute
+
+
+def empty_summary():
+    return {'teams': {}, 'players': {}, 'matches': 0}
+
+
+def summarize(data):
+    """Returns per-team records and per-player points for one season's data."""
+    teams = {team_id: {'name': team['name'], 'wins': 0, 'losses': 0, 'draws': 0, 'matches_played': 0}
+             for team_id, team in data['teams'].items()}
+    players = {}
+    for team_id, team in data['teams'].items():
+        for player_id, player in team['players'].items():
+            players[player_id] = {'name': player['name'], 'team_name': team['name'], 'points': 0, 'sub_matches': 0}
+
+    for match in data['matches'].values():
+        t1_id, t2_id, winner_id = match['team1_id'], match['team2_id'], match.get('winner_id')
+        for team_id in (t1_id, t2_id):
+            if team_id in teams:
+                record = teams[team_id]
+                record['matches_played'] += 1
+                if winner_id is None:
+                    record['draws'] += 1
+                elif winner_id == team_id:
+                    record['wins'] += 1
+                else:
+                    record['losses'] += 1
+        for sub_match in match.get('sub_matches', []):
+            for player_id in sub_match.get('team1_player_ids', []) + sub_match.get('team2_player_ids', []):
+                if player_id in players:
+                    players[player_id]['sub_matches'] += 1
+            for player_id in sub_match.get('winner_player_ids', []):
+                if player_id in players:
+                    players[player_id]['points'] += 1
+
+    matches = len(data['matches'])
+    for segment in data.get('archive', []):
+        matches += segment['matches']
+        for team_id, (wins, losses, draws, played, *_) in segment['teams'].items():
+            if team_id in teams:
+                record = teams[team_id]
+                record['wins'] += wins
+                record['losses'] += losses
+                record['draws'] += draws
+                record['matches_played'] += played
+        for player_id, (points, sub_matches) in segment['players'].items():
+            if player_id in players:
+                players[player_id]['points'] += points
+                players[player_id]['sub_matches'] += sub_matches
+
+    return {'teams': teams, 'players': players, 'matches': matches}
+
+
+class SeasonCache:
+    """Keeps the most recently browsed seasons' data so browsing back and forth doesn't re-parse files."""
+
+    def __init__(self, max_seasons=3):
+        self.max_seasons = max_seasons
+        self._entries = OrderedDict()
+
+    def get(self, season_id, path):
+        data = self._entries.get(season_id)
+        if data is None:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        self.put(season_id, data)
+        return data
+
+    def put(self, season_id, data):
+        self._entries[season_id] = data
+        self._entries.move_to_end(season_id)
+        if len(self._entries) > self.max_seasons:
+            self._entries.popitem(last=False)
+
+    def pop(self, season_id):
+        return self._entries.pop(season_id, None)
@@ -0,0 +1,119 @@
+"""Sharing one data file between several app instances (scoring desks).
+
+Each desk remembers the data as it last read or wrote it (the base) and the
+file's revision stamp at that point. Saving takes an advisory lock on a side
+file, and if another desk has committed since (the stamp on disk moved on),
+this desk's changes are three-way merged into the file's current contents
+rather than overwriting them. Changes to different records (two matches, two
+players, two bracket slots) merge cleanly; two desks changing the same value
+differently is a conflict, and the value already on disk is kept.
+
+The lock is only held to read, merge and write the file, never while someone
+is typing, and waiting desks retry after short random sleeps rather than
+queueing behind each other in lockstep.
+"""
+import os
+import random
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_MISSING = object()
+
+
+@contextmanager
+def file_lock(path, timeout=10.0):
+    """Holds an exclusive advisory lock on path (created if missing). Raises TimeoutError."""
+    deadline = time.monotonic() + timeout
+    delay = 0.002
+    with open(path, 'a+') as f:
+        while True:
+            try:
+                _try_lock(f)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for the lock on {path}")
+                time.sleep(random.uniform(0, delay))
+                delay = min(delay * 2, 0.1)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+def _try_lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def read_text(path):
+    """Returns the file's contents, or None if it doesn't exist."""
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_text(path, text):
+    """Replaces the file's contents atomically, so readers never see a half-written file."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def merge(base, ours, theirs):
+    """Three-way merges two edited copies of base. Returns (merged, conflicting key paths).
+
+    Dicts merge key by key, lists of unchanged length merge item by item, and
+    lists that both sides only appended to keep both sides' additions. Where
+    both sides changed the same value differently, theirs is kept.
+    """
+    conflicts = []
+    return _merge(base, ours, theirs, (), conflicts), conflicts
+
+
+def _merge(base, ours, theirs, path, conflicts):
+    if ours == theirs:
+        return theirs
+    if ours == base:
+        return theirs
+    if theirs == base:
+        return ours
+
+    if isinstance(base, dict) and isinstance(ours, dict) and isinstance(theirs, dict):
+        merged = {}
+        for key in dict.fromkeys(list(theirs) + list(ours)):
+            value = _merge(base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING),
+                           path + (key,), conflicts)
+            if value is not _MISSING:
+                merged[key] = value
+        return merged
+
+    if isinstance(base, list) and isinstance(ours, list) and isinstance(theirs, list):
+        if len(base) == len(ours) == len(theirs):
+            return [_merge(b, o, t, path + (i,), conflicts) for i, (b, o, t) in enumerate(zip(base, ours, theirs))]
+        n = len(base)
+        if ours[:n] == base and theirs[:n] == base:
+            return theirs + [item for item in ours[n:] if item not in theirs[n:]]
+
+    conflicts.append(path)
+    return theirs
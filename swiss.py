@@ -0,0 +1,155 @@
+"""Swiss-system pairing.
+
+Teams are ranked by score and paired top-down within score groups; a team that
+cannot be paired inside its group floats down to the next one. That greedy pass
+pairs almost everybody, and any teams it leaves over are fixed with augmenting
+paths (Edmonds' blossom algorithm) over the graph of pairings that would not be
+rematches. Only the few teams left unpaired need a search, so a 500-team round
+takes milliseconds rather than a search over every possible pairing.
+"""
+from collections import deque
+
+
+def scores_from_matches(matches, byes=()):
+    """Returns (scores, sub_match_diff, played_pairs) from match records.
+
+    A win or a bye scores 1 point and a draw half a point for each team.
+    played_pairs holds a frozenset of the two team ids for every match played.
+    """
+    scores = {}
+    sub_match_diff = {}
+    played_pairs = set()
+    for match in matches.values():
+        team1_id, team2_id = match['team1_id'], match['team2_id']
+        played_pairs.add(frozenset((team1_id, team2_id)))
+        winner_id = match.get('winner_id')
+        if winner_id is None:
+            scores[team1_id] = scores.get(team1_id, 0) + 0.5
+            scores[team2_id] = scores.get(team2_id, 0) + 0.5
+        else:
+            scores[winner_id] = scores.get(winner_id, 0) + 1
+        diff = match.get('team1_sub_match_wins', 0) - match.get('team2_sub_match_wins', 0)
+        sub_match_diff[team1_id] = sub_match_diff.get(team1_id, 0) + diff
+        sub_match_diff[team2_id] = sub_match_diff.get(team2_id, 0) - diff
+    for team_id in byes:
+        scores[team_id] = scores.get(team_id, 0) + 1
+    return scores, sub_match_diff, played_pairs
+
+
+def pair_round(ranked_team_ids, played_pairs, had_bye=()):
+    """Pairs one Swiss round.
+
+    ranked_team_ids must be in standings order (score, then tie-breaks). Returns
+    (pairs, bye_team_id) with pairs ordered from the top board down. Raises
+    ValueError if every pairing would need a rematch.
+    """
+    teams = list(ranked_team_ids)
+    bye_team_id = None
+    if len(teams) % 2:
+        # The bye goes to the lowest-ranked team that hasn't had one yet
+        had_bye = set(had_bye)
+        bye_index = next((i for i in range(len(teams) - 1, -1, -1) if teams[i] not in had_bye), len(teams) - 1)
+        bye_team_id = teams.pop(bye_index)
+
+    n = len(teams)
+    played = [[False] * n for _ in range(n)]
+    index_of = {team_id: i for i, team_id in enumerate(teams)}
+    for pair in played_pairs:
+        if len(pair) != 2:
+            continue
+        a, b = pair
+        if a in index_of and b in index_of:
+            played[index_of[a]][index_of[b]] = played[index_of[b]][index_of[a]] = True
+
+    match = _greedy_pairing(n, played)
+    if -1 in match:
+        # Neighbours in the standings come first so augmenting paths disturb as little as possible
+        adjacency = [sorted((j for j in range(n) if j != i and not played[i][j]), key=lambda j: abs(i - j))
+                     for i in range(n)]
+        for root in range(n):
+            if match[root] == -1:
+                _augment(n, adjacency, match, root)
+        if -1 in match:
+            raise ValueError("No pairing exists without a rematch.")
+
+    pairs = [(teams[i], teams[match[i]]) for i in range(n) if i < match[i]]
+    return pairs, bye_team_id
+
+
+def _greedy_pairing(n, played):
+    """Pairs each team with the highest-ranked unpaired team below it it hasn't played.
+
+    Scanning in standings order keeps pairings inside score groups, and a team
+    whose group is exhausted floats down to the next group automatically.
+    """
+    match = [-1] * n
+    unpaired = list(range(n))
+    while unpaired:
+        i = unpaired.pop(0)
+        for position, j in enumerate(unpaired):
+            if not played[i][j]:
+                match[i], match[j] = j, i
+                del unpaired[position]
+                break
+    return match
+
+
+def _augment(n, adjacency, match, root):
+    """Searches for an augmenting path from an unmatched vertex and flips it if found."""
+    parent = [-1] * n
+    base = list(range(n))
+    used = [False] * n
+    used[root] = True
+    queue = deque([root])
+
+    def lowest_common_ancestor(a, b):
+        seen = [False] * n
+        while True:
+            a = base[a]
+            seen[a] = True
+            if match[a] == -1:
+                break
+            a = parent[match[a]]
+        while True:
+            b = base[b]
+            if seen[b]:
+                return b
+            b = parent[match[b]]
+
+    def mark_path(v, blossom_base, child, blossom):
+        while base[v] != blossom_base:
+            blossom[base[v]] = blossom[base[match[v]]] = True
+            parent[v] = child
+            child = match[v]
+            v = parent[match[v]]
+
+    while queue:
+        v = queue.popleft()
+        for to in adjacency[v]:
+            if base[v] == base[to] or match[v] == to:
+                continue
+            if to == root or (match[to] != -1 and parent[match[to]] != -1):
+                # Odd cycle: contract the blossom onto its base
+                blossom_base = lowest_common_ancestor(v, to)
+                blossom = [False] * n
+                mark_path(v, blossom_base, to, blossom)
+                mark_path(to, blossom_base, v, blossom)
+                for i in range(n):
+                    if blossom[base[i]]:
+                        base[i] = blossom_base
+                        if not used[i]:
+                            used[i] = True
+                            queue.append(i)
+            elif parent[to] == -1:
+                parent[to] = v
+                if match[to] == -1:
+                    while to != -1:
+                        previous = parent[to]
+                        next_to = match[previous]
+                        match[to] = previous
+                        match[previous] = to
+                        to = next_to
+                    return True
+                used[match[to]] = True
+                queue.append(match[to])
+    return False
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import tournament_manager
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    """Returns a function that opens a TournamentManager on a data file in tmp_path.
+
+    With data, the file is written first (as an older version would have left
+    it). Nothing is published and every confirmation is answered yes.
+    """
+    def make(data=None, name='tournament_data.json', **kwargs):
+        path = tmp_path / name
+        if data is not None:
+            path.write_text(json.dumps(data))
+        kwargs.setdefault('notifier', tournament_manager.ConsoleNotifier(assume_yes=True))
+        return tournament_manager.TournamentManager(data_file=str(path), publish=False, **kwargs)
+    return make
+
+
+class RecordingNotifier:
+    """A notifier that keeps (title, message) for every message and answers yes."""
+
+    def __init__(self):
+        self.errors = []
+
+    def showerror(self, title, message, **kwargs):
+        self.errors.append((title, message))
+
+    showwarning = showinfo = showerror
+
+    def askyesno(self, title, message, **kwargs):
+        return True
+
+
+class League:
+    """Teams named by letter with one player each, and shorthand for recording singles between them."""
+
+    def __init__(self, manager, names):
+        self.manager = manager
+        self.teams = {}
+        self.players = {}
+        for name in names:
+            team_id, _ = manager.create_team(name)
+            manager.add_player(team_id, f"{name}1", "Beginner")
+            self.teams[name] = team_id
+            self.players[name] = manager.get_players_for_team(team_id)[0][0]
+        manager.undo_stack.clear()
+
+    def sub(self, team1, team2, winner):
+        """A singles sub-match between two teams' players, won by winner's (None for a draw)."""
+        return {'type': 'singles', 'team1_player_ids': [self.players[team1]],
+                'team2_player_ids': [self.players[team2]],
+                'winner_player_ids': [self.players[winner]] if winner else []}
+
+    def record(self, team1, team2, winner):
+        """Records a one-sub-match match and returns its id."""
+        success, message = self.manager.record_match(self.teams[team1], self.teams[team2],
+                                                     [self.sub(team1, team2, winner)])
+        assert success, message
+        return next(reversed(self.manager.data['matches']))
+
+
+@pytest.fixture
+def league(make_manager):
+    return League(make_manager(), "ABCD")
@@ -0,0 +1,155 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import api_server
+
+
+class FakeWriter:
+    """Collects what a handler writes to its connection."""
+
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _get(server, request):
+    """Sends one raw request to handle_client and returns the response (head, body)."""
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(request)
+        reader.feed_eof()
+        writer = FakeWriter()
+        await server.handle_client(reader, writer)
+        return writer.data
+    head, _, body = asyncio.run(run()).partition(b'\r\n\r\n')
+    return head.decode('latin-1'), body
+
+
+def test_views_are_built_once_per_revision(league):
+    server = api_server.ReadAPIServer(league.manager)
+    league.record('A', 'B', 'A')
+    status, body, etag = server.route('/standings', {})
+    assert status == HTTPStatus.OK
+    assert json.loads(body)['standings'][0]['name'] == 'A'
+    assert server.route('/standings/', {}) == (status, body, etag)
+    assert server.route('/standings', {})[1] is body
+
+    league.record('C', 'D', 'D')
+    status, new_body, new_etag = server.route('/standings', {})
+    assert new_etag != etag
+    assert json.loads(new_body)['revision'] == league.manager.data['revision']
+
+
+def test_if_none_match_gets_an_empty_304_until_the_data_changes(league):
+    server = api_server.ReadAPIServer(league.manager)
+    head, body = _get(server, b'GET /players HTTP/1.1\r\nConnection: close\r\n\r\n')
+    assert head.startswith('HTTP/1.1 200')
+    etag = next(line for line in head.split('\r\n') if line.startswith('ETag: '))[6:]
+
+    request = f'GET /players HTTP/1.1\r\nConnection: close\r\nIf-None-Match: W/{etag}\r\n\r\n'.encode()
+    head, body = _get(server, request)
+    assert head.startswith('HTTP/1.1 304') and body == b''
+
+    league.record('A', 'B', 'B')
+    head, body = _get(server, request)
+    assert head.startswith('HTTP/1.1 200')
+    assert json.loads(body)['players'][0]['name'] == 'B1'
+
+
+def test_match_pages_and_details(league):
+    server = api_server.ReadAPIServer(league.manager)
+    first = league.record('A', 'B', 'A')
+    league.record('C', 'D', 'C')
+    league.record('A', 'C', 'C')
+
+    status, body, _ = server.route('/matches', {'page': ['1'], 'per_page': ['2'], 'team': [league.teams['A']]})
+    page = json.loads(body)
+    assert status == HTTPStatus.OK
+    assert (page['total'], page['per_page'], len(page['matches'])) == (2, 2, 2)
+
+    status, body, _ = server.route(f'/matches/{first}', {})
+    match = json.loads(body)
+    assert (match['score'], match['winner_name']) == ('1-0', 'A')
+    assert match['sub_matches'][0]['team1_players'] == ['A1']
+
+    assert server.route('/matches/missing', {})[0] == HTTPStatus.NOT_FOUND
+    assert server.route('/teams', {})[0] == HTTPStatus.NOT_FOUND
+    assert server.route('/matches', {'page': ['x']})[0] == HTTPStatus.BAD_REQUEST
+    assert server.route('/matches', {'from': ['yesterday']})[0] == HTTPStatus.BAD_REQUEST
+
+
+def _events(messages):
+    """Decodes server-sent event messages into (event, data) pairs."""
+    decoded = []
+    for message in messages:
+        lines = dict(line.split(': ', 1) for line in message.decode('utf-8').strip().split('\n'))
+        decoded.append((lines['event'], json.loads(lines['data'])))
+    return decoded
+
+
+def test_a_client_that_falls_behind_gets_one_resync():
+    client = api_server.FeedClient()
+    for number in range(api_server.MAX_QUEUED_EVENTS):
+        client.push(api_server._sse('match_deleted', {'id': number}))
+    assert len(client.take()) == api_server.MAX_QUEUED_EVENTS
+    assert not client.ready.is_set()
+
+    for number in range(api_server.MAX_QUEUED_EVENTS + 5):
+        client.push(api_server._sse('match_deleted', {'id': number}))
+    client.merge_rows('standings', {'t1': {'team_id': 't1'}}, [], 7)
+    assert client.ready.is_set()
+    assert _events(client.take()) == [('resync', {})]
+    assert client.take() == []
+
+
+def test_a_slow_client_only_gets_the_latest_version_of_each_row():
+    client = api_server.FeedClient()
+    client.merge_rows('players', {'p1': {'player_id': 'p1', 'points': 1}, 'p2': {'player_id': 'p2', 'points': 1}},
+                      [], 4)
+    client.merge_rows('players', {'p1': {'player_id': 'p1', 'points': 2}}, ['p2'], 5)
+    assert _events(client.take()) == [
+        ('players', {'revision': 5, 'rows': [{'player_id': 'p1', 'points': 2}], 'removed': ['p2']})]
+
+
+def test_check_leaderboards_sends_only_the_changed_rows(league):
+    feed = api_server.LiveFeed(league.manager)
+    client = feed.connect()
+    league.record('A', 'B', 'A')
+    feed.check_leaderboards()
+    messages = dict(_events(client.take()))
+    assert messages['match_recorded']['winner_name'] == 'A'
+    assert {row['name'] for row in messages['standings']['rows']} == {'A', 'B'}
+    assert {row['name'] for row in messages['players']['rows']} == {'A1'}
+    assert messages['standings']['revision'] == league.manager.data['revision']
+
+    feed.check_leaderboards()
+    assert client.take() == []
+
+    league.manager.delete_team(league.teams['D'])
+    feed.check_leaderboards()
+    messages = dict(_events(client.take()))
+    assert messages['standings']['removed'] == [league.teams['D']]
+    assert messages['players']['removed'] == [league.players['D']]
+    assert messages['roster_changed'] == {'team_id': league.teams['D'], 'deleted': True}
+
+
+def test_replacing_the_data_resyncs_every_client(league):
+    feed = api_server.LiveFeed(league.manager)
+    clients = [feed.connect(), feed.connect()]
+    league.record('A', 'B', 'A')
+    league.manager.replace_data(league.manager._default_data())
+    feed.check_leaderboards()
+    assert [_events(client.take()) for client in clients] == [[('resync', {})]] * 2
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from datagen import generate_tournament
+
+
+def _totals(manager):
+    player_ids = [player_id for team in manager.data['teams'].values() for player_id in team['players']]
+    team_ids = list(manager.data['teams'])
+    return {
+        'standings': manager.calculate_standings(),
+        'points': manager.calculate_player_points(),
+        'opponents': {player_id: sorted(manager.get_nemesis_opponents(player_id)) for player_id in player_ids},
+        'head_to_head': {(a, b): manager.get_head_to_head(a, b) for a in team_ids for b in team_ids if a != b},
+    }
+
+
+def test_archiving_keeps_every_total_and_the_matches_readable(make_manager):
+    manager = make_manager(generate_tournament(num_teams=4, players_per_team=3, num_matches=60))
+    before = _totals(manager)
+    matches = {match_id: match.to_json() for match_id, match in manager.data['matches'].items()}
+    cutoff = sorted(match['timestamp'] for match in matches.values())[40]
+
+    success, message = manager.archive_matches(datetime.fromisoformat(cutoff))
+    assert success, message
+    assert len(manager.data['matches']) == 20
+    assert _totals(manager) == before
+
+    # The summaries stand in for the archived matches when the file is opened again
+    reopened = type(manager)(data_file=manager.data_file, publish=False, notifier=manager.notifier)
+    assert _totals(reopened) == before
+    segment_id = reopened.data['archive'][0]['id']
+    rows, archived = reopened.get_archived_matches(segment_id)
+    assert len(rows) == 40
+    assert archived == {
+        match_id: match for match_id, match in matches.items() if match['timestamp'] < cutoff}
+
+
+def test_archived_records_of_deleted_teams_are_hidden(make_manager):
+    manager = make_manager(generate_tournament(num_teams=4, players_per_team=3, num_matches=60))
+    latest = max(match['timestamp'] for match in manager.data['matches'].values())
+    success, message = manager.archive_matches(datetime.fromisoformat(latest) + timedelta(seconds=1))
+    assert success, message
+    team_id = next(iter(manager.data['teams']))
+    deleted = set(manager.data['teams'][team_id]['players'])
+    kept = [player_id for team in manager.data['teams'].values() for player_id in team['players']
+            if player_id not in deleted]
+    before = {player_id: sorted(manager.get_nemesis_opponents(player_id)) for player_id in kept}
+    assert any(row[0] in deleted for rows in before.values() for row in rows)
+
+    manager.delete_team(team_id)
+    for player_id in kept:
+        assert not any(row[0] in deleted for row in manager.get_nemesis_opponents(player_id))
+        assert not any(row[0] in deleted for row in manager.get_best_partners(player_id))
+        assert all(manager.get_opponent_record(player_id, other_id) == (0, 0, 0) for other_id in deleted)
+    assert all(manager.get_nemesis_opponents(player_id) == [] for player_id in deleted)
+
+    manager.undo()
+    assert {player_id: sorted(manager.get_nemesis_opponents(player_id)) for player_id in kept} == before
@@ -0,0 +1,30 @@
+import json
+import threading
+
+import background
+
+
+class FakeMaster:
+    """Stands in for the Tk root; callbacks are not needed by these tests."""
+
+    def after(self, ms, fn):
+        pass
+
+
+def test_queued_saves_of_different_files_are_both_written(make_manager):
+    manager = make_manager()
+    manager.background = background.BackgroundExecutor(FakeMaster())
+    first_file = manager.data_file
+    busy = threading.Event()
+    manager.background.submit("Busy", busy.wait)
+
+    manager.create_team("Aces")  # queued behind the busy task
+    manager.create_season("Season 2")  # saves the old season, then the new one
+    manager.create_team("Blades")
+    busy.set()
+    manager.background.shutdown()
+
+    with open(first_file) as f:
+        assert [team['name'] for team in json.load(f)['teams'].values()] == ["Aces"]
+    with open(manager.data_file) as f:
+        assert [team['name'] for team in json.load(f)['teams'].values()] == ["Aces", "Blades"]
@@ -0,0 +1,166 @@
+import pytest
+
+import bracket
+
+
+def _teams(count):
+    return [f"T{i:02d}" for i in range(count)]
+
+
+def _play_out(state, teams):
+    """Plays every due match, the better seed (lower id) winning, until there is a champion.
+
+    Returns the number of matches played.
+    """
+    played = 0
+    while bracket.champion(state) is None:
+        for team_id in teams:
+            pending = bracket.next_match(state, team_id)
+            if pending and pending[1] not in (bracket.TBD, bracket.BYE):
+                opponent_id = pending[1]
+                assert bracket.report_result(state, team_id, opponent_id, min(team_id, opponent_id))
+                played += 1
+                break
+        else:
+            raise AssertionError("no match is due but the bracket is unfinished")
+    return played
+
+
+@pytest.mark.parametrize('count', [2, 3, 5, 6, 7, 9])
+def test_single_elimination_odd_counts_advance_to_the_top_seed(count):
+    teams = _teams(count)
+    state = bracket.create_bracket(teams)
+    assert _play_out(state, teams) == count - 1
+    assert bracket.champion(state) == teams[0]
+
+
+@pytest.mark.parametrize('count', [3, 5, 6, 7, 9])
+def test_double_elimination_odd_counts_eliminate_everyone_twice(count):
+    teams = _teams(count)
+    state = bracket.create_bracket(teams, double_elimination=True)
+    # The unbeaten top seed wins the grand final, so every other team loses exactly twice
+    assert _play_out(state, teams) == 2 * (count - 1)
+    assert bracket.champion(state) == teams[0]
+
+
+def _reach_grand_final(state):
+    """Plays a four-team double-elimination bracket up to the grand final: T00 unbeaten, T01 from the losers side."""
+    for team1_id, team2_id, winner_id in [('T00', 'T03', 'T00'), ('T01', 'T02', 'T01'), ('T00', 'T01', 'T00'),
+                                          ('T03', 'T02', 'T03'), ('T01', 'T03', 'T01')]:
+        assert bracket.report_result(state, team1_id, team2_id, winner_id)
+    assert bracket.next_match(state, 'T01') == (('F',), 'T00')
+
+
+def test_grand_final_reset_when_the_losers_side_wins():
+    state = bracket.create_bracket(_teams(4), double_elimination=True)
+    _reach_grand_final(state)
+    assert bracket.report_result(state, 'T01', 'T00', 'T01')
+    # Both finalists have now lost once, so they play again
+    assert bracket.champion(state) is None
+    assert bracket.next_match(state, 'T00') == (('R',), 'T01')
+    assert bracket.bracket_rounds(state)[-1] == ("Grand Final Reset", [('T00', 'T01', bracket.TBD)])
+    assert bracket.report_result(state, 'T00', 'T01', 'T00')
+    assert bracket.champion(state) == 'T00'
+    assert bracket.next_match(state, 'T01') is None
+
+
+def test_no_reset_when_the_unbeaten_team_wins_the_grand_final():
+    state = bracket.create_bracket(_teams(4), double_elimination=True)
+    _reach_grand_final(state)
+    assert bracket.report_result(state, 'T00', 'T01', 'T00')
+    assert bracket.champion(state) == 'T00'
+    assert bracket.bracket_rounds(state)[-1][0] == "Grand Final"
+
+    # Brackets saved without the reset entries finish at the first final
+    state = bracket.create_bracket(_teams(4), double_elimination=True)
+    state['final'] = state['final'][:3]
+    _reach_grand_final(state)
+    assert bracket.report_result(state, 'T01', 'T00', 'T01')
+    assert bracket.champion(state) == 'T01'
+
+
+def test_byes_go_to_the_top_seeds():
+    state = bracket.create_bracket(_teams(5))
+    first_round = bracket.bracket_rounds(state)[0][1]
+    byes = [winner for team_a, team_b, winner in first_round if bracket.BYE in (team_a, team_b)]
+    assert sorted(byes) == ['T00', 'T01', 'T02']
+    assert bracket.next_match(state, 'T00') == (('W', 1), bracket.TBD)
+
+
+def test_report_result_ignores_teams_not_due_to_meet():
+    state = bracket.create_bracket(_teams(4))
+    assert not bracket.report_result(state, 'T00', 'T01', 'T00')
+    assert state['results'] == []
+
+
+def test_replay_without_a_result_reopens_its_slot():
+    state = bracket.create_bracket(_teams(4))
+    bracket.report_result(state, 'T00', 'T03', 'T00', 'm1')
+    bracket.report_result(state, 'T01', 'T02', 'T02', 'm2')
+
+    replayed = bracket.replay(state, state['results'][1:])
+    assert bracket.next_match(replayed, 'T00') == (('W', 1), 'T03')
+    assert bracket.next_match(replayed, 'T02') == (('W', 0), bracket.TBD)
+    assert replayed['results'] == [['m2', 'T01', 'T02', 'T02']]
+    # The original is untouched
+    assert bracket.next_match(state, 'T00') == (('W', 0), 'T02')
+
+
+def test_replay_refuses_when_a_later_match_depends_on_a_removed_result():
+    state = bracket.create_bracket(_teams(4))
+    bracket.report_result(state, 'T00', 'T03', 'T00', 'm1')
+    bracket.report_result(state, 'T01', 'T02', 'T02', 'm2')
+    bracket.report_result(state, 'T00', 'T02', 'T00', 'm3')
+    assert bracket.replay(state, state['results'][1:]) is None
+
+
+def _bracket_winners(manager):
+    return [[match[2] for match in matches] for _, matches in manager.get_bracket_view()]
+
+
+def test_deleting_or_editing_a_bracket_match_moves_the_bracket_with_it(league):
+    manager = league.manager
+    manager.create_bracket()  # A v D, B v C
+    match_id = league.record('A', 'D', 'A')
+    assert _bracket_winners(manager) == [['A', 'TBD'], ['TBD']]
+
+    success, _ = manager.update_match(match_id, [league.sub('A', 'D', 'D')])
+    assert success
+    assert _bracket_winners(manager) == [['D', 'TBD'], ['TBD']]
+    assert manager.get_next_bracket_match(league.teams['D']) == "TBD"
+
+    success, _ = manager.delete_match(match_id)
+    assert success
+    assert _bracket_winners(manager) == [['TBD', 'TBD'], ['TBD']]
+
+    manager.undo()
+    assert _bracket_winners(manager) == [['D', 'TBD'], ['TBD']]
+    manager.undo()
+    assert _bracket_winners(manager) == [['A', 'TBD'], ['TBD']]
+    manager.redo()
+    assert _bracket_winners(manager) == [['D', 'TBD'], ['TBD']]
+
+
+def test_a_bracket_match_a_later_round_depends_on_is_locked(league):
+    manager = league.manager
+    manager.create_bracket()
+    first_id = league.record('A', 'D', 'A')
+    league.record('B', 'C', 'B')
+    league.record('A', 'B', 'B')
+
+    success, message = manager.delete_match(first_id)
+    assert not success and "later bracket match" in message
+    success, message = manager.update_match(first_id, [league.sub('A', 'D', 'D')])
+    assert not success and "later bracket match" in message
+    assert first_id in manager.data['matches']
+    assert manager.get_bracket_champion() == 'B'
+
+    # Editing without changing the winner is fine
+    success, _ = manager.update_match(first_id, [league.sub('A', 'D', 'A')])
+    assert success
+
+
+def test_matches_can_be_edited_and_deleted_without_a_bracket(league):
+    match_id = league.record('A', 'B', 'A')
+    assert league.manager.update_match(match_id, [league.sub('A', 'B', 'B')])[0]
+    assert league.manager.delete_match(match_id)[0]
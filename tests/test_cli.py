@@ -0,0 +1,44 @@
+import json
+
+import cli
+
+
+def _run(league, *args):
+    return cli.main(['--data', league.manager.data_file, *args])
+
+
+def test_record_exit_codes(league, capsys):
+    assert _run(league, 'record', 'A', 'B', '--sub', 'singles', 'A1', 'Nobody', '1') == 1
+    assert "No player 'Nobody' in B." in capsys.readouterr().err
+    assert _run(league, 'record', 'A', 'B', '--sub', 'singles', 'A1', 'B1', '1', '9-11 5-11') == 1
+    assert "don't match the winning side" in capsys.readouterr().err
+    assert _run(league, 'record', 'A', 'B', '--sub', 'singles', 'A1', 'B1', '1', '11-11') == 1
+    assert "has no winner" in capsys.readouterr().err
+
+    assert _run(league, 'record', 'A', 'B', '--sub', 'singles', 'A1', 'B1', '1', '11-9 8-11 11-7') == 0
+    with open(league.manager.data_file) as f:
+        [match] = json.load(f)['matches'].values()
+    assert match['winner_id'] == league.teams['A']
+
+
+def test_export_import_round_trip(league, tmp_path, capsys):
+    league.record('A', 'B', 'A')
+    league.record('C', 'D', None)
+    backup = str(tmp_path / 'backup.json')
+    assert _run(league, 'export', backup) == 0
+    before = _standings(league, capsys)
+
+    assert _run(league, 'import', str(tmp_path / 'missing.json')) == 1
+    other = tmp_path / 'other.json'
+    other.write_text(json.dumps({'teams': {}, 'matches': {}, 'skill_levels': []}))
+    assert _run(league, 'import', str(other)) == 0
+    assert _standings(league, capsys) == []
+
+    assert _run(league, 'import', backup) == 0
+    assert _standings(league, capsys) == before
+
+
+def _standings(league, capsys):
+    capsys.readouterr()
+    assert _run(league, 'standings', '--json') == 0
+    return json.loads(capsys.readouterr().out)
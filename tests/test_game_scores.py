@@ -0,0 +1,47 @@
+import pytest
+
+import game_scores
+from conftest import RecordingNotifier
+
+
+def test_scores_round_trip_through_the_stored_form():
+    scores = game_scores.parse("11-9, 8-11 11-7")
+    assert list(scores) == [11, 9, 8, 11, 11, 7]
+    encoded = game_scores.encode(scores)
+    assert game_scores.decode(encoded) == scores
+    assert game_scores.format_scores(encoded) == "11-9, 8-11, 11-7"
+    assert game_scores.totals(encoded) == (2, 1, 30, 27)
+
+
+def test_rallies_round_trip_and_must_match_the_scores():
+    games = game_scores.encode(game_scores.parse("3-1"))
+    won = [True, False, True, True]
+    rallies = game_scores.encode_rallies(won)
+    assert game_scores.decode_rallies(rallies, games) == won
+    game_scores.validate({'games': games, 'rallies': rallies})
+
+    wrong = game_scores.encode_rallies([True, False, False, True])
+    with pytest.raises(ValueError, match="does not add up"):
+        game_scores.validate({'games': games, 'rallies': wrong})
+
+
+@pytest.mark.parametrize('text', ["11-11", "11-9, 0-0", "11", "11-x", "300-2"])
+def test_parse_rejects_malformed_and_tied_games(text):
+    with pytest.raises(ValueError):
+        game_scores.parse(text)
+
+
+@pytest.mark.parametrize('games', [[[11, 5], [5, 11], [11, 9]], 42, "not base64!", "CwsFBQ=="])
+def test_validate_rejects_bad_stored_scores(games):
+    with pytest.raises(ValueError):
+        game_scores.validate({'games': games})
+
+
+def test_record_match_reports_non_text_game_scores(league):
+    league.manager.notifier = RecordingNotifier()
+    sub_match = dict(league.sub('A', 'B', 'A'), games=[[11, 5], [5, 11], [11, 9]])
+    success, message = league.manager.record_match(league.teams['A'], league.teams['B'], [sub_match])
+    assert not success
+    assert league.manager.notifier.errors == [
+        ("Invalid Game Scores", "Stored game scores should be base64 text, not a list or number.")]
+    assert league.manager.data['matches'] == {}
@@ -0,0 +1,57 @@
+import random
+from datetime import datetime, timedelta
+
+from datagen import generate_tournament
+
+
+def _brute_force(manager, team_id=None, player_id=None, match_type=None, start=None, end=None):
+    found = []
+    for match_id, match in manager.data['matches'].items():
+        timestamp = datetime.fromisoformat(match['timestamp'])
+        if team_id is not None and team_id not in (match['team1_id'], match['team2_id']):
+            continue
+        if start is not None and timestamp < start or end is not None and timestamp >= end:
+            continue
+        sub_matches = [sub_match for sub_match in match['sub_matches']
+                       if player_id is None
+                       or player_id in sub_match['team1_player_ids'] + sub_match['team2_player_ids']]
+        if not sub_matches:
+            continue
+        if match_type is not None and not any(sub_match['type'] == match_type for sub_match in sub_matches):
+            continue
+        found.append((match['timestamp'], match_id))
+    return [match_id for _, match_id in sorted(found, reverse=True)]
+
+
+def test_queries_match_a_scan_of_every_match(make_manager):
+    manager = make_manager(generate_tournament(num_teams=6, players_per_team=4, num_matches=150))
+    rng = random.Random(0)
+    team_ids = list(manager.data['teams'])
+    player_ids = [player_id for team in manager.data['teams'].values() for player_id in team['players']]
+    first = min(datetime.fromisoformat(match['timestamp']) for match in manager.data['matches'].values())
+    # Changes after loading go through the incremental index updates
+    match_ids = list(manager.data['matches'])
+    manager.delete_match(match_ids[0])
+    manager.delete_team(team_ids.pop())
+
+    for _ in range(200):
+        filters = {
+            'team_id': rng.choice([None, rng.choice(team_ids)]),
+            'player_id': rng.choice([None, None, rng.choice(player_ids)]),
+            'match_type': rng.choice([None, 'singles', 'doubles']),
+            'start': rng.choice([None, first + timedelta(days=rng.randrange(200))]),
+            'end': rng.choice([None, first + timedelta(days=rng.randrange(200))]),
+        }
+        rows, total = manager.query_matches(**filters)
+        expected = _brute_force(manager, **filters)
+        assert [row['id'] for row in rows] == expected
+        assert total == len(expected)
+
+
+def test_pages_split_the_newest_first_order(make_manager):
+    manager = make_manager(generate_tournament(num_teams=4, players_per_team=2, num_matches=25))
+    everything, total = manager.query_matches()
+    pages = [manager.query_matches(page=page, per_page=10) for page in (1, 2, 3)]
+    assert [row['id'] for rows, _ in pages for row in rows] == [row['id'] for row in everything]
+    assert [len(rows) for rows, _ in pages] == [10, 10, 5]
+    assert all(page_total == total == 25 for _, page_total in pages)
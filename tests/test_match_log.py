@@ -0,0 +1,81 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import game_scores
+import match_log
+import tournament_manager
+from datagen import generate_tournament
+
+
+class Clock(datetime):
+    """Stands in for datetime in tournament_manager, so now() is whatever the test sets."""
+    current = datetime(2024, 3, 1, 18, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(tournament_manager, 'datetime', Clock)
+    return Clock
+
+
+def _brute_force(manager, time):
+    """Standings computed from scratch over only the matches played by time."""
+    view = manager.snapshot()
+    view.data['matches'] = {match_id: match for match_id, match in manager.data['matches'].items()
+                            if match['timestamp'] <= time.isoformat()}
+    return view.calculate_standings()
+
+
+def test_standings_as_of_match_a_recount_of_the_matches_played_by_then(make_manager, monkeypatch):
+    monkeypatch.setattr(match_log, 'CHECKPOINT_INTERVAL', 16)
+    manager = make_manager(generate_tournament(num_teams=6, players_per_team=3, num_matches=200))
+    times = sorted(datetime.fromisoformat(match['timestamp']) for match in manager.data['matches'].values())
+    rng = random.Random(0)
+    checks = [times[0] - timedelta(days=1), times[-1]] + [rng.choice(times) for _ in range(30)]
+    checks += [time + timedelta(seconds=1) for time in checks[2:]]
+    for time in checks:
+        assert manager.standings_as_of(time) == _brute_force(manager, time)
+
+
+def test_standings_as_of_follow_edits_and_deletes_made_later(league, clock, monkeypatch):
+    monkeypatch.setattr(match_log, 'CHECKPOINT_INTERVAL', 4)
+    manager = league.manager
+    rng = random.Random(2)
+    history = []  # (time, standings right after the change made then)
+    names = list(league.teams)
+    for step in range(40):
+        clock.current += timedelta(minutes=rng.randrange(1, 90))
+        match_ids = list(manager.data['matches'])
+        action = rng.random()
+        if match_ids and action < 0.15:
+            manager.delete_match(rng.choice(match_ids))
+        elif match_ids and action < 0.35:
+            match_id = rng.choice(match_ids)
+            match = manager.data['matches'][match_id]
+            team1, team2 = (next(name for name in names if league.teams[name] == match[key])
+                            for key in ('team1_id', 'team2_id'))
+            winner = rng.choice([team1, team2])
+            sub_match = league.sub(team1, team2, winner)
+            sub_match['games'] = game_scores.encode(game_scores.parse("11-9 11-7" if winner == team1 else "9-11 7-11"))
+            assert manager.update_match(match_id, [sub_match])[0]
+        elif action < 0.4 and manager.undo_stack.undo_label:
+            manager.undo()
+        else:
+            team1, team2 = rng.sample(names, 2)
+            league.record(team1, team2, rng.choice([team1, team2, None]))
+        history.append((clock.current, manager.calculate_standings()))
+
+    for time, standings in history:
+        assert manager.standings_as_of(time) == standings
+        assert manager.standings_as_of(time + timedelta(seconds=30)) == standings
+
+    # A new manager reads the same history back from the log file
+    reopened = type(manager)(data_file=manager.data_file, publish=False, notifier=manager.notifier)
+    for time, standings in history:
+        assert reopened.standings_as_of(time) == standings
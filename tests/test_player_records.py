@@ -0,0 +1,62 @@
+from datagen import generate_tournament
+
+
+def _brute_force(manager):
+    """Recounts (partners, opponents) as {(player, other): [wins, losses, draws]} from the live matches."""
+    partners, opponents = {}, {}
+    for match in manager.data['matches'].values():
+        for sub_match in match.sub_matches:
+            sides = (sub_match['team1_player_ids'], sub_match['team2_player_ids'])
+            winners = set(sub_match['winner_player_ids'])
+            for side, players in enumerate(sides):
+                result = 2 if not winners else 0 if winners & set(players) else 1
+                for player_id in players:
+                    for other_id in players:
+                        if other_id != player_id:
+                            partners.setdefault((player_id, other_id), [0, 0, 0])[result] += 1
+                    for other_id in sides[1 - side]:
+                        opponents.setdefault((player_id, other_id), [0, 0, 0])[result] += 1
+    return partners, opponents
+
+
+def _check(manager):
+    partners, opponents = _brute_force(manager)
+    player_ids = [player_id for team in manager.data['teams'].values() for player_id in team['players']]
+    for player_id in player_ids:
+        for other_id in player_ids:
+            assert list(manager.get_partner_record(player_id, other_id)) == partners.get((player_id, other_id), [0, 0, 0])
+            assert list(manager.get_opponent_record(player_id, other_id)) == opponents.get((player_id, other_id), [0, 0, 0])
+
+
+def test_records_follow_every_change(make_manager):
+    manager = make_manager(generate_tournament(num_teams=4, players_per_team=3, num_matches=40, doubles_ratio=0.5))
+    _check(manager)
+
+    match_ids = list(manager.data['matches'])
+    manager.delete_match(match_ids[0])
+    _check(manager)
+    match = manager.data['matches'][match_ids[1]]
+    flipped = [dict(sub_match.to_json(), winner_side=None,
+                    winner_player_ids=sub_match['team2_player_ids'] if sub_match.winner_side == 1
+                    else sub_match['team1_player_ids'])
+               for sub_match in match.sub_matches]
+    success, message = manager.update_match(match_ids[1], flipped)
+    assert success, message
+    _check(manager)
+    manager.delete_team(next(iter(manager.data['teams'])))
+    _check(manager)
+    for _ in range(3):
+        manager.undo()
+        _check(manager)
+    manager.redo()
+    _check(manager)
+
+
+def test_best_partners_and_nemeses_order(league):
+    manager = league.manager
+    league.record('A', 'B', 'B')
+    league.record('A', 'B', 'B')
+    league.record('A', 'C', 'A')
+    nemeses = manager.get_nemesis_opponents(league.players['A'])
+    assert [(name, wins, losses) for _, name, wins, losses, _ in nemeses] == [("B1", 0, 2), ("C1", 1, 0)]
+    assert manager.get_best_partners(league.players['A']) == []
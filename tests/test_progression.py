@@ -0,0 +1,42 @@
+from datagen import generate_tournament
+
+
+def _ranks(keys):
+    """Competition ranks ("1, 2, 2, 4") for a dict of id -> sort key, higher keys first."""
+    return {entity_id: 1 + sum(other > key for other in keys.values()) for entity_id, key in keys.items()}
+
+
+def test_progression_matches_a_recount_for_every_day(make_manager):
+    manager = make_manager(generate_tournament(num_teams=5, players_per_team=3, num_matches=80))
+    result = manager.get_rank_progression()
+    assert result.days == sorted({match['timestamp'][:10] for match in manager.data['matches'].values()})
+
+    for d, day in enumerate(result.days):
+        view = manager.snapshot()
+        view.data['matches'] = {match_id: match for match_id, match in manager.data['matches'].items()
+                                if match['timestamp'][:10] <= day}
+        teams = {row['team_id']: (row['wins'], row['game_diff'], row['point_diff'])
+                 for row in view.calculate_standings()}
+        players = {row['player_id']: row['points'] for row in view.calculate_player_points()}
+        team_ranks, player_ranks = _ranks(teams), _ranks(players)
+
+        for i, team_id in enumerate(result.team_ids):
+            assert result.team_ranks[i, d] == team_ranks[team_id]
+            assert result.team_points[i, d] == teams[team_id][0]
+        for i, player_id in enumerate(result.player_ids):
+            assert result.player_ranks[i, d] == player_ranks[player_id]
+            assert result.player_points[i, d] == players[player_id]
+
+
+def test_progression_csv_has_a_row_per_entity_and_day(league):
+    league.record('A', 'B', 'A')
+    league.record('C', 'D', None)
+    result = league.manager.get_rank_progression()
+    rows = list(result.csv_rows())
+    assert rows[0] == ["Date", "Kind", "ID", "Name", "Rank", "Points"]
+    assert len(rows) == 1 + len(result.days) * 8
+    ranks = {row[3]: (row[4], row[5]) for row in rows[1:]}
+    assert ranks['A'] == (1, 1)
+    assert ranks['B'] == ranks['C'] == ranks['D'] == (2, 0)
+    assert ranks['A1'] == (1, 1)
+    assert ranks['D1'] == (2, 0)
@@ -0,0 +1,32 @@
+import os
+
+import reports
+
+
+def test_reports_cover_every_team_and_player(league, tmp_path):
+    league.record('A', 'B', 'A')
+    league.record('C', 'D', None)
+    out_dir = str(tmp_path / 'reports')
+    steps = []
+    paths = reports.generate(league.manager.get_report_snapshot(), out_dir, workers=1,
+                             progress=lambda done, total: steps.append((done, total)))
+
+    names = sorted(os.path.basename(path) for path in paths)
+    expected = ['index.html'] + [f"team_{team_id}.html" for team_id in league.teams.values()] + \
+               [f"player_{player_id}.html" for player_id in league.players.values()]
+    assert names == sorted(expected)
+    assert steps[-1] == (4, 4)
+    with open(os.path.join(out_dir, f"team_{league.teams['A']}.html"), encoding='utf-8') as f:
+        page = f.read()
+    assert "A1" in page and ">B<" in page
+
+
+def test_manager_reports_from_a_snapshot_view(league, tmp_path):
+    league.record('A', 'B', 'B')
+    view = league.manager.snapshot()
+    league.record('A', 'C', 'A')  # made after the snapshot, so not reported
+    success, message = view.generate_reports(str(tmp_path), workers=1)
+    assert success, message
+    assert message == f"Wrote 9 reports to {tmp_path}."
+    with open(tmp_path / f"team_{league.teams['C']}.html", encoding='utf-8') as f:
+        assert " 0 played " in f.read()
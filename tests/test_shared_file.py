@@ -0,0 +1,218 @@
+import json
+import time
+
+import background
+import events
+import shared_file
+import tournament_manager
+from conftest import League
+from datagen import generate_tournament
+
+
+class RecordingNotifier(tournament_manager.ConsoleNotifier):
+    def __init__(self):
+        super().__init__(assume_yes=True)
+        self.shown = []
+
+    def showerror(self, title, message, **kwargs):
+        self.shown.append(title)
+
+    showwarning = showinfo = showerror
+
+
+def test_merge_keeps_both_sides_changes_to_different_records():
+    base = {'teams': {'a': {'name': 'A'}, 'b': {'name': 'B'}}, 'skill_levels': ['x']}
+    ours = {'teams': {'a': {'name': 'A2'}, 'b': {'name': 'B'}, 'c': {'name': 'C'}}, 'skill_levels': ['x', 'y']}
+    theirs = {'teams': {'a': {'name': 'A'}}, 'skill_levels': ['x', 'z']}
+    merged, conflicts = shared_file.merge(base, ours, theirs)
+    assert conflicts == []
+    assert merged == {'teams': {'a': {'name': 'A2'}, 'c': {'name': 'C'}}, 'skill_levels': ['x', 'z', 'y']}
+
+
+def test_merge_keeps_theirs_on_a_conflict():
+    base = {'teams': {'a': {'name': 'A', 'players': {}}}}
+    ours = {'teams': {'a': {'name': 'Ours', 'players': {}}}}
+    theirs = {'teams': {'a': {'name': 'Theirs', 'players': {}}}}
+    merged, conflicts = shared_file.merge(base, ours, theirs)
+    assert conflicts == [('teams', 'a', 'name')]
+    assert merged['teams']['a']['name'] == 'Theirs'
+
+
+def test_merge_of_a_deleted_and_an_edited_record_is_a_conflict():
+    base = {'matches': {'m': {'winner_id': 'a'}}}
+    merged, conflicts = shared_file.merge(base, {'matches': {'m': {'winner_id': 'b'}}}, {'matches': {}})
+    assert conflicts == [('matches', 'm')]
+    assert merged == {'matches': {}}
+
+
+def _desks(make_manager, data=None):
+    notifiers = RecordingNotifier(), RecordingNotifier()
+    first = make_manager(data, shared=True, notifier=notifiers[0])
+    second = make_manager(shared=True, notifier=notifiers[1])
+    return first, second, notifiers
+
+
+def _saved(manager):
+    with open(manager.data_file) as f:
+        return json.load(f)
+
+
+def test_desks_editing_different_records_merge_cleanly(make_manager):
+    first, second, notifiers = _desks(make_manager)
+    first.create_team("Aces")
+    second.create_team("Blades")
+    saved = _saved(first)
+    assert sorted(team['name'] for team in saved['teams'].values()) == ["Aces", "Blades"]
+    assert saved['revision'] == 2
+    assert notifiers[1].shown == []
+
+
+def test_desks_editing_the_same_record_report_a_conflict(make_manager):
+    first, second, notifiers = _desks(make_manager)
+    team_id, _ = first.create_team("Aces")
+    second.reload_if_changed()
+    first.update_team_name(team_id, "First")
+    success, message = second.update_team_name(team_id, "Second")
+    assert not success and message.startswith("Another desk changed the same data")
+    assert notifiers[1].shown == ["Save Conflict"]
+    assert _saved(second)['teams'][team_id]['name'] == "First"
+    assert second.get_team(team_id)['name'] == "First"
+
+
+def test_legacy_file_without_a_revision_merges_without_a_false_conflict(make_manager):
+    legacy = {'teams': {}, 'matches': {}, 'skill_levels': ['Beginner']}
+    first, second, notifiers = _desks(make_manager, legacy)
+    first.create_team("Aces")
+    second.create_team("Blades")
+    assert notifiers[0].shown == notifiers[1].shown == []
+    saved = _saved(second)
+    assert sorted(team['name'] for team in saved['teams'].values()) == ["Aces", "Blades"]
+    assert saved['revision'] == 2
+
+
+def test_other_desks_commits_keep_undo_unless_they_touch_the_same_record(make_manager):
+    first, second, _ = _desks(make_manager)
+    aces_id, _ = first.create_team("Aces")
+    blades_id, _ = second.create_team("Blades")
+    assert first.reload_if_changed()
+    success, message = first.undo()
+    assert success, message
+    assert aces_id not in first.data['teams'] and blades_id in first.data['teams']
+    assert first.redo()[0]
+
+    # An undo that would write back over the other desk's newer version is dropped
+    second.reload_if_changed()
+    second.update_team_name(aces_id, "Second")
+    assert first.reload_if_changed()
+    assert first.undo() == (False, "Nothing to undo.")
+    assert first.get_team(aces_id)['name'] == "Second"
+
+
+def test_a_match_edit_lost_to_another_desk_is_reported_as_failed(make_manager):
+    first, second, _ = _desks(make_manager)
+    league = League(first, "AB")
+    match_id = league.record('A', 'B', 'A')
+    second.reload_if_changed()
+    assert first.update_match(match_id, [league.sub('A', 'B', 'B')])[0]
+    success, message = second.update_match(match_id, [league.sub('A', 'B', None)])
+    assert not success
+    assert "Match A vs B" in message
+    assert second.data['matches'][match_id]['winner_id'] == league.teams['B']
+
+
+def _views(manager):
+    """The derived views a reload has to keep in step with the data."""
+    player_ids = [player_id for team in manager.data['teams'].values() for player_id in team['players']]
+    return {
+        'teams': list(manager.data['teams']),
+        'standings': manager.calculate_standings(),
+        'points': manager.calculate_player_points(),
+        'history': manager.query_matches(),
+        'by_team': {team_id: manager.query_matches(team_id=team_id) for team_id in manager.data['teams']},
+        'opponents': {player_id: sorted(manager.get_nemesis_opponents(player_id)) for player_id in player_ids},
+        'orphans': manager.get_orphaned_references(),
+    }
+
+
+def test_a_reload_takes_in_only_the_changed_records_and_keeps_the_views_current(make_manager):
+    first, second, _ = _desks(make_manager, generate_tournament(num_teams=4, players_per_team=3, num_matches=40))
+    first.create_team("Extra")  # the generated file predates winner_side; this writes it with the field
+    second.reload_if_changed()
+    events_seen = []
+    first.events.subscribe(lambda kind, payload: events_seen.append(kind))
+    before = dict(first.data['matches'])
+
+    match_ids = list(second.data['matches'])
+    second.delete_match(match_ids[0])
+    team_ids = list(second.data['teams'])
+    second.add_player(team_ids[1], "Newcomer", "Beginner")
+    second.remove_player(team_ids[2], next(iter(second.data['teams'][team_ids[2]]['players'])))
+    second.delete_team(team_ids[3])
+    assert first.reload_if_changed()
+
+    reopened = type(first)(data_file=first.data_file, publish=False, notifier=first.notifier)
+    assert _views(first) == _views(reopened)
+    # Records nobody changed are the very same objects
+    assert all(match is before[match_id] for match_id, match in first.data['matches'].items())
+    assert events_seen.count(events.ROSTER_CHANGED) == 3 and events.MATCH_DELETED in events_seen
+
+
+class FakeMaster:
+    """Stands in for the Tk root, keeping the callbacks the background executor schedules."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, fn):
+        self.callbacks.append(fn)
+
+
+def _settle(master, executor):
+    """Runs the Tk-side callbacks until every background task has finished and been handed back."""
+    while executor.busy_label is not None or master.callbacks:
+        callbacks, master.callbacks = master.callbacks, []
+        for fn in callbacks:
+            fn()
+        time.sleep(0.001)
+
+
+def _background_desk(manager):
+    master = FakeMaster()
+    manager.background = background.BackgroundExecutor(master)
+    reloads = []
+    manager.on_reload = lambda: reloads.append(manager.data['revision'])
+    return master, reloads
+
+
+def test_background_reloads_and_commits_take_in_other_desks_changes(make_manager):
+    first, second, notifiers = _desks(make_manager)
+    master, reloads = _background_desk(first)
+
+    second.create_team("Blades")
+    assert not first.reload_if_changed()  # read on the worker
+    _settle(master, first.background)
+    assert [team['name'] for team in first.data['teams'].values()] == ["Blades"]
+    assert reloads == [1]
+
+    # Committing on the worker merges a commit the poll hasn't picked up yet
+    second.create_team("Cutters")
+    team_id, _ = first.create_team("Aces")
+    _settle(master, first.background)
+    assert sorted(team['name'] for team in first.data['teams'].values()) == ["Aces", "Blades", "Cutters"]
+    assert sorted(team['name'] for team in _saved(first)['teams'].values()) == ["Aces", "Blades", "Cutters"]
+    assert first.data['revision'] == _saved(first)['revision'] == 3
+    assert reloads == [1, 3]
+    assert first.undo()[0]
+    _settle(master, first.background)
+    assert team_id not in _saved(first)['teams']
+
+    # A conflict is shown when the commit lands; the file keeps the other desk's version
+    blades_id = next(team_id for team_id, team in first.data['teams'].items() if team['name'] == "Blades")
+    second.reload_if_changed()
+    second.update_team_name(blades_id, "Second")
+    first.update_team_name(blades_id, "First")
+    _settle(master, first.background)
+    assert notifiers[0].shown == ["Save Conflict"]
+    assert first.get_team(blades_id)['name'] == _saved(first)['teams'][blades_id]['name'] == "Second"
+    assert not first.reload_if_changed()
+    first.background.shutdown()
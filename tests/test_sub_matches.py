@@ -0,0 +1,32 @@
+from conftest import RecordingNotifier
+
+
+def test_winner_side_must_agree_with_the_winning_players(league):
+    manager = league.manager
+    manager.notifier = RecordingNotifier()
+    sub_match = dict(league.sub('A', 'B', 'B'), winner_side=1)
+    success, _ = manager.record_match(league.teams['A'], league.teams['B'], [sub_match])
+    assert not success
+    assert manager.notifier.errors[0][0] == "Invalid Winner"
+    assert manager.data['matches'] == {}
+
+    sub_match['winner_side'] = 2
+    success, _ = manager.record_match(league.teams['A'], league.teams['B'], [sub_match])
+    assert success
+    standings = {row['name']: row['wins'] for row in manager.calculate_standings()}
+    points = {row['name']: row['points'] for row in manager.calculate_player_points()}
+    assert standings['B'] == points['B1'] == 1
+
+
+def test_update_match_returns_the_validation_message(league):
+    manager = league.manager
+    manager.notifier = RecordingNotifier()
+    match_id = league.record('A', 'B', 'A')
+
+    success, message = manager.update_match(match_id, [dict(league.sub('A', 'B', 'A'), winner_side=2)])
+    assert not success
+    assert message == "A sub-match's winning side doesn't match its winning players."
+
+    success, message = manager.update_match(match_id, [dict(league.sub('A', 'B', 'A'), rallies='x')])
+    assert not success
+    assert message == manager.notifier.errors[-1][1] == "A rally log needs game scores."
@@ -0,0 +1,85 @@
+import itertools
+import random
+
+import pytest
+
+import swiss
+from bench_swiss import simulate_round
+
+
+def _perfect_pairing_exists(teams, played_pairs):
+    if not teams:
+        return True
+    first, rest = teams[0], teams[1:]
+    return any(frozenset((first, other)) not in played_pairs
+               and _perfect_pairing_exists([t for t in rest if t != other], played_pairs)
+               for other in rest)
+
+
+def _check_round(ranked, played_pairs, pairs, bye_team_id):
+    paired = [team_id for pair in pairs for team_id in pair] + ([bye_team_id] if bye_team_id else [])
+    assert sorted(paired) == sorted(ranked)
+    for pair in pairs:
+        assert frozenset(pair) not in played_pairs
+
+
+@pytest.mark.parametrize('teams', [8, 9, 31])
+def test_rounds_never_repeat_a_pairing(teams):
+    rng = random.Random(teams)
+    team_ids = [f"t{i}" for i in range(teams)]
+    matches, byes, seen = {}, [], set()
+    for _ in range(min(teams - 1, 7)):
+        pairs, bye_team_id = simulate_round(matches, byes, team_ids, rng)
+        for pair in pairs:
+            assert frozenset(pair) not in seen
+            seen.add(frozenset(pair))
+    # Each team gets at most one bye
+    assert len(byes) == len(set(byes))
+
+
+def test_greedy_dead_end_is_repaired():
+    # Greedy pairs 0-1 and leaves 2-3, a rematch; 0-2 and 1-3 (or 0-3 and 1-2) is the fix
+    played_pairs = {frozenset(('t2', 't3'))}
+    ranked = ['t0', 't1', 't2', 't3']
+    pairs, bye_team_id = swiss.pair_round(ranked, played_pairs)
+    assert bye_team_id is None
+    _check_round(ranked, played_pairs, pairs, None)
+
+
+def test_pairing_matches_brute_force_on_random_histories():
+    rng = random.Random(1)
+    for _ in range(300):
+        ranked = [f"t{i}" for i in range(8)]
+        played_pairs = {frozenset(pair) for pair in itertools.combinations(ranked, 2) if rng.random() < 0.55}
+        if _perfect_pairing_exists(ranked, played_pairs):
+            pairs, bye_team_id = swiss.pair_round(ranked, played_pairs)
+            _check_round(ranked, played_pairs, pairs, bye_team_id)
+        else:
+            with pytest.raises(ValueError):
+                swiss.pair_round(ranked, played_pairs)
+
+
+def test_bye_goes_to_the_lowest_ranked_team_without_one():
+    ranked = ['t0', 't1', 't2', 't3', 't4']
+    _, bye_team_id = swiss.pair_round(ranked, set(), had_bye=['t4', 't3'])
+    assert bye_team_id == 't2'
+
+
+def test_manager_rounds_skip_pairs_already_scheduled_or_played(league):
+    manager = league.manager
+    names = {team_id: name for name, team_id in league.teams.items()}
+    seen = set()
+    for round_no in range(3):
+        success, message = manager.generate_swiss_round(num_tables=2)
+        assert success, message
+        fixtures = [f for f in manager.data['fixtures'].values() if f['round'] == round_no + 1]
+        assert len(fixtures) == 2
+        for fixture in fixtures:
+            pair = frozenset((fixture['team1_id'], fixture['team2_id']))
+            assert pair not in seen
+            seen.add(pair)
+            if round_no < 2:  # leave the last round unplayed
+                league.record(names[fixture['team1_id']], names[fixture['team2_id']], names[fixture['team1_id']])
+    # Four teams have exactly three rounds of distinct opponents
+    success, _ = manager.generate_swiss_round(num_tables=2)
+    assert not success
@@ -0,0 +1,98 @@
+import copy
+import json
+
+import model
+import undo
+from datagen import generate_tournament
+
+
+def _state(manager):
+    """Everything an undo must put back: the data (bar the revision stamp), in order, and the derived views."""
+    data = json.loads(json.dumps(model.plain(manager.data)))
+    data.pop('revision')
+    team_order = list(data['teams'])
+    player_order = {team_id: list(team['players']) for team_id, team in data['teams'].items()}
+    player_ids = [player_id for players in player_order.values() for player_id in players]
+    return {
+        'data': data,
+        'order': (team_order, player_order),
+        'standings': manager.calculate_standings(),
+        'points': manager.calculate_player_points(),
+        'history': manager.query_matches(),
+        'by_team': {team_id: manager.query_matches(team_id=team_id) for team_id in team_order},
+        'opponents': {player_id: sorted(manager.get_nemesis_opponents(player_id)) for player_id in player_ids},
+    }
+
+
+def _saved(manager):
+    with open(manager.data_file) as f:
+        data = json.load(f)
+    data.pop('revision')
+    return data
+
+
+def _round_trip(manager, change):
+    before = _state(manager)
+    success, message = change()
+    assert success, message
+    after = _state(manager)
+    assert after != before
+
+    manager.undo()
+    assert _state(manager) == before
+    assert _saved(manager) == before['data']
+    manager.redo()
+    assert _state(manager) == after
+    assert _saved(manager) == after['data']
+    manager.undo()
+    assert _state(manager) == before
+
+
+def test_delete_team_round_trip(make_manager):
+    manager = make_manager(generate_tournament(num_teams=5, players_per_team=3, num_matches=60))
+    manager.generate_fixtures(num_tables=2)
+    team_id = list(manager.data['teams'])[1]  # not the first, so its place in the order matters
+    _round_trip(manager, lambda: manager.delete_team(team_id))
+
+
+def test_update_match_round_trip(make_manager):
+    manager = make_manager(generate_tournament(num_teams=4, players_per_team=3, num_matches=30))
+    match_id, match = next(iter(manager.data['matches'].items()))
+    flipped = []
+    for sub_match in match.sub_matches:
+        sub_match = copy.deepcopy(sub_match.to_json())
+        sub_match['winner_player_ids'] = (sub_match['team2_player_ids'] if sub_match['winner_side'] == 1
+                                          else sub_match['team1_player_ids'])
+        del sub_match['winner_side']
+        flipped.append(sub_match)
+    _round_trip(manager, lambda: manager.update_match(match_id, flipped))
+
+
+def test_remove_player_round_trip(league):
+    manager = league.manager
+    league.record('A', 'B', 'A')
+    manager.add_player(league.teams['A'], "A2", "Expert")
+    _round_trip(manager, lambda: manager.remove_player(league.teams['A'], league.players['A']))
+
+
+def test_a_new_change_clears_the_redo_side(league):
+    manager = league.manager
+    league.record('A', 'B', 'A')
+    manager.undo()
+    assert manager.undo_stack.redo_label == "record A vs B"
+    league.record('C', 'D', 'C')
+    assert manager.undo_stack.redo_label is None
+    assert manager.redo() == (False, "Nothing to redo.")
+
+
+def test_discarding_a_changed_record_drops_older_undo_and_later_redo_commands():
+    stack = undo.UndoStack()
+    for key in 'abcd':
+        stack.push(key, [('matches', key, None)])
+    stack.push_redo('e', [('matches', 'e', None)])
+    stack.push_redo('f', [('matches', 'f', None)])
+    stack.discard_changed({('matches', 'b'), ('matches', 'e')})
+    assert [stack.pop_undo()[0] for _ in range(2)] == ['d', 'c']
+    assert stack.pop_undo() is None
+    assert stack.pop_redo()[0] == 'f'
+    assert stack.pop_redo() is None
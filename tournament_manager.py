@@ -0,0 +1,1857 @@
+"""Tournament data and the operations on it, with no GUI dependencies.
+
+TournamentManager owns the data file: loading and saving (optionally shared
+between desks, see shared_file), teams and players, matches, fixtures,
+brackets, seasons and every derived view. The Tk app (TT_tour.py), the read
+API (api_server.py) and the command line (cli.py) all drive it. Errors and
+confirmations go through a notifier: the Tk app passes tkinter.messagebox,
+everything else gets a ConsoleNotifier, so tkinter is never imported here.
+"""
+import copy
+import functools
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+import archive
+import bracket
+import events
+import game_scores
+import match_index
+import match_log
+import model
+import scheduler
+import seasons
+import shared_file
+import swiss
+import undo
+
+DATA_FILE = 'tournament_data.json'
+FIREBASE_CREDENTIALS_FILE = "tt-tournament-app-firebase-adminsdk-fbsvc-3d00fec401.json"
+
+
+def get_firestore_client():
+    """Initializes the Firebase app on first use and returns a Firestore client."""
+    # firebase_admin is imported here, so front ends that never publish don't pay for loading it
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(FIREBASE_CREDENTIALS_FILE)
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+
+class ConsoleNotifier:
+    """Prints the manager's errors and confirmations to stderr, in place of tkinter.messagebox.
+
+    Confirmations are answered with assume_yes. Any object with the same four
+    methods (messagebox itself, for one) can be passed to TournamentManager.
+    """
+    def __init__(self, assume_yes=False, decline_note="Not confirmed."):
+        self.assume_yes = assume_yes
+        self.decline_note = decline_note
+
+    def showerror(self, title, message, **kwargs):
+        print(f"{title}: {message}", file=sys.stderr)
+
+    showwarning = showinfo = showerror
+
+    def askyesno(self, title, message, **kwargs):
+        if not self.assume_yes:
+            print(f"{title}: {message}\n{self.decline_note}", file=sys.stderr)
+        return self.assume_yes
+
+
+class TournamentManager:
+    def __init__(self, db=None, data_file=DATA_FILE, shared=False, publish=True, notifier=None):
+        # Shows errors and asks for confirmation; see ConsoleNotifier
+        self.notifier = notifier if notifier is not None else ConsoleNotifier()
+        # publish=False keeps the leaderboards local (no Firestore), e.g. for the read API
+        self.db = None if not publish else db if db is not None else get_firestore_client()
+        # Shared mode: several desks save to the same data file, see shared_file
+        self.shared = shared
+        self._base_text = None
+        self._disk_signature = None
+        # Shared saves are numbered; a reload or commit result is only taken in if no save was submitted since
+        self._save_generation = self._committed_generation = 0
+        # Called on the Tk thread after other desks' changes were taken in by a background reload or merge
+        self.on_reload = None
+        self.events = events.EventBus()
+        self.undo_stack = undo.UndoStack()
+        # A background.BackgroundExecutor (set by the Tk app) runs saves, and shared reloads, on its worker thread
+        self.background = None
+        self.catalog = seasons.SeasonCatalog(os.path.join(os.path.dirname(data_file), seasons.CATALOG_FILE))
+        self._season_cache = seasons.SeasonCache()
+        if self.catalog.exists():
+            data_file = self.catalog.data_file(self.catalog.active)
+        self.data_file = data_file
+        self.match_log = match_log.MatchLog(data_file + '.log')
+        self.data = self._load_data()
+        self._normalize_data()
+        self._rebuild_indexes()
+
+
+    def find_match_id(self, date, team1_name, team2_name):
+        for match_id, match in self.data['matches'].items():
+            if 'timestamp' not in match:
+                continue
+            match_time = datetime.fromisoformat(match['timestamp']).strftime('%Y-%m-%d %H:%M')
+            if match_time == date and (
+                (match['team1_name'] == team1_name and match['team2_name'] == team2_name) or
+                (match['team1_name'] == team2_name and match['team2_name'] == team1_name)
+            ):
+                return match_id
+        return None
+
+
+    def _load_data(self):
+        """Loads tournament data from a JSON file."""
+        if self.background is not None:
+            self.background.wait(('save', self.data_file))  # the file may still be being written
+        if os.path.exists(self.data_file):
+            try:
+                with open(self.data_file, 'r') as f:
+                    text = f.read()
+                data = json.loads(text)
+                if self.shared:
+                    self._base_text = text
+                    self._disk_signature = self._file_signature(self.data_file)
+                return data
+            except json.JSONDecodeError:
+                self.notifier.showerror("Error",
+                                     "Could not load data from file. File might be corrupted. Starting with new data.")
+                os.remove(self.data_file)  # Optionally remove corrupted file
+                return self._default_data()
+        return self._default_data()
+
+    def _default_data(self):
+        """Returns the default structure for new tournament data."""
+        return {
+            'teams': {},
+            'matches': {},
+            'fixtures': {},
+            'bracket': None,
+            'byes': [],
+            'archive': [],
+            'skill_levels': ['Beginner', 'Intermediate', 'Advanced', 'Expert']
+        }
+
+    def _normalize_data(self):
+        """Fills in keys added after older data files were written."""
+        self.data.setdefault('fixtures', {})
+        self.data.setdefault('bracket', None)
+        self.data.setdefault('byes', [])
+        self.data.setdefault('archive', [])
+        self.data.setdefault('revision', 0)
+        model.attach(self.data)
+        for match in self.data['matches'].values():
+            self._fill_winner_sides(match)
+
+    def _fill_winner_sides(self, match):
+        # Sub-matches saved before winner_side existed get it once; it is written with the next save
+        for sub_match in match.sub_matches:
+            if sub_match.winner_side is None:
+                sub_match.winner_side = self._winner_side(sub_match)
+
+    def _rebuild_indexes(self):
+        """Rebuilds the in-memory lookup structures derived from self.data."""
+        self._rebuild_fixture_index()
+        self._player_partners = {}
+        self._player_opponents = {}
+        self._h2h = None  # built on first head-to-head query
+        self._match_index = match_index.MatchIndex()
+        for match_id, match in self.data['matches'].items():
+            self._index_match(match_id, match)
+        self._player_teams = {}
+        self._skill_counts = {}
+        for team_id, team in self.data['teams'].items():
+            self._index_roster(team_id, team)
+        for segment in self.data['archive']:
+            self._add_player_summary_rows(self._player_partners, segment['partners'])
+            self._add_player_summary_rows(self._player_opponents, segment['opponents'])
+
+    def _index_match(self, match_id, match, sign=1):
+        """Adds a match to (sign=1) or removes it from (sign=-1) the incremental indexes."""
+        if self._h2h is not None:
+            self._h2h.add_match(match, sign)
+        self._add_player_records(self._player_partners, self._player_opponents, match, sign)
+        if sign > 0:
+            self._match_index.add(match_id, match)
+        else:
+            self._match_index.remove(match_id, match)
+
+    @classmethod
+    def _add_player_records(cls, partners, opponents, match, sign=1):
+        """Adds a match's sub-match results to player -> partner and player -> opponent indexes."""
+        for sub_match in match.get('sub_matches', []):
+            sides = (sub_match.get('team1_player_ids', []), sub_match.get('team2_player_ids', []))
+            winners = set(sub_match.get('winner_player_ids', []))
+            for side, players in enumerate(sides):
+                if not winners:
+                    result = 2  # draw
+                elif winners.intersection(players):
+                    result = 0  # win
+                else:
+                    result = 1  # loss
+                for player_id in players:
+                    for partner_id in players:
+                        if partner_id != player_id:
+                            cls._bump_player_record(partners, player_id, partner_id, result, sign)
+                    for opponent_id in sides[1 - side]:
+                        cls._bump_player_record(opponents, player_id, opponent_id, result, sign)
+
+    @classmethod
+    def _add_player_summary_rows(cls, index, rows):
+        """Adds archived [player_id, other_id, wins, losses, draws] rows to a player index."""
+        for player_id, other_id, *counts in rows:
+            for result, count in enumerate(counts):
+                if count:
+                    cls._bump_player_record(index, player_id, other_id, result, count)
+
+    def _unindex_match(self, match_id, match):
+        self._index_match(match_id, match, -1)
+
+    def _index_player(self, team_id, player_id, player, sign=1):
+        """Adds a player to (sign=1) or removes it from (sign=-1) the player -> team and skill -> count indexes."""
+        if sign > 0:
+            self._player_teams[player_id] = team_id
+        else:
+            self._player_teams.pop(player_id, None)
+        count = self._skill_counts.get(player['skill'], 0) + sign
+        if count:
+            self._skill_counts[player['skill']] = count
+        else:
+            del self._skill_counts[player['skill']]
+
+    def _index_roster(self, team_id, team, sign=1):
+        for player_id, player in team['players'].items():
+            self._index_player(team_id, player_id, player, sign)
+
+    def _log_result(self, match, sign, time=None):
+        """Logs a match result being added (sign=1) or taken back (sign=-1) at time (ISO, default now).
+
+        Call it before self.data changes: the first call starts the log from self.data if there is no log file.
+        """
+        self.match_log.start(self.data)
+        self.match_log.add(match_log.match_event(match, sign, time or datetime.now().isoformat()))
+
+    @staticmethod
+    def _bump_player_record(index, player_id, other_id, result, amount):
+        """Adjusts one [wins, losses, draws] record in a player -> other player index."""
+        row = index.setdefault(player_id, {})
+        record = row.setdefault(other_id, [0, 0, 0])
+        record[result] += amount
+        if not any(record):
+            del row[other_id]
+            if not row:
+                del index[player_id]
+
+    def _rebuild_fixture_index(self):
+        self._fixtures_by_pair = {}
+        for fixture_id, fixture in self.data['fixtures'].items():
+            pair_key = self._pair_key(fixture['team1_id'], fixture['team2_id'])
+            self._fixtures_by_pair.setdefault(pair_key, []).append(fixture_id)
+        for fixture_ids in self._fixtures_by_pair.values():
+            fixture_ids.sort(key=lambda fid: self.data['fixtures'][fid]['slot'])
+
+    def replace_data(self, new_data):
+        """Replaces all tournament data (import/reset) and saves it."""
+        self.data = new_data
+        self._normalize_data()
+        self._rebuild_indexes()
+        # Undo commands hold the records they replaced, which mean nothing once the data is replaced wholesale
+        self.undo_stack.clear()
+        self.match_log.reset(self.data)
+        self._save_data(force=True)
+        self.events.publish(events.DATA_REPLACED, {})
+
+    @staticmethod
+    def _pair_key(team1_id, team2_id):
+        return (team1_id, team2_id) if team1_id <= team2_id else (team2_id, team1_id)
+
+    def _save_data(self, force=False):
+        """Saves current tournament data to a JSON file.
+
+        In shared mode other desks' commits are merged in first, unless force
+        (import/reset) says this data replaces the file outright. Returns the
+        conflict message if the merge kept another desk's version of something
+        this desk changed, else None. With a background executor the file is
+        written on its worker and a conflict is only shown once it lands.
+        """
+        try:
+            if self.shared:
+                return self._commit_shared(force)
+            self.data['revision'] += 1
+            if self.background is None:
+                self._write_data(self.data_file, self.data)
+            else:
+                # A newer save of the same file submitted before this one starts replaces it
+                self.background.submit("Saving", self._write_data, self.data_file, self.snapshot().data,
+                                       key=('save', self.data_file), cancellable=False,
+                                       on_error=self._save_failed)
+            self.match_log.flush()
+        except (TimeoutError, IOError) as e:
+            self._save_failed(e)
+
+    @staticmethod
+    def _write_data(path, data):
+        with open(path, 'w') as f:
+            json.dump(model.plain(data), f, indent=4)
+
+    def _save_failed(self, error):
+        if isinstance(error, TimeoutError):
+            self.notifier.showerror("Save Error", "Another desk is holding the data file. Please try again.")
+        else:
+            self.notifier.showerror("Save Error", f"Could not save data: {error}")
+
+    def _commit_shared(self, force):
+        """Commits the data to the shared file, on the background worker if there is one.
+
+        Returns the conflict message shown to the scorer, or None if nothing
+        conflicted (or the commit has not landed yet).
+        """
+        self._save_generation += 1
+        generation = self._save_generation
+        if self.background is None:
+            try:
+                result = self._write_shared(self.data_file, self.data, self._base_text, self._disk_signature, force)
+            finally:
+                self._committed_generation = max(self._committed_generation, generation)
+            self.match_log.flush()
+            return self._committed(generation, result)
+        # The snapshot's records are never edited in place, so the worker can serialise it while edits go on
+        self.background.submit("Saving", self._write_shared, self.data_file, self.snapshot().data, self._base_text,
+                               self._disk_signature, force, key=('save', self.data_file), cancellable=False,
+                               on_done=functools.partial(self._committed, generation),
+                               on_error=functools.partial(self._shared_save_failed, generation))
+        self.match_log.flush()
+        return None
+
+    def _write_shared(self, path, data, base_text, signature, force):
+        """Writes data to the shared file under its lock. Runs on the background worker, so it only reads
+        its arguments.
+
+        If the file still has the signature it had when base_text was read or
+        written, nobody committed since and the data, serialised before taking
+        the lock, is written as it is. Otherwise this desk's changes are merged
+        into the file's contents. Returns (text, signature, revision, merged,
+        changed, conflicts): merged is the plain merged data and changed its
+        (kind, key) differences from data, or both None if there was nothing to
+        merge.
+        """
+        text = None
+        revision = data['revision'] + 1
+        if signature is not None and not force:
+            out = model.plain(data)
+            out['revision'] = revision
+            text = json.dumps(out, indent=4)
+        merged = changed = None
+        conflicts = []
+        with shared_file.file_lock(path + '.lock'):
+            if text is None or self._file_signature(path) != signature:
+                disk_text = shared_file.read_text(path)
+                disk = json.loads(disk_text) if disk_text else None
+                disk_revision = disk.get('revision', 0) if disk else 0
+                out = model.plain(data)
+                if disk is not None and not force and disk_revision != data['revision']:
+                    base = json.loads(base_text) if base_text else self._default_data()
+                    ours = json.loads(json.dumps(out))
+                    # The revision stamp is set afresh below, and files from before it existed have none
+                    for side in (base, ours, disk):
+                        side.pop('revision', None)
+                    out, conflicts = shared_file.merge(base, ours, disk)
+                    merged, changed = out, self._changed_keys(ours, out)
+                revision = out['revision'] = max(disk_revision, data['revision']) + 1
+                text = json.dumps(out, indent=4)
+            shared_file.write_text(path, text)
+            return text, self._file_signature(path), revision, merged, changed, conflicts
+
+    def _committed(self, generation, result):
+        """Takes in a finished shared commit on the Tk thread. Returns the conflict message, if any."""
+        text, signature, revision, merged, changed, conflicts = result
+        self._committed_generation = max(self._committed_generation, generation)
+        # A newer save holds later changes and merges the file again, so only the newest commit is taken in
+        if generation == self._save_generation:
+            self._base_text = text
+            self._disk_signature = signature
+            self.data['revision'] = revision
+            if merged is not None:
+                self._apply_shared_changes(merged, changed)
+                if changed and self.on_reload:
+                    self.on_reload()
+        if not conflicts:
+            return None
+        descriptions = list(dict.fromkeys(self._describe_conflict(path) for path in conflicts))
+        message = ("Another desk changed the same data at the same time. Their version was kept for:\n\n"
+                   + "\n".join(descriptions[:15]))
+        self.notifier.showwarning("Save Conflict", message)
+        return message
+
+    def _shared_save_failed(self, generation, error):
+        self._committed_generation = max(self._committed_generation, generation)
+        self._save_failed(error)
+
+    def _describe_conflict(self, path):
+        """Turns a conflicting key path from the merge into something a scorer can recognise."""
+        if len(path) >= 2 and path[0] == 'matches':
+            match = self.data['matches'].get(path[1])
+            if match:
+                return f"Match {match['team1_name']} vs {match['team2_name']} ({match['timestamp'][:16].replace('T', ' ')})"
+        if len(path) >= 2 and path[0] == 'teams':
+            team = self.data['teams'].get(path[1])
+            if team:
+                if len(path) >= 4 and path[2] == 'players' and path[3] in team['players']:
+                    return f"Player {team['players'][path[3]]['name']} ({team['name']})"
+                return f"Team {team['name']}"
+        return " / ".join(str(part) for part in path)
+
+    @staticmethod
+    def _file_signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self):
+        """In shared mode, loads other desks' commits if the data file changed. Returns True if it did.
+
+        With a background executor the file is read and compared with the base
+        on its worker, and only the changed records are applied later on the Tk
+        thread, followed by on_reload; this then returns False.
+        """
+        if not self.shared:
+            return False
+        signature = self._file_signature(self.data_file)
+        if signature is None or signature == self._disk_signature:
+            return False
+        if self.background is None:
+            return self._apply_reload(self._read_shared(self.data_file, self._base_text, self.data['revision']))
+        if self._committed_generation != self._save_generation:
+            return False  # the pending commit merges whatever is on disk
+        self.background.submit("Loading other desks' changes", self._read_shared, self.data_file, self._base_text,
+                               self.data['revision'], key=('reload', self.data_file), cancellable=False,
+                               on_done=functools.partial(self._reloaded, self._save_generation))
+        return False
+
+    def _read_shared(self, path, base_text, revision):
+        """Reads the shared file and compares it with base_text. Runs on the background worker.
+
+        Returns (signature, text, data, changed) with data and changed None if
+        the file still holds revision, or None if the file can't be read (it is
+        tried again on the next poll).
+        """
+        signature = self._file_signature(path)
+        text = shared_file.read_text(path)
+        try:
+            data = json.loads(text)
+        except (TypeError, ValueError):
+            return None
+        if data.get('revision', 0) == revision:
+            return signature, text, None, None
+        base = json.loads(base_text) if base_text else self._default_data()
+        return signature, text, data, self._changed_keys(base, data)
+
+    def _apply_reload(self, result):
+        if result is None:
+            return False
+        signature, text, data, changed = result
+        self._disk_signature = signature
+        if data is None:
+            return False
+        self._base_text = text
+        self._apply_shared_changes(data, changed)
+        return True
+
+    def _reloaded(self, generation, result):
+        # A save submitted since the read merges the file itself
+        if generation == self._save_generation and self._apply_reload(result) and self.on_reload:
+            self.on_reload()
+
+    def _apply_shared_changes(self, data, changed):
+        """Takes the records another desk changed (changed, as from _changed_keys) from its plain data.
+
+        Only those records are swapped in and re-indexed, so taking in another
+        desk's result costs the same however big the tournament is.
+        """
+        published = []
+        teams = self.data['teams']
+        team_ids = [team_id for kind, team_id in changed if kind == 'teams']
+        for team_id in team_ids:
+            old_team, new_team = teams.get(team_id), data['teams'].get(team_id)
+            if old_team is not None:
+                self._index_roster(team_id, old_team, -1)
+            if new_team is None:
+                teams.pop(team_id, None)
+                if self._h2h is not None:
+                    self._h2h.remove_team(team_id)
+            else:
+                team = teams[team_id] = model.Team.from_json(new_team)
+                model.IDS.number(team_id)
+                for player_id in team.players:
+                    model.IDS.number(player_id)
+                self._index_roster(team_id, team)
+            published.append((events.ROSTER_CHANGED, team_id))
+        if team_ids and list(teams) != list(data['teams']):
+            self._reorder(teams, data['teams'])
+
+        matches = self.data['matches']
+        for match_id in [match_id for match_id in matches if match_id not in data['matches']]:
+            if ('matches', match_id) in changed:
+                self._unindex_match(match_id, matches.pop(match_id))
+                published.append((events.MATCH_DELETED, match_id))
+        for match_id, new_match in data['matches'].items():
+            if ('matches', match_id) not in changed:
+                continue
+            old_match = matches.get(match_id)
+            if old_match is not None:
+                self._unindex_match(match_id, old_match)
+            match = matches[match_id] = model.Match.from_json(new_match)
+            self._fill_winner_sides(match)
+            self._index_match(match_id, match)
+            published.append((events.MATCH_RECORDED if old_match is None else events.MATCH_UPDATED, match_id))
+
+        fixture_ids = [fixture_id for kind, fixture_id in changed if kind == 'fixtures']
+        for fixture_id in fixture_ids:
+            if fixture_id in data['fixtures']:
+                self.data['fixtures'][fixture_id] = data['fixtures'][fixture_id]
+            else:
+                self.data['fixtures'].pop(fixture_id, None)
+        if fixture_ids:
+            self._rebuild_fixture_index()
+        for kind, key in changed:
+            if key is None and kind in data:
+                self.data[kind] = data[kind]
+        self.data['revision'] = data.get('revision', 0)
+        if ('archive', None) in changed:
+            self._rebuild_indexes()  # the archive summaries are part of the player indexes
+
+        # Other desks' commits leave our own undo commands standing unless they changed the same records
+        self.undo_stack.discard_changed(changed)
+        self.match_log.refresh()
+        if self.events.has_subscribers:
+            self._publish_changes(published)
+
+    @staticmethod
+    def _changed_keys(old_data, new_data):
+        """Returns the (kind, key) undo entry targets whose values differ between two versions of the data."""
+        changed = set()
+        for kind in ('teams', 'matches', 'fixtures'):
+            old_records, new_records = old_data.get(kind, {}), new_data.get(kind, {})
+            for key in old_records.keys() | new_records.keys():
+                if old_records.get(key) != new_records.get(key):
+                    changed.add((kind, key))
+        for kind, team_id in list(changed):
+            if kind != 'teams':
+                continue
+            old_players = old_data['teams'].get(team_id, {}).get('players', {})
+            new_team = new_data['teams'].get(team_id)
+            new_players = new_team['players'] if new_team is not None else {}
+            if new_team is None:
+                changed.add(('player_order', team_id))
+            for player_id in old_players.keys() | new_players.keys():
+                if old_players.get(player_id) != new_players.get(player_id):
+                    changed.add(('players', (team_id, player_id)))
+        for key in old_data.keys() | new_data.keys():
+            if key not in ('teams', 'matches', 'fixtures', 'revision') and old_data.get(key) != new_data.get(key):
+                changed.add((key, None))
+        return changed
+
+    MAX_CHANGE_EVENTS = 100
+
+    def _publish_changes(self, changes):
+        """Publishes events for (kind, id) changes taken in from another desk, or one data_replaced for many."""
+        if len(changes) > self.MAX_CHANGE_EVENTS:
+            self.events.publish(events.DATA_REPLACED, {})
+            return
+        for kind, key in changes:
+            if kind == events.ROSTER_CHANGED:
+                self._publish_roster(key)
+            elif kind == events.MATCH_DELETED:
+                self.events.publish(kind, {'id': key})
+            else:
+                self._publish_match(kind, key)
+
+    def _publish_match(self, kind, match_id):
+        self.events.publish(kind, self._match_history_rows({match_id: self.data['matches'][match_id]})[0])
+
+    def _publish_roster(self, team_id):
+        team = self.data['teams'].get(team_id)
+        if team is None:
+            payload = {'team_id': team_id, 'deleted': True}
+        else:
+            payload = {'team_id': team_id, 'name': team['name'],
+                       'players': [{'id': player_id, 'name': player['name'], 'skill': player['skill']}
+                                   for player_id, player in team['players'].items()]}
+        self.events.publish(events.ROSTER_CHANGED, payload)
+
+    # --- Seasons ---
+    def _ensure_catalog(self):
+        """Registers the current data file as the first season if there is no catalog yet."""
+        if not self.catalog.exists():
+            relative = os.path.relpath(self.data_file, os.path.dirname(self.catalog.path) or '.')
+            self.catalog.active = self.catalog.add_season("Season 1", relative)
+
+    def get_seasons(self):
+        """Returns a list of (season_id, name, is_active) in creation order."""
+        self._ensure_catalog()
+        return [(season_id, season['name'], season_id == self.catalog.active)
+                for season_id, season in self.catalog.seasons.items()]
+
+    def get_active_season_name(self):
+        self._ensure_catalog()
+        return self.catalog.seasons[self.catalog.active]['name']
+
+    def _leave_active_season(self):
+        """Saves the active season and stores its summary in the catalog before switching away."""
+        self._ensure_catalog()
+        self._save_data()
+        self.catalog.seasons[self.catalog.active]['summary'] = seasons.summarize(self.data)
+        self._season_cache.put(self.catalog.active, self.data)
+
+    def _enter_season(self, season_id, data):
+        self.catalog.active = season_id
+        self.data_file = self.catalog.data_file(season_id)
+        self.match_log = match_log.MatchLog(self.data_file + '.log')
+        self.data = data
+        self._normalize_data()
+        self._rebuild_indexes()
+        self.undo_stack.clear()
+        if self.shared:
+            # The next poll compares against the file and picks up anything newer
+            self._base_text = json.dumps(model.plain(self.data), indent=4)
+            self._disk_signature = None
+            # The last season's commits and reloads still under way are not taken in
+            self._save_generation += 1
+            self._committed_generation = self._save_generation
+        self.events.publish(events.DATA_REPLACED, {})
+
+    def create_season(self, name, carry_over_rosters=True):
+        """Starts a new season in its own data file and makes it the active one."""
+        if not name:
+            self.notifier.showerror("Input Error", "Season name cannot be empty.")
+            return False, "error"
+        self._ensure_catalog()
+        if any(season['name'].lower() == name.lower() for season in self.catalog.seasons.values()):
+            self.notifier.showerror("Duplicate Season", f"Season '{name}' already exists.")
+            return False, "error"
+
+        new_data = self._default_data()
+        new_data['skill_levels'] = list(self.data['skill_levels'])
+        if carry_over_rosters:
+            new_data['teams'] = {team_id: {'name': team['name'], 'players': copy.deepcopy(team['players'])}
+                                 for team_id, team in self.data['teams'].items()}
+
+        self._leave_active_season()
+        relative, _ = self.catalog.new_data_file()
+        season_id = self.catalog.add_season(name, relative)
+        self._enter_season(season_id, new_data)
+        self._save_data()
+        self.catalog.save()
+        return True, f"Season '{name}' created and activated."
+
+    def switch_season(self, season_id):
+        """Makes another season the active one. Only that season's data file is read."""
+        self._ensure_catalog()
+        if season_id not in self.catalog.seasons:
+            self.notifier.showerror("Error", "Season not found.")
+            return False, "error"
+        if season_id == self.catalog.active:
+            return True, "Season already active."
+
+        self._leave_active_season()
+        data = self._season_cache.pop(season_id)
+        self.data_file = self.catalog.data_file(season_id)
+        self._enter_season(season_id, data if data is not None else self._load_data())
+        self.catalog.save()
+        return True, f"Switched to season '{self.catalog.seasons[season_id]['name']}'."
+
+    def get_season_data(self, season_id):
+        """Returns a season's full data for browsing, loading it on demand. Treat it as read-only."""
+        self._ensure_catalog()
+        if season_id == self.catalog.active:
+            return self.data
+        return self._season_cache.get(season_id, self.catalog.data_file(season_id))
+
+    def _season_summary(self, season_id):
+        if season_id == self.catalog.active:
+            return seasons.summarize(self.data)
+        return self.catalog.seasons[season_id]['summary']
+
+    def get_season_standings(self, season_id):
+        """Returns a season's team standings from its catalog summary, without loading the season."""
+        self._ensure_catalog()
+        teams = self._season_summary(season_id)['teams']
+        return sorted(teams.values(), key=lambda x: x['wins'], reverse=True)
+
+    def get_cross_season_player_stats(self):
+        """Returns per-player totals across all seasons, built from the per-season summaries."""
+        self._ensure_catalog()
+        totals = {}
+        for season_id in self.catalog.seasons:
+            for player_id, player in self._season_summary(season_id)['players'].items():
+                total = totals.setdefault(player_id, {'seasons': 0, 'points': 0, 'sub_matches': 0})
+                # Later seasons overwrite the name and team, so renamed players show their latest details
+                total['name'] = player['name']
+                total['team_name'] = player['team_name']
+                total['seasons'] += 1
+                total['points'] += player['points']
+                total['sub_matches'] += player['sub_matches']
+        return sorted(totals.values(), key=lambda x: x['points'], reverse=True)
+
+    # --- Team Management ---
+    def create_team(self, team_name):
+        """Creates a new team with a unique ID."""
+        if not team_name:
+            self.notifier.showerror("Input Error", "Team name cannot be empty.")
+            return None, "error"
+
+        # Check for duplicate team name
+        for team_id, team in self.data['teams'].items():
+            if team['name'].lower() == team_name.lower():
+                self.notifier.showerror("Duplicate Team", f"Team '{team_name}' already exists.")
+                return None, "error"
+
+        team_id = str(uuid.uuid4())
+        self.undo_stack.push(f"create team '{team_name}'", [('teams', team_id, None)])
+        self.data['teams'][team_id] = model.Team(name=team_name, players={})
+        self._save_data()
+        self._publish_roster(team_id)
+        return team_id, f"Team '{team_name}' created successfully!"
+
+    def get_team(self, team_id):
+        """Retrieves a team by its ID."""
+        return self.data['teams'].get(team_id)
+
+    def get_all_teams(self):
+        """Returns a list of all teams with their IDs and names."""
+        return [(team_id, team['name']) for team_id, team in self.data['teams'].items()]
+
+    def update_team_name(self, team_id, new_name):
+        """Updates the name of an existing team."""
+        if not new_name:
+            self.notifier.showerror("Input Error", "New team name cannot be empty.")
+            return False, "error"
+        if team_id not in self.data['teams']:
+            self.notifier.showerror("Error", "Team not found.")
+            return False, "error"
+
+        # Check for duplicate name among other teams
+        for existing_id, team in self.data['teams'].items():
+            if existing_id != team_id and team['name'].lower() == new_name.lower():
+                self.notifier.showerror("Duplicate Name", f"Another team with name '{new_name}' already exists.")
+                return False, "error"
+
+        old_name = self.data['teams'][team_id]['name']
+        self.undo_stack.push(f"rename team '{old_name}'", [('teams', team_id, self.data['teams'][team_id].copy())])
+        self.data['teams'][team_id]['name'] = new_name
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_roster(team_id)
+        return True, f"Team '{old_name}' renamed to '{new_name}' successfully!"
+
+    def delete_team(self, team_id):
+        """Deletes a team and associated match records."""
+        if team_id not in self.data['teams']:
+            self.notifier.showerror("Error", "Team not found.")
+            return False, "error"
+
+        team_name = self.data['teams'][team_id]['name']
+
+        if not self.notifier.askyesno("Confirm Deletion",
+                                   f"Are you sure you want to delete '{team_name}' and ALL its players and associated match records?"):
+            return False, "cancelled"
+
+        self._index_roster(team_id, self.data['teams'][team_id], -1)
+        undo_entries = [('team_order', None, list(self.data['teams'])), ('teams', team_id, self.data['teams'].pop(team_id))]
+
+        # Remove matches involving this team, oldest first
+        matches_to_remove = sorted(self._match_index.by_team.get(team_id, ()),
+                                   key=lambda match_id: (self.data['matches'][match_id]['timestamp'], match_id))
+        for match_id in matches_to_remove:
+            self._log_result(self.data['matches'][match_id], -1)
+            match = self.data['matches'].pop(match_id)
+            self._unindex_match(match_id, match)
+            undo_entries.append(('matches', match_id, match))
+        if self._h2h is not None:
+            self._h2h.remove_team(team_id)
+
+        # Scheduled fixtures for the team can no longer be played
+        fixtures_to_remove = [fixture_id for pair_key, fixture_ids in self._fixtures_by_pair.items()
+                              if team_id in pair_key for fixture_id in fixture_ids]
+        for fixture_id in fixtures_to_remove:
+            undo_entries.append(('fixtures', fixture_id, self.data['fixtures'].pop(fixture_id)))
+        undo_entries.append(('byes', None, self.data['byes']))
+        self.data['byes'] = [bye_team_id for bye_team_id in self.data['byes'] if bye_team_id != team_id]
+        self.undo_stack.push(f"delete team '{team_name}'", undo_entries)
+        if fixtures_to_remove:
+            self._rebuild_fixture_index()
+
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_roster(team_id)
+        for match_id in matches_to_remove:
+            self.events.publish(events.MATCH_DELETED, {'id': match_id})
+        return True, f"Team '{team_name}' and its associated data deleted successfully!"
+
+    # --- Player Management ---
+    def add_player(self, team_id, player_name, skill_level):
+        """Adds a player to a team."""
+        if not player_name:
+            self.notifier.showerror("Input Error", "Player name cannot be empty.")
+            return False, "error"
+        if not skill_level:
+            self.notifier.showerror("Input Error", "Skill level cannot be empty.")
+            return False, "error"
+        if team_id not in self.data['teams']:
+            self.notifier.showerror("Error", "Team not found.")
+            return False, "error"
+        if skill_level not in self.data['skill_levels']:
+            self.notifier.showerror("Invalid Skill",
+                                 f"Skill level '{skill_level}' is not recognized. Please add it first in Team Management.")
+            return False, "error"
+
+        team = self.data['teams'][team_id]
+        # Check for duplicate player name within the same team
+        for player_id, player in team['players'].items():
+            if player['name'].lower() == player_name.lower():
+                self.notifier.showerror("Duplicate Player", f"Player '{player_name}' already exists in '{team['name']}'.")
+                return False, "error"
+
+        player_id = str(uuid.uuid4())
+        self.undo_stack.push(f"add player '{player_name}'", [('players', (team_id, player_id), None)])
+        team['players'][player_id] = model.Player(name=player_name, skill=skill_level)
+        self._index_player(team_id, player_id, team['players'][player_id])
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_roster(team_id)
+        return True, f"Player '{player_name}' added to '{team['name']}' successfully!"
+
+    def update_player(self, team_id, player_id, new_name, new_skill):
+        """Edits an existing player's name and/or skill level."""
+        if not new_name:
+            self.notifier.showerror("Input Error", "New player name cannot be empty.")
+            return False, "error"
+        if not new_skill:
+            self.notifier.showerror("Input Error", "New skill level cannot be empty.")
+            return False, "error"
+        if team_id not in self.data['teams']:
+            self.notifier.showerror("Error", "Team not found.")
+            return False, "error"
+        if player_id not in self.data['teams'][team_id]['players']:
+            self.notifier.showerror("Error", "Player not found in this team.")
+            return False, "error"
+        if new_skill not in self.data['skill_levels']:
+            self.notifier.showerror("Invalid Skill",
+                                 f"Skill level '{new_skill}' is not recognized. Please add it first in Team Management.")
+            return False, "error"
+
+        team = self.data['teams'][team_id]
+        old_player_name = team['players'][player_id]['name']
+
+        # Check for duplicate player name in the same team, excluding the player being updated
+        for existing_player_id, player in team['players'].items():
+            if existing_player_id != player_id and player['name'].lower() == new_name.lower():
+                self.notifier.showerror("Duplicate Player",
+                                     f"Another player with name '{new_name}' already exists in '{team['name']}'.")
+                return False, "error"
+
+        self.undo_stack.push(f"edit player '{old_player_name}'",
+                             [('players', (team_id, player_id), team['players'][player_id].copy())])
+        self._index_player(team_id, player_id, team['players'][player_id], -1)
+        team['players'][player_id]['name'] = new_name
+        team['players'][player_id]['skill'] = new_skill
+        self._index_player(team_id, player_id, team['players'][player_id])
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_roster(team_id)
+        return True, f"Player '{old_player_name}' updated to '{new_name}' with skill '{new_skill}' successfully!"
+
+    def remove_player(self, team_id, player_id):
+        """Removes a player from a team."""
+        if team_id not in self.data['teams']:
+            self.notifier.showerror("Error", "Team not found.")
+            return False, "error"
+        if player_id not in self.data['teams'][team_id]['players']:
+            self.notifier.showerror("Error", "Player not found in this team.")
+            return False, "error"
+
+        player_name = self.data['teams'][team_id]['players'][player_id]['name']
+        if not self.notifier.askyesno("Confirm Removal",
+                                   f"Are you sure you want to remove '{player_name}' from '{self.data['teams'][team_id]['name']}'?"):
+            return False, "cancelled"
+
+        players = self.data['teams'][team_id]['players']
+        undo_entries = [('player_order', team_id, list(players))]
+        player = players.pop(player_id)
+        self._index_player(team_id, player_id, player, -1)
+        undo_entries.append(('players', (team_id, player_id), player))
+        self.undo_stack.push(f"remove player '{player_name}'", undo_entries)
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_roster(team_id)
+        return True, f"Player '{player_name}' removed successfully!"
+
+    def get_players_for_team(self, team_id):
+        """Returns a list of players for a given team."""
+        if team_id not in self.data['teams']:
+            return []
+        return [(player_id, player['name'], player['skill']) for player_id, player in
+                self.data['teams'][team_id]['players'].items()]
+    
+    def get_player_name(self, player_id):
+        """Returns the name of a player given their ID."""
+        team_id = self._player_teams.get(player_id)
+        if team_id is None:
+            return "Unknown Player"
+        return self.data['teams'][team_id]['players'][player_id]['name']
+
+    # --- Skill Level Management ---
+    def get_skill_levels(self):
+        """Returns the list of predefined skill levels."""
+        return self.data['skill_levels']
+
+    def add_skill_level(self, skill):
+        """Adds a new skill level to the predefined list."""
+        if not skill:
+            self.notifier.showerror("Input Error", "Skill level name cannot be empty.")
+            return False, "error"
+        if skill.lower() in [s.lower() for s in self.data['skill_levels']]:
+            self.notifier.showerror("Duplicate Skill", f"Skill level '{skill}' already exists.")
+            return False, "error"
+        self.undo_stack.push(f"add skill level '{skill}'", [('skill_levels', None, list(self.data['skill_levels']))])
+        self.data['skill_levels'].append(skill)
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        return True, f"Skill level '{skill}' added successfully!"
+
+    def remove_skill_level(self, skill):
+        """Removes a skill level from the predefined list."""
+        if skill not in self.data['skill_levels']:
+            self.notifier.showerror("Error", f"Skill level '{skill}' not found.")
+            return False, "error"
+
+        # Check if any player uses this skill level before removing
+        in_use = self._skill_counts.get(skill, 0)
+        if in_use:
+            self.notifier.showerror("Cannot Remove",
+                                 f"Cannot remove skill level '{skill}' because {in_use} player(s) use it. Please update or remove affected players first.")
+            return False, "error"
+
+        if not self.notifier.askyesno("Confirm Removal", f"Are you sure you want to remove skill level '{skill}'?"):
+            return False, "cancelled"
+
+        self.undo_stack.push(f"remove skill level '{skill}'",
+                             [('skill_levels', None, list(self.data['skill_levels']))])
+        self.data['skill_levels'].remove(skill)
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        return True, f"Skill level '{skill}' removed successfully!"
+
+    # --- Fixture Scheduling ---
+    def generate_fixtures(self, num_tables, double_round=False, start_time=None, slot_minutes=30):
+        """Generates round-robin fixtures for all teams and allocates them to tables and time slots."""
+        teams = self.get_all_teams()
+        if len(teams) < 2:
+            self.notifier.showerror("Not Enough Teams", "At least two teams are needed to generate fixtures.")
+            return False, "error"
+        if num_tables < 1 or slot_minutes < 1:
+            self.notifier.showerror("Input Error", "Number of tables and slot length must be at least 1.")
+            return False, "error"
+        if self.data['fixtures'] and not self.notifier.askyesno(
+                "Replace Fixtures", "This will replace the existing fixture list. Continue?"):
+            return False, "cancelled"
+
+        if start_time is None:
+            start_time = datetime.now().replace(second=0, microsecond=0)
+        rounds = scheduler.round_robin_rounds([team_id for team_id, _ in teams], double_round)
+
+        # Clear links from already recorded matches to the old fixtures (into copies, see snapshot)
+        matches = self.data['matches']
+        for match_id, match in matches.items():
+            if match.get('fixture_id') is not None:
+                match = match.copy()
+                match['fixture_id'] = None
+                matches[match_id] = match
+
+        self.data['fixtures'] = {}
+        count = self._add_fixtures(rounds, num_tables, start_time, slot_minutes)
+        self._rebuild_fixture_index()
+        # Recorded changes may point at the replaced fixtures; a new schedule isn't undoable
+        self.undo_stack.clear()
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        return True, f"{count} fixtures scheduled over {len(rounds)} rounds on {num_tables} table(s)."
+
+    def _add_fixtures(self, rounds, num_tables, start_time, slot_minutes, first_round=1, first_slot=0):
+        """Allocates rounds of (team1_id, team2_id) pairs to tables and slots and stores them as fixtures."""
+        count = 0
+        for round_no, slot, table, team1_id, team2_id in scheduler.allocate_slots(rounds, num_tables):
+            self.data['fixtures'][str(uuid.uuid4())] = {
+                'round': first_round + round_no - 1,
+                'slot': first_slot + slot,
+                'table': table,
+                'scheduled_time': (start_time + timedelta(minutes=slot * slot_minutes)).isoformat(),
+                'team1_id': team1_id,
+                'team2_id': team2_id,
+                'match_id': None
+            }
+            count += 1
+        return count
+
+    def generate_swiss_round(self, num_tables, start_time=None, slot_minutes=30):
+        """Pairs the next Swiss round from current scores and past pairings and adds it to the fixtures."""
+        if len(self.data['teams']) < 2:
+            self.notifier.showerror("Not Enough Teams", "At least two teams are needed to pair a round.")
+            return False, "error"
+        if num_tables < 1 or slot_minutes < 1:
+            self.notifier.showerror("Input Error", "Number of tables and slot length must be at least 1.")
+            return False, "error"
+
+        scores, sub_match_diff, played_pairs = swiss.scores_from_matches(self.data['matches'], self.data['byes'])
+        for segment in self.data['archive']:
+            for t1_id, t2_id, t1_wins, t2_wins, draws, diff in segment['head_to_head']:
+                played_pairs.add(frozenset((t1_id, t2_id)))
+                scores[t1_id] = scores.get(t1_id, 0) + t1_wins + 0.5 * draws
+                scores[t2_id] = scores.get(t2_id, 0) + t2_wins + 0.5 * draws
+                sub_match_diff[t1_id] = sub_match_diff.get(t1_id, 0) + diff
+                sub_match_diff[t2_id] = sub_match_diff.get(t2_id, 0) - diff
+        # Fixtures already paired but not yet played count as past pairings too
+        for fixture in self.data['fixtures'].values():
+            if fixture['match_id'] is None:
+                played_pairs.add(frozenset((fixture['team1_id'], fixture['team2_id'])))
+        ranked = sorted(self.data['teams'], key=lambda t: (-scores.get(t, 0), -sub_match_diff.get(t, 0)))
+        try:
+            pairs, bye_team_id = swiss.pair_round(ranked, played_pairs, self.data['byes'])
+        except ValueError:
+            self.notifier.showerror("Pairing Failed", "Every possible pairing for this round would be a rematch.")
+            return False, "error"
+
+        if start_time is None:
+            start_time = datetime.now().replace(second=0, microsecond=0)
+        fixtures = self.data['fixtures'].values()
+        round_no = max((f['round'] for f in fixtures), default=0) + 1
+        first_slot = max((f['slot'] for f in fixtures), default=-1) + 1
+        self._add_fixtures([pairs], num_tables, start_time, slot_minutes, round_no, first_slot)
+        if bye_team_id:
+            self.data['byes'].append(bye_team_id)
+        self._rebuild_fixture_index()
+        self.undo_stack.clear()
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+
+        message = f"Swiss round {round_no} paired: {len(pairs)} fixtures."
+        if bye_team_id:
+            message += f" Bye: {self.data['teams'][bye_team_id]['name']}."
+        return True, message
+
+    def get_fixtures(self):
+        """Returns all fixtures ordered by time slot and table, with team names and results."""
+        display_fixtures = []
+        for fixture_id, fixture in sorted(self.data['fixtures'].items(),
+                                          key=lambda x: (x[1]['slot'], x[1]['table'])):
+            result = ''
+            match = self.data['matches'].get(fixture['match_id']) if fixture['match_id'] else None
+            if match:
+                wins = (match.get('team1_sub_match_wins', 0), match.get('team2_sub_match_wins', 0))
+                if match['team1_id'] != fixture['team1_id']:
+                    wins = wins[::-1]
+                result = f"{wins[0]}-{wins[1]}"
+            elif fixture['match_id']:
+                result = 'Archived'
+            display_fixtures.append({
+                'id': fixture_id,
+                'round': fixture['round'],
+                'time': datetime.fromisoformat(fixture['scheduled_time']).strftime('%Y-%m-%d %H:%M'),
+                'table': fixture['table'],
+                'team1_name': self.data['teams'].get(fixture['team1_id'], {}).get('name', 'Unknown Team 1'),
+                'team2_name': self.data['teams'].get(fixture['team2_id'], {}).get('name', 'Unknown Team 2'),
+                'result': result
+            })
+        return display_fixtures
+
+    def find_open_fixture(self, team1_id, team2_id):
+        """Returns the earliest unplayed fixture between two teams, or None."""
+        for fixture_id in self._fixtures_by_pair.get(self._pair_key(team1_id, team2_id), []):
+            if self.data['fixtures'][fixture_id]['match_id'] is None:
+                return fixture_id
+        return None
+
+    # --- Knockout Bracket ---
+    def create_bracket(self, double_elimination=False):
+        """Creates a knockout bracket seeded from the current standings."""
+        if len(self.data['teams']) < 2:
+            self.notifier.showerror("Not Enough Teams", "At least two teams are needed to create a bracket.")
+            return False, "error"
+        if self.data['bracket'] and not self.notifier.askyesno(
+                "Replace Bracket", "This will replace the existing bracket. Continue?"):
+            return False, "cancelled"
+
+        seeds = [team_stats['team_id'] for team_stats in self.calculate_standings()]
+        self.data['bracket'] = bracket.create_bracket(seeds, double_elimination)
+        self.undo_stack.clear()
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        kind = "Double" if double_elimination else "Single"
+        return True, f"{kind}-elimination bracket created for {len(seeds)} teams."
+
+    def _bracket_entry_name(self, entry):
+        if entry is bracket.TBD:
+            return "TBD"
+        if entry == bracket.BYE:
+            return "BYE"
+        return self.data['teams'].get(entry, {}).get('name', 'Unknown Team')
+
+    def get_bracket_view(self):
+        """Returns the stored bracket as rounds of (team1, team2, winner) names, without redrawing it."""
+        state = self.data['bracket']
+        if not state:
+            return []
+        return [(label, [tuple(self._bracket_entry_name(entry) for entry in match) for match in matches])
+                for label, matches in bracket.bracket_rounds(state)]
+
+    def get_bracket_champion(self):
+        """Returns the name of the bracket winner, or None if the bracket is unfinished."""
+        state = self.data['bracket']
+        winner_id = bracket.champion(state) if state else None
+        return self._bracket_entry_name(winner_id) if winner_id else None
+
+    def get_next_bracket_match(self, team_id):
+        """Returns the opponent name of the team's next bracket match, or None if it has no match left."""
+        state = self.data['bracket']
+        pending = bracket.next_match(state, team_id) if state else None
+        return self._bracket_entry_name(pending[1]) if pending else None
+
+    def get_team_bracket_path(self, team_id):
+        """Returns the team's bracket matches so far as (team1, team2, winner) names."""
+        state = self.data['bracket']
+        if not state:
+            return []
+        return [tuple(self._bracket_entry_name(entry) for entry in step[1:])
+                for step in bracket.team_path(state, team_id)]
+
+    def _bracket_with_result(self, match_id, match, winner_id):
+        """Returns the bracket as it would be with the match won by winner_id (None: deleted or a draw).
+
+        Returns the current bracket if that changes nothing in it. Raises
+        ValueError if a later bracket match was played on the strength of the
+        match's old result.
+        """
+        state = self.data['bracket']
+        if not state or 'results' not in state:
+            return state
+        results = state['results']
+        index = next((i for i, result in enumerate(results) if result[0] == match_id), None)
+        if index is None:
+            # Not a bracket result yet; a new winner may still be the one due to go through
+            if winner_id is None:
+                return state
+            new_state = copy.deepcopy(state)
+            if bracket.report_result(new_state, match['team1_id'], match['team2_id'], winner_id, match_id):
+                return new_state
+            return state
+        if results[index][3] == winner_id:
+            return state
+        new_results = results[:index] + results[index + 1:]
+        if winner_id is not None:
+            new_results.insert(index, [match_id, match['team1_id'], match['team2_id'], winner_id])
+        replayed = bracket.replay(state, new_results)
+        if replayed is None:
+            raise ValueError("a later bracket match depends on its result.")
+        return replayed
+
+    # --- Tournament Mode ---
+    def record_match(self, team1_id, team2_id, sub_matches_data, fixture_id=None):
+        """Records a match between two teams, including detailed sub-matches.
+
+        The match is linked to fixture_id, or if none is given, to the earliest
+        unplayed fixture between the two teams.
+        """
+        if team1_id == team2_id:
+            self.notifier.showerror("Invalid Match", "Cannot record a match between the same team.")
+            return False, "error"
+        if team1_id not in self.data['teams'] or team2_id not in self.data['teams']:
+            self.notifier.showerror("Error", "One or both selected teams not found.")
+            return False, "error"
+        if not sub_matches_data:
+            self.notifier.showerror("Input Error", "Cannot record a match with no sub-matches.")
+            return False, "error"
+        if self._validate_sub_matches(sub_matches_data):
+            return False, "error"
+        if fixture_id is None:
+            fixture_id = self.find_open_fixture(team1_id, team2_id)
+        elif (fixture_id not in self.data['fixtures'] or
+              self._pair_key(team1_id, team2_id) != self._pair_key(self.data['fixtures'][fixture_id]['team1_id'],
+                                                                  self.data['fixtures'][fixture_id]['team2_id'])):
+            self.notifier.showerror("Invalid Fixture", "The selected fixture is not between these two teams.")
+            return False, "error"
+
+        sub_matches, team1_sub_match_wins, team2_sub_match_wins, winner_id = self._score_sub_matches(
+            team1_id, team2_id, sub_matches_data)
+
+        match_id = str(uuid.uuid4())
+        undo_entries = [('matches', match_id, None)]
+        if fixture_id:
+            undo_entries.append(('fixtures', fixture_id, dict(self.data['fixtures'][fixture_id])))
+        if self.data['bracket'] and winner_id:
+            undo_entries.append(('bracket', None, copy.deepcopy(self.data['bracket'])))
+        self.undo_stack.push(f"record {self.data['teams'][team1_id]['name']} vs {self.data['teams'][team2_id]['name']}",
+                             undo_entries)
+        match = model.Match(
+            team1_id=team1_id,
+            team2_id=team2_id,
+            team1_name=self.data['teams'][team1_id]['name'],
+            team2_name=self.data['teams'][team2_id]['name'],
+            sub_matches=sub_matches,
+            timestamp=datetime.now().isoformat(),
+            winner_name=self.data['teams'][winner_id]['name'] if winner_id else 'Draw',
+            winner_id=winner_id,
+            team1_sub_match_wins=team1_sub_match_wins,
+            team2_sub_match_wins=team2_sub_match_wins,
+            fixture_id=fixture_id
+        )
+        self._log_result(match, 1, match['timestamp'])
+        self.data['matches'][match_id] = match
+        self._index_match(match_id, match)
+        if fixture_id:
+            self.data['fixtures'][fixture_id]['match_id'] = match_id
+        if self.data['bracket'] and winner_id:
+            bracket.report_result(self.data['bracket'], team1_id, team2_id, winner_id, match_id)
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_match(events.MATCH_RECORDED, match_id)
+        team1_name = self.data['teams'][team1_id]['name']
+        team2_name = self.data['teams'][team2_id]['name']
+        winner_display = self.data['teams'][winner_id]['name'] if winner_id else 'Draw'
+        return True, f"Match between {team1_name} and {team2_name} recorded. Team Winner: {winner_display} ({team1_sub_match_wins}-{team2_sub_match_wins} sub-matches)."
+
+    @staticmethod
+    def _winner_side(sub_match):
+        """Works out a sub-match record's winner side from its winning players: 1, 2, or 0 for a draw.
+
+        A side wins if its own players, and only they, are among the winners.
+        """
+        winners = set(sub_match.winner_player_ids)
+        team1_won = not winners.isdisjoint(sub_match.team1_player_ids)
+        team2_won = not winners.isdisjoint(sub_match.team2_player_ids)
+        return 1 if team1_won and not team2_won else 2 if team2_won and not team1_won else 0
+
+    def _score_sub_matches(self, team1_id, team2_id, sub_matches_data):
+        """Returns (sub-match records, team 1 sub-match wins, team 2 sub-match wins, winner_id or None).
+
+        The wins are a count of the sub-matches' winner sides, so they don't
+        depend on which team the players are on now.
+        """
+        sub_matches = [model.SubMatch.from_json(sub_match) for sub_match in sub_matches_data]
+        for sub_match in sub_matches:
+            if sub_match.winner_side is None:
+                sub_match.winner_side = self._winner_side(sub_match)
+        sides = [sub_match.winner_side for sub_match in sub_matches]
+        team1_wins, team2_wins = sides.count(1), sides.count(2)
+        winner_id = team1_id if team1_wins > team2_wins else team2_id if team2_wins > team1_wins else None
+        return sub_matches, team1_wins, team2_wins, winner_id
+
+    def _validate_sub_matches(self, sub_matches):
+        """Checks sub-matches' winner sides and optional game scores and rally logs.
+
+        Reports the first problem and returns its message, or returns None if there is none.
+        """
+        for sub_match in sub_matches:
+            record = model.SubMatch.from_json(sub_match)
+            if record.winner_side is not None and record.winner_side != self._winner_side(record):
+                message = "A sub-match's winning side doesn't match its winning players."
+                self.notifier.showerror("Invalid Winner", message)
+                return message
+            try:
+                game_scores.validate(sub_match)
+            except ValueError as e:
+                self.notifier.showerror("Invalid Game Scores", str(e))
+                return str(e)
+        return None
+
+    def delete_match(self, match_id):
+        """Deletes a match by its ID."""
+        if match_id not in self.data['matches']:
+            return False, "Match not found."
+        try:
+            new_bracket = self._bracket_with_result(match_id, self.data['matches'][match_id], None)
+        except ValueError as e:
+            return False, f"Cannot delete this match: {e}"
+
+        self._log_result(self.data['matches'][match_id], -1)
+        match = self.data['matches'].pop(match_id)
+        self._unindex_match(match_id, match)
+        undo_entries = [('matches', match_id, match)]
+        if new_bracket is not self.data['bracket']:
+            undo_entries.append(('bracket', None, self.data['bracket']))
+            self.data['bracket'] = new_bracket
+        fixture = self.data['fixtures'].get(match.get('fixture_id'))
+        if fixture and fixture['match_id'] == match_id:
+            undo_entries.append(('fixtures', match['fixture_id'], dict(fixture)))
+            fixture['match_id'] = None
+        self.undo_stack.push(f"delete {match['team1_name']} vs {match['team2_name']}", undo_entries)
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self.events.publish(events.MATCH_DELETED, {'id': match_id})
+        return True, "Match deleted successfully."
+
+    def update_match(self, match_id, new_sub_matches):
+        """Updates the sub-matches of an existing match."""
+        if match_id not in self.data['matches']:
+            return False, "Match not found."
+
+        error = self._validate_sub_matches(new_sub_matches)
+        if error:
+            return False, error
+
+        match = self.data['matches'][match_id]
+        sub_matches, team1_sub_match_wins, team2_sub_match_wins, winner_id = self._score_sub_matches(
+            match['team1_id'], match['team2_id'], new_sub_matches)
+        try:
+            new_bracket = self._bracket_with_result(match_id, match, winner_id)
+        except ValueError as e:
+            return False, f"Cannot change the winner of this match: {e}"
+
+        # The stored record is kept as it was, for undo and snapshots; the edit goes into a copy
+        undo_entries = [('matches', match_id, match)]
+        if new_bracket is not self.data['bracket']:
+            undo_entries.append(('bracket', None, self.data['bracket']))
+            self.data['bracket'] = new_bracket
+        self.undo_stack.push(f"edit {match['team1_name']} vs {match['team2_name']}", undo_entries)
+        self._log_result(match, -1)
+        self._unindex_match(match_id, match)
+        match = match.copy()
+        self.data['matches'][match_id] = match
+        match['sub_matches'] = sub_matches
+        match['team1_sub_match_wins'] = team1_sub_match_wins
+        match['team2_sub_match_wins'] = team2_sub_match_wins
+        match['winner_id'] = winner_id
+        self._index_match(match_id, match)
+        self._log_result(match, 1)
+
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_match(events.MATCH_UPDATED, match_id)
+        return True, "Match updated successfully."
+
+    # --- Undo ---
+    def undo(self):
+        """Reverts the most recent recorded change."""
+        command = self.undo_stack.pop_undo()
+        if command is None:
+            return False, "Nothing to undo."
+        label, entries = command
+        inverse = self._apply_undo_entries(entries)
+        self.undo_stack.push_redo(label, inverse)
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_undo_changes(inverse)
+        return True, f"Undid {label}."
+
+    def redo(self):
+        """Re-applies the most recently undone change."""
+        command = self.undo_stack.pop_redo()
+        if command is None:
+            return False, "Nothing to redo."
+        label, entries = command
+        inverse = self._apply_undo_entries(entries)
+        self.undo_stack.push_undone(label, inverse)
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self._publish_undo_changes(inverse)
+        return True, f"Redid {label}."
+
+    def _apply_undo_entries(self, entries):
+        """Writes back the values in undo entries, keeping indexes current. Returns the inverse entries."""
+        self.match_log.start(self.data)
+        # Order entries come first, so they are applied last; what the inverse must put back is the order from
+        # before any entry of this command, not the order once the others have added or removed their keys
+        orders = {(kind, key): list(self._ordered_items(kind, key))
+                  for kind, key, _ in entries if kind in ('team_order', 'player_order')}
+        inverse = []
+        fixtures_changed = False
+        for kind, key, value in reversed(entries):
+            if kind == 'teams':
+                current = self.data['teams'].get(key)
+                inverse.append((kind, key, current))
+                if current is not None:
+                    self._index_roster(key, current, -1)
+                if value is None:
+                    del self.data['teams'][key]
+                    if self._h2h is not None:
+                        self._h2h.remove_team(key)
+                else:
+                    self.data['teams'][key] = value
+                    self._index_roster(key, value)
+            elif kind == 'players':
+                team_id, player_id = key
+                players = self.data['teams'][team_id]['players']
+                current = players.get(player_id)
+                inverse.append((kind, key, current))
+                if current is not None:
+                    self._index_player(team_id, player_id, current, -1)
+                if value is None:
+                    del players[player_id]
+                else:
+                    players[player_id] = value
+                    self._index_player(team_id, player_id, value)
+            elif kind == 'matches':
+                current = self.data['matches'].get(key)
+                inverse.append((kind, key, current))
+                if current is not None:
+                    self._log_result(current, -1)
+                    self._unindex_match(key, current)
+                if value is None:
+                    del self.data['matches'][key]
+                else:
+                    self.data['matches'][key] = value
+                    self._index_match(key, value)
+                    self._log_result(value, 1)
+            elif kind in ('team_order', 'player_order'):
+                inverse.append((kind, key, orders[(kind, key)]))
+                self._reorder(self._ordered_items(kind, key), value)
+            elif kind == 'fixtures':
+                inverse.append((kind, key, self.data['fixtures'].get(key)))
+                if value is None:
+                    del self.data['fixtures'][key]
+                else:
+                    self.data['fixtures'][key] = value
+                fixtures_changed = True
+            else:
+                inverse.append((kind, None, self.data[kind]))
+                self.data[kind] = value
+        inverse.reverse()
+        if fixtures_changed:
+            self._rebuild_fixture_index()
+        return inverse
+
+    def _ordered_items(self, kind, key):
+        """Returns the dict whose key order a 'team_order' or 'player_order' undo entry records."""
+        return self.data['teams'] if kind == 'team_order' else self.data['teams'][key]['players']
+
+    @staticmethod
+    def _reorder(items, order):
+        """Puts a dict's keys back in a recorded order, in place; keys not in the order go last."""
+        reordered = {key: items[key] for key in order if key in items}
+        reordered.update(items)
+        items.clear()
+        items.update(reordered)
+
+    def _publish_undo_changes(self, inverse):
+        """Publishes events for an applied undo or redo, given its inverse entries (the replaced values)."""
+        rosters = {}
+        for kind, key, replaced in inverse:
+            if kind == 'teams':
+                rosters[key] = True
+            elif kind == 'players':
+                rosters[key[0]] = True
+            elif kind == 'matches':
+                if key not in self.data['matches']:
+                    self.events.publish(events.MATCH_DELETED, {'id': key})
+                else:
+                    self._publish_match(events.MATCH_RECORDED if replaced is None else events.MATCH_UPDATED, key)
+        for team_id in rosters:
+            self._publish_roster(team_id)
+
+    # --- Head-to-Head ---
+    def _head_to_head(self):
+        """Returns the team head-to-head matrix, building it on first use."""
+        if self._h2h is None:
+            import h2h_matrix  # NumPy is only loaded once someone asks for head-to-head results
+            self._h2h = h2h_matrix.HeadToHeadMatrix(capacity=max(16, len(self.data['teams'])))
+            for team_id in self.data['teams']:
+                self._h2h.ordinal(team_id)
+            for match in self.data['matches'].values():
+                self._h2h.add_match(match)
+            for segment in self.data['archive']:
+                for team_id, opponent_id, wins, losses, draws, diff in segment['head_to_head']:
+                    self._h2h.add_record(team_id, opponent_id, wins, losses, draws, diff)
+        return self._h2h
+
+    def get_head_to_head(self, team_id, opponent_id):
+        """Returns (wins, losses, draws, sub_match_diff) for a team against one opponent."""
+        return self._head_to_head().head_to_head(team_id, opponent_id)
+
+    def get_head_to_head_matrix(self, team_ids=None):
+        """Returns (team_ids, wins, losses, draws, sub_match_diff) with NumPy matrices in team_ids order."""
+        if team_ids is None:
+            team_ids = list(self.data['teams'])
+        return (team_ids,) + self._head_to_head().export(team_ids)
+
+    # --- Player Statistics ---
+    def _player_records(self, index, player_id):
+        """Returns [(other_id, name, wins, losses, draws), ...] from one row of a player index.
+
+        Players on no team's roster are left out: archive summaries keep their
+        rows after their team is deleted.
+        """
+        if player_id not in self._player_teams:
+            return []
+        return [(other_id, self.get_player_name(other_id), wins, losses, draws)
+                for other_id, (wins, losses, draws) in index.get(player_id, {}).items()
+                if other_id in self._player_teams]
+
+    def _player_record(self, index, player_id, other_id):
+        """Returns (wins, losses, draws) from a player index, or zeros unless both players are on a roster."""
+        if player_id not in self._player_teams or other_id not in self._player_teams:
+            return (0, 0, 0)
+        return tuple(index.get(player_id, {}).get(other_id, (0, 0, 0)))
+
+    def get_partner_record(self, player_id, partner_id):
+        """Returns (wins, losses, draws) for two players playing doubles together."""
+        return self._player_record(self._player_partners, player_id, partner_id)
+
+    def get_opponent_record(self, player_id, opponent_id):
+        """Returns (wins, losses, draws) for a player against a given opponent."""
+        return self._player_record(self._player_opponents, player_id, opponent_id)
+
+    def get_best_partners(self, player_id, limit=None):
+        """Returns a player's doubles partners, best win rate first."""
+        records = self._player_records(self._player_partners, player_id)
+        records.sort(key=lambda r: (-r[2] / (r[2] + r[3] + r[4]), -r[2], r[1]))
+        return records[:limit]
+
+    def get_nemesis_opponents(self, player_id, limit=None):
+        """Returns a player's opponents, the ones they lose to most first."""
+        records = self._player_records(self._player_opponents, player_id)
+        records.sort(key=lambda r: (-r[3] / (r[2] + r[3] + r[4]), -r[3], r[1]))
+        return records[:limit]
+    
+    def calculate_standings(self):
+        """Calculates and returns current tournament standings."""
+        standings = {}
+        numbers = {}
+        for team_id, team in self.data['teams'].items():
+            standings[team_id] = {
+                'team_id': team_id,
+                'name': team['name'],
+                'wins': 0,
+                'losses': 0,
+                'draws': 0,
+                'matches_played': 0,
+                'game_diff': 0,
+                'point_diff': 0
+            }
+            numbers[team_id] = model.IDS.number(team_id)
+
+        # Match records hold team ids as model.IDS numbers, so each team's row is found by list index
+        rows = [None] * len(model.IDS)
+        for number in numbers.values():
+            rows[number] = [0, 0, 0, 0, 0, 0]  # wins, losses, draws, played, game diff, point diff
+
+        for match in self.data['matches'].values():
+            row1 = rows[match.team1_id]
+            row2 = rows[match.team2_id]
+
+            game_diff = point_diff = 0
+            for sub_match in match.sub_matches:
+                games = sub_match.games
+                if games:
+                    games1, games2, points1, points2 = game_scores.totals(games)
+                    game_diff += games1 - games2
+                    point_diff += points1 - points2
+            if row1 is not None:
+                row1[3] += 1
+                row1[4] += game_diff
+                row1[5] += point_diff
+            if row2 is not None:
+                row2[3] += 1
+                row2[4] -= game_diff
+                row2[5] -= point_diff
+
+            winner_id = match.winner_id
+            if winner_id == match.team1_id and row1 is not None:
+                row1[0] += 1
+                if row2 is not None: row2[1] += 1
+            elif winner_id == match.team2_id and row2 is not None:
+                row2[0] += 1
+                if row1 is not None: row1[1] += 1
+            elif winner_id is None and row1 is not None and row2 is not None:  # Draw
+                row1[2] += 1
+                row2[2] += 1
+
+        for team_id, record in standings.items():
+            wins, losses, draws, played, game_diff, point_diff = rows[numbers[team_id]]
+            record['wins'] = wins
+            record['losses'] = losses
+            record['draws'] = draws
+            record['matches_played'] = played
+            record['game_diff'] = game_diff
+            record['point_diff'] = point_diff
+
+        for segment in self.data['archive']:
+            for team_id, (wins, losses, draws, played, *diffs) in segment['teams'].items():
+                if team_id in standings:
+                    record = standings[team_id]
+                    record['wins'] += wins
+                    record['losses'] += losses
+                    record['draws'] += draws
+                    record['matches_played'] += played
+                    if diffs:
+                        record['game_diff'] += diffs[0]
+                        record['point_diff'] += diffs[1]
+
+        # Game and point differential break ties on wins
+        sorted_standings = sorted(standings.values(), key=lambda x: (x['wins'], x['game_diff'], x['point_diff']),
+                                  reverse=True)
+        if self.db is not None:
+            self.db.collection('leaderboard').document('teams').set({'standings': sorted_standings})
+        return sorted_standings
+
+    def calculate_player_points(self):
+        """Calculates and returns individual player points based on sub-match wins."""
+        # Sub-match records hold player ids as model.IDS numbers; count every win, then keep current players
+        wins = [0] * len(model.IDS)
+        for match in self.data['matches'].values():
+            for sub_match in match.sub_matches:
+                for winner_player_id in sub_match.winner_player_ids:
+                    wins[winner_player_id] += 1
+
+        player_points = {}
+        for team_id, team_data in self.data['teams'].items():
+            for player_id, player_data in team_data['players'].items():
+                number = model.IDS.number(player_id)
+                player_points[player_id] = {
+                    'player_id': player_id,
+                    'name': player_data['name'],
+                    'team_name': team_data['name'],
+                    'points': wins[number] if number < len(wins) else 0  # numbered after the count: no wins yet
+                }
+
+        for segment in self.data['archive']:
+            for player_id, (points, _) in segment['players'].items():
+                if player_id in player_points:
+                    player_points[player_id]['points'] += points
+        
+        sorted_player_points = sorted(player_points.values(), key=lambda x: x['points'], reverse=True)
+        if self.db is not None:
+            self.db.collection('leaderboard').document('players').set({'players': sorted_player_points})
+        return sorted_player_points
+
+    # --- Point-in-time Results ---
+    def standings_as_of(self, timestamp):
+        """Returns the standings as they stood at timestamp (a datetime), in calculate_standings' format."""
+        self.match_log.start(self.data)
+        teams, _ = self.match_log.totals_as_of(timestamp.isoformat())
+        standings = []
+        for team_id, team in self.data['teams'].items():
+            wins, losses, draws, played, game_diff, point_diff = teams.get(team_id, (0, 0, 0, 0, 0, 0))
+            standings.append({
+                'team_id': team_id,
+                'name': team['name'],
+                'wins': wins,
+                'losses': losses,
+                'draws': draws,
+                'matches_played': played,
+                'game_diff': game_diff,
+                'point_diff': point_diff
+            })
+        return sorted(standings, key=lambda x: (x['wins'], x['game_diff'], x['point_diff']), reverse=True)
+
+    def player_points_as_of(self, timestamp):
+        """Returns player points as they stood at timestamp (a datetime), in calculate_player_points' format."""
+        self.match_log.start(self.data)
+        _, points = self.match_log.totals_as_of(timestamp.isoformat())
+        player_points = [{'player_id': player_id, 'name': player['name'], 'team_name': team['name'],
+                          'points': points.get(player_id, 0)}
+                         for team in self.data['teams'].values() for player_id, player in team['players'].items()]
+        return sorted(player_points, key=lambda x: x['points'], reverse=True)
+
+    def get_rank_progression(self):
+        """Returns every team's and player's rank and points after each match day (a progression.RankProgression)."""
+        import progression  # NumPy, as for _head_to_head
+        return progression.compute(self.data)
+
+    # --- Background Work ---
+    def snapshot(self):
+        """Returns a read-only view of the manager over a copy of its data, for work on another thread.
+
+        Stored match records are never changed in place (an edit stores a changed
+        copy), so the copy shares them and costs one dict copy for the matches;
+        teams, fixtures and the smaller values are copied outright.
+        """
+        view = copy.copy(self)
+        view.data = copy.deepcopy({key: value for key, value in self.data.items()
+                                   if key not in ('teams', 'matches', 'archive')})
+        view.data['teams'] = {team_id: team.copy() for team_id, team in self.data['teams'].items()}
+        view.data['matches'] = dict(self.data['matches'])
+        view.data['archive'] = list(self.data['archive'])  # segment summaries are only ever added
+        return view
+
+    # --- Reports ---
+    def get_report_snapshot(self):
+        """Returns a copy of the teams, matches and archive summaries that later changes cannot touch."""
+        data = model.plain(self.data)
+        return {'teams': data['teams'], 'matches': data['matches'], 'archive': copy.deepcopy(self.data['archive'])}
+
+    def generate_reports(self, out_dir, pdf=False, workers=None, progress=None):
+        """Writes HTML (and optionally PDF) reports for every team and player to out_dir."""
+        import reports  # process pool machinery, as for _head_to_head
+        try:
+            paths = reports.generate(self.get_report_snapshot(), out_dir, pdf=pdf, workers=workers, progress=progress)
+        except (RuntimeError, OSError) as e:
+            self.notifier.showerror("Report Error", str(e))
+            return False, "error"
+        return True, f"Wrote {len(paths)} reports to {out_dir}."
+
+    def get_round_end(self, round_no):
+        """Returns when the last match played for a fixture in rounds up to round_no was recorded, or None."""
+        timestamps = [self.data['matches'][fixture['match_id']]['timestamp']
+                      for fixture in self.data['fixtures'].values()
+                      if fixture['round'] <= round_no and fixture['match_id'] in self.data['matches']]
+        return datetime.fromisoformat(max(timestamps)) if timestamps else None
+
+    def get_match_history(self, include_archived=False):
+        """Returns a list of all recorded matches, optionally followed by one row per archive segment."""
+        display_matches = self._match_history_rows(self.data['matches'])
+        if include_archived:
+            for segment in sorted(self.data['archive'], key=lambda x: x['last'], reverse=True):
+                first = datetime.fromisoformat(segment['first']).strftime('%Y-%m-%d')
+                last = datetime.fromisoformat(segment['last']).strftime('%Y-%m-%d')
+                display_matches.append({
+                    'date': f"{first} to {last}",
+                    'team1_name': f"Archived: {segment['matches']} matches",
+                    'score': '',
+                    'team2_name': '',
+                    'winner_name': '',
+                    'id': f"archive:{segment['id']}"
+                })
+        return display_matches
+
+    def query_matches(self, team_id=None, player_id=None, match_type=None, start=None, end=None,
+                      page=1, per_page=None):
+        """Returns (history rows, total matches) for live matches filtered by team, player, sub-match type
+        and time (datetimes, start inclusive, end exclusive), newest first, optionally one page at a time."""
+        match_ids = self._match_index.query(self.data['matches'], team_id, player_id, match_type,
+                                            start.isoformat() if start else None, end.isoformat() if end else None)
+        total = len(match_ids)
+        if per_page is not None:
+            match_ids = match_ids[(page - 1) * per_page:page * per_page]
+        return self._match_history_rows({match_id: self.data['matches'][match_id] for match_id in match_ids}), total
+
+    def get_orphaned_references(self):
+        """Returns the sub-match player references to players on no team's roster, oldest match first.
+
+        Each row names the match, the sub-match position and the missing player
+        id. Only the players in the match index are looked at, not the matches.
+        """
+        rows = []
+        for player_id, positions_by_match in self._match_index.by_player.items():
+            if player_id in self._player_teams:
+                continue
+            for match_id, positions in positions_by_match.items():
+                match = self.data['matches'][match_id]
+                for position in positions:
+                    rows.append({
+                        'match_id': match_id,
+                        'position': position,
+                        'player_id': player_id,
+                        'timestamp': match['timestamp'],
+                        'team1_name': match['team1_name'],
+                        'team2_name': match['team2_name'],
+                    })
+        rows.sort(key=lambda row: (row['timestamp'], row['match_id'], row['position']))
+        return rows
+
+    def get_player_sub_matches(self, player_id, match_id):
+        """Returns the sub-matches of a live match that the player played in."""
+        positions = self._match_index.by_player.get(player_id, {}).get(match_id, ())
+        sub_matches = self.data['matches'][match_id]['sub_matches']
+        return [sub_matches[position] for position in positions]
+
+    def _match_history_rows(self, matches):
+        """Formats match records as history rows, newest first."""
+        all_matches_with_ids = [(match_id, match_data) for match_id, match_data in matches.items()]
+
+        sorted_matches = sorted(all_matches_with_ids, key=lambda x: x[1]['timestamp'], reverse=True)
+    
+        display_matches = []
+        for match_id, match in sorted_matches:
+            team1_name = self.data['teams'].get(match['team1_id'], {}).get('name', 'Unknown Team 1')
+            team2_name = self.data['teams'].get(match['team2_id'], {}).get('name', 'Unknown Team 2')
+            
+            winner_name = 'Draw'
+            if match.get('winner_id'): # Use .get for robustness
+                winner_name = self.data['teams'].get(match['winner_id'], {}).get('name', 'Unknown Winner') 
+            
+            # Display overall sub-match score for the team match
+            sub_match_score = f"{match.get('team1_sub_match_wins', 0)}-{match.get('team2_sub_match_wins', 0)}"
+            
+            match_date = datetime.fromisoformat(match['timestamp']).strftime('%Y-%m-%d %H:%M')
+            display_matches.append({
+                'date': match_date,
+                'team1_name': team1_name,
+                'score': sub_match_score, # Now shows sub-match score
+                'team2_name': team2_name,
+                'winner_name': winner_name,
+                'id': match_id
+            })
+        return display_matches
+
+    def archive_matches(self, cutoff):
+        """Moves matches played before cutoff (a datetime) into a compressed segment, keeping only its summary."""
+        cutoff = cutoff.isoformat()
+        old_matches = {match_id: match for match_id, match in self.data['matches'].items()
+                       if match['timestamp'] < cutoff}
+        if not old_matches:
+            return False, "No matches were played before that date."
+
+        segment_id, relative, absolute = archive.new_segment_path(self.data_file)
+        try:
+            archive.write_segment(absolute, old_matches)
+        except OSError as e:
+            self.notifier.showerror("Archive Error", f"Could not write archive segment: {e}")
+            return False, "error"
+
+        partners, opponents = {}, {}
+        for match in old_matches.values():
+            self._add_player_records(partners, opponents, match)
+        summary = archive.summarize_matches(old_matches)
+        summary.update({
+            'id': segment_id,
+            'file': relative,
+            'partners': archive.flatten_player_index(partners),
+            'opponents': archive.flatten_player_index(opponents)
+        })
+        self.data['archive'].append(summary)
+        # The player and head-to-head indexes already hold these matches; the summary now stands in
+        # for them on rebuild. Match queries only cover live matches.
+        for match_id, match in old_matches.items():
+            self._match_index.remove(match_id, match)
+            del self.data['matches'][match_id]
+        self.undo_stack.clear()
+        conflict = self._save_data()
+        if conflict:
+            return False, conflict
+        self.events.publish(events.DATA_REPLACED, {})
+        return True, f"{len(old_matches)} matches archived."
+
+    def get_archived_matches(self, segment_id):
+        """Returns (history rows, match records) for the matches in an archive segment."""
+        segment = next((s for s in self.data['archive'] if s['id'] == segment_id), None)
+        if segment is None:
+            return [], {}
+        path = os.path.join(os.path.dirname(self.data_file), segment['file'])
+        try:
+            matches = archive.read_segment(path)
+        except (OSError, ValueError) as e:
+            self.notifier.showerror("Archive Error", f"Could not read archive segment: {e}")
+            return [], {}
+        return self._match_history_rows(matches), matches
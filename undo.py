@@ -0,0 +1,77 @@
+"""Undo and redo of TournamentManager changes as inverse commands.
+
+A command is a label plus the entries a change touched, each holding the
+value from before the change:
+
+    ('teams', team_id, team)                    None if the team did not exist
+    ('players', (team_id, player_id), player)
+    ('matches', match_id, match)
+    ('fixtures', fixture_id, fixture)
+    ('team_order', None, team_ids)              key order to restore after a
+    ('player_order', team_id, player_ids)       removed team or player is put back
+    ('skill_levels' | 'bracket' | 'byes', None, value)    whole value
+
+Undoing writes the old values back and keeps the values it replaced as the
+redo command, so both directions cost time in proportion to the size of the
+change (a deleted team, its players and its matches) and never copy the
+rest of the data.
+"""
+from collections import deque
+
+MAX_COMMANDS = 100
+
+
+class UndoStack:
+    def __init__(self, limit=MAX_COMMANDS):
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+
+    def push(self, label, entries):
+        """Records a new change. Anything that was undone can no longer be redone."""
+        self._undo.append((label, entries))
+        self._redo.clear()
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    def discard_changed(self, changed):
+        """Drops the commands that would write back a record changed elsewhere.
+
+        changed holds (kind, key) pairs as in the entries. Commands only apply
+        in order, so the undo commands older than a dropped one and the redo
+        commands after it go too.
+        """
+        def stale(command):
+            return any((kind, key) in changed for kind, key, _ in command[1])
+
+        for index in range(len(self._undo) - 1, -1, -1):
+            if stale(self._undo[index]):
+                for _ in range(index + 1):
+                    self._undo.popleft()
+                break
+        for index in range(len(self._redo) - 1, -1, -1):
+            if stale(self._redo[index]):
+                del self._redo[:index + 1]
+                break
+
+    @property
+    def undo_label(self):
+        return self._undo[-1][0] if self._undo else None
+
+    @property
+    def redo_label(self):
+        return self._redo[-1][0] if self._redo else None
+
+    def pop_undo(self):
+        return self._undo.pop() if self._undo else None
+
+    def pop_redo(self):
+        return self._redo.pop() if self._redo else None
+
+    def push_redo(self, label, entries):
+        self._redo.append((label, entries))
+
+    def push_undone(self, label, entries):
+        """Puts a redone change back on the undo side, keeping the rest of the redo stack."""
+        self._undo.append((label, entries))